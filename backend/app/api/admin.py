@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update
+from sqlalchemy.dialects.postgresql import insert
 from typing import List, Dict, Any
+import asyncio
 import csv
 import io
 import uuid
@@ -24,11 +26,13 @@ from app.models.schemas import (
     AttendeeCreate,
     AttendeeImportRow,
     PassIssuanceRequest,
+    BulkPassIssuanceRequest,
     PassIssuanceResponse,
     PassJobResponse,
     PassJobStatusResponse,
 )
 from app.services.card_service import CardService
+from app.services.analytics_service import AnalyticsService
 from app.utils.migrations import run_sql_migration, get_database_status
 from app.utils.seed import seed_database
 
@@ -196,26 +200,26 @@ async def import_attendees(
     db: AsyncSession = Depends(get_db)
 ):
     """Import attendees from CSV with validation
-    
+
     Limits:
     - Max file size: 5MB
     - Max rows: 10,000
     """
-    
+
     # SECURITY: Validate file size (5MB limit)
     MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
     MAX_ROWS = 10000
-    
+
     # Read file with size check
     contents = await file.read()
     file_size = len(contents)
-    
+
     if file_size > MAX_FILE_SIZE:
         raise HTTPException(
             status_code=413,
             detail=f"File too large. Maximum size is {MAX_FILE_SIZE / (1024 * 1024):.1f}MB"
         )
-    
+
     if file_size == 0:
         raise HTTPException(status_code=400, detail="Empty file uploaded")
 
@@ -233,13 +237,13 @@ async def import_attendees(
         csv_data = io.StringIO(contents.decode('utf-8'))
     except UnicodeDecodeError:
         raise HTTPException(status_code=400, detail="Invalid file encoding. Please use UTF-8")
-    
+
     try:
         reader = csv.DictReader(csv_data)
     except csv.Error as e:
         raise HTTPException(status_code=400, detail=f"Invalid CSV format: {str(e)}")
 
-    imported = 0
+    rows = []
     errors = []
 
     for row_num, row in enumerate(reader, start=2):  # Start at 2 (header is line 1)
@@ -249,32 +253,43 @@ async def import_attendees(
                 status_code=413,
                 detail=f"Too many rows. Maximum is {MAX_ROWS:,} rows"
             )
-        
+
         try:
             # Map CSV columns to attendee fields
             flags_json = {}
             if row.get('role'):
                 flags_json['role'] = row['role']
 
-            attendee = Attendee(
-                event_id=event_id,
-                tenant_id=event.tenant_id,
-                first_name=row.get('first_name'),
-                last_name=row.get('last_name'),
-                email=row.get('email'),
-                phone=row.get('phone'),
-                org_name=row.get('org_name'),
-                title=row.get('title'),
-                linkedin_url=row.get('linkedin_url'),
-                flags_json=flags_json
-            )
-
-            db.add(attendee)
-            imported += 1
+            rows.append({
+                "event_id": event_id,
+                "tenant_id": event.tenant_id,
+                "first_name": row.get('first_name'),
+                "last_name": row.get('last_name'),
+                "email": row.get('email') or None,  # Blank emails must not collide
+                "phone": row.get('phone'),
+                "org_name": row.get('org_name'),
+                "title": row.get('title'),
+                "linkedin_url": row.get('linkedin_url'),
+                "flags_json": flags_json
+            })
 
         except Exception as e:
             errors.append(f"Row {row_num}: {str(e)}")
 
+    imported = 0
+    if rows:
+        # Existing (event_id, email) pairs are skipped instead of duplicated
+        result = await db.execute(
+            insert(Attendee.__table__)
+            .on_conflict_do_nothing(index_elements=["event_id", "email"])
+            .returning(Attendee.__table__.c.attendee_id),
+            rows
+        )
+        imported = len(result.all())
+
+        if imported < len(rows):
+            errors.append(f"{len(rows) - imported} row(s) skipped: email already registered for this event")
+
     await db.commit()
 
     return {
@@ -319,37 +334,34 @@ async def create_attendee(
             detail="At least one contact method (email or phone) is required"
         )
 
-    # Check for duplicate email in the same event
-    if attendee_data.email:
-        existing_result = await db.execute(
-            select(Attendee).where(
-                Attendee.event_id == event_id,
-                Attendee.email == attendee_data.email
-            )
+    # Create attendee; uq_attendee_event_email rejects duplicate emails
+    # in the same event without a separate lookup
+    result = await db.execute(
+        insert(Attendee)
+        .values(
+            event_id=event_id,
+            tenant_id=event.tenant_id,
+            email=attendee_data.email,
+            phone=attendee_data.phone,
+            first_name=attendee_data.first_name,
+            last_name=attendee_data.last_name,
+            org_name=attendee_data.org_name,
+            title=attendee_data.title,
+            linkedin_url=attendee_data.linkedin_url,
+            flags_json=attendee_data.flags_json or {}
         )
-        if existing_result.first():
-            raise HTTPException(
-                status_code=409,
-                detail=f"Attendee with email {attendee_data.email} already exists for this event"
-            )
-
-    # Create attendee
-    attendee = Attendee(
-        event_id=event_id,
-        tenant_id=event.tenant_id,
-        email=attendee_data.email,
-        phone=attendee_data.phone,
-        first_name=attendee_data.first_name,
-        last_name=attendee_data.last_name,
-        org_name=attendee_data.org_name,
-        title=attendee_data.title,
-        linkedin_url=attendee_data.linkedin_url,
-        flags_json=attendee_data.flags_json or {}
+        .on_conflict_do_nothing(index_elements=["event_id", "email"])
+        .returning(Attendee)
     )
+    attendee = result.scalar_one_or_none()
+
+    if attendee is None:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Attendee with email {attendee_data.email} already exists for this event"
+        )
 
-    db.add(attendee)
     await db.commit()
-    await db.refresh(attendee)
 
     logger.info(f"Created attendee {attendee.attendee_id} for event {event_id}")
 
@@ -444,7 +456,8 @@ async def issue_pass(
     # Send message to SQS queue
     try:
         logger.info(f"Sending SQS message for job {job.job_id} to queue {settings.SQS_QUEUE_URL}")
-        response = sqs.send_message(
+        response = await asyncio.to_thread(
+            sqs.send_message,
             QueueUrl=settings.SQS_QUEUE_URL,
             MessageBody=json.dumps({
                 "job_id": str(job.job_id),
@@ -464,6 +477,84 @@ async def issue_pass(
     return job
 
 
+# Attendees per worker message; a chunk is issued with one bulk statement
+# and its emails go out as one SES bulk send
+ISSUE_CARDS_CHUNK_SIZE = 50
+ISSUE_CARDS_ACTION = "issue_cards"
+
+
+@router.post("/attendees/issue", response_model=List[PassJobResponse], status_code=202)
+async def issue_passes(
+    request: BulkPassIssuanceRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Queue pass generation jobs for several attendees
+
+    One job is created per attendee and the jobs are sent to the worker in
+    chunks of ISSUE_CARDS_CHUNK_SIZE, so the request returns well within the
+    API Gateway timeout. Attendees that already have a card get a completed
+    job; unknown attendee IDs are skipped. Poll /passes/jobs/{job_id} for
+    progress.
+    """
+    attendee_result = await db.execute(
+        select(Attendee.attendee_id, Attendee.tenant_id, Attendee.card_id)
+        .where(Attendee.attendee_id.in_(request.attendee_ids))
+    )
+    job_rows = [
+        {
+            "attendee_id": attendee_id,
+            "tenant_id": tenant_id,
+            "status": "completed" if card_id else "pending",
+            "card_id": card_id
+        }
+        for attendee_id, tenant_id, card_id in attendee_result.all()
+    ]
+    if not job_rows:
+        return []
+
+    # All jobs in one INSERT ... RETURNING round trip
+    job_result = await db.execute(
+        insert(PassGenerationJob)
+        .values(job_rows)
+        .returning(*PassGenerationJob.__table__.c)
+    )
+    jobs = [dict(job) for job in job_result.mappings()]
+    await db.commit()
+
+    pending_jobs = [job for job in jobs if job["status"] == "pending"]
+    for start in range(0, len(pending_jobs), ISSUE_CARDS_CHUNK_SIZE):
+        chunk = pending_jobs[start:start + ISSUE_CARDS_CHUNK_SIZE]
+        try:
+            await asyncio.to_thread(
+                sqs.send_message,
+                QueueUrl=settings.SQS_QUEUE_URL,
+                MessageBody=json.dumps({
+                    "action": ISSUE_CARDS_ACTION,
+                    "job_ids": [str(job["job_id"]) for job in chunk]
+                })
+            )
+        except Exception as e:
+            # Mark the chunk failed; already queued chunks still run
+            logger.error(
+                "Failed to queue bulk pass issuance",
+                exc_info=True,
+                extra={"extra_fields": {"jobs": len(chunk), "error": str(e)}}
+            )
+            error_message = f"Failed to queue job: {str(e)}"
+            await db.execute(
+                update(PassGenerationJob)
+                .where(PassGenerationJob.job_id.in_([job["job_id"] for job in chunk]))
+                .values(status="failed", error_message=error_message)
+            )
+            await db.commit()
+            for job in chunk:
+                job["status"] = "failed"
+                job["error_message"] = error_message
+
+    return jobs
+
+
 @router.get("/passes/jobs/{job_id}", response_model=PassJobStatusResponse)
 async def get_pass_job_status(
     job_id: uuid.UUID,
@@ -605,8 +696,6 @@ async def get_analytics_overview(
     - Device/browser breakdown
     - Top performing cards
     """
-    from app.services.analytics_service import AnalyticsService
-
     try:
         overview = await AnalyticsService.get_overview(
             db=db,
@@ -639,8 +728,6 @@ async def get_card_analytics(
     - Contact export events
     - Geographic distribution (if available)
     """
-    from app.services.analytics_service import AnalyticsService
-
     try:
         card_metrics = await AnalyticsService.get_card_metrics(
             db=db,
@@ -679,8 +766,6 @@ async def get_event_analytics(
     - Top performing attendee cards
     - Engagement trends over time
     """
-    from app.services.analytics_service import AnalyticsService
-
     try:
         event_metrics = await AnalyticsService.get_event_metrics(
             db=db,
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, text, case
+from sqlalchemy import select, func, text
 from datetime import date, datetime, timedelta
 from typing import Optional, List, Dict, Any
 import uuid
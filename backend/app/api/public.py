@@ -1,21 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, Response, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, text
-from sqlalchemy.dialects.postgresql import insert
-from datetime import date
+from sqlalchemy import select
+import asyncio
 import uuid
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.executors import run_cpu_bound
 from app.core.logging import get_logger
 from app.core.exceptions import CardNotFoundError, QRCodeNotFoundError, S3DownloadError
 
 logger = get_logger(__name__)
-from app.models.database import Card, ScanDaily, Event, Attendee, QRCode
+from app.models.database import Card, Event, Attendee, QRCode
 from app.models.schemas import CardResponse
 from app.utils.vcard import generate_vcard
 from app.utils.s3 import s3_client
-from app.services.analytics_service import AnalyticsService
+from app.utils.qr import generate_qr_code, generate_qr_code_svg
+from app.services.analytics_service import AnalyticsService, parse_user_agent
 
 # Import limiter from main app (will be set when app initializes)
 from slowapi import Limiter
@@ -26,6 +28,18 @@ limiter = Limiter(key_func=get_remote_address)
 router = APIRouter(tags=["public"])
 
 
+async def _commit_tracking(db: AsyncSession, card_id: uuid.UUID) -> None:
+    """Commit the tracking rows of a public request; failures are only logged"""
+    try:
+        await db.commit()
+    except Exception as e:
+        logger.warning(
+            "Failed to commit tracked events",
+            exc_info=True,
+            extra={"extra_fields": {"card_id": str(card_id), "error": str(e)}}
+        )
+
+
 @router.get("/c/{card_id}", response_class=HTMLResponse)
 @limiter.limit("60/minute")
 async def get_card_page(
@@ -52,34 +66,21 @@ async def get_card_page(
 
     card, attendee = row
 
-    # Track scan (aggregate only) - only if we have an event_id
-    if attendee and attendee.event_id:
-        today = date.today()
-        # Use ORM insert with on_conflict_do_update for upsert behavior
-        stmt = insert(ScanDaily).values(
-            day=today,
-            tenant_id=card.tenant_id,
-            event_id=attendee.event_id,
-            card_id=card.card_id,
-            scan_count=1,
-            vcard_downloads=0
-        ).on_conflict_do_update(
-            index_elements=['day', 'tenant_id', 'event_id', 'card_id'],
-            set_={'scan_count': ScanDaily.scan_count + 1}
-        )
-        await db.execute(stmt)
-        await db.commit()
-
-    # Track detailed card view event (legacy table)
+    # Track detailed card view event (legacy table). scans_daily is rolled
+    # up from card_view_events by the card_view_rollup trigger.
+    # Each tracking write runs in a savepoint: a failure rolls back only
+    # that write, and the loaded card stays usable for the response
     source_type = "qr_scan" if "qr" in request.headers.get("referer", "").lower() else "direct_link"
     try:
-        await AnalyticsService.track_card_view(
-            db=db,
-            card=card,
-            event_id=attendee.event_id if attendee else None,
-            source_type=source_type,
-            request=request
-        )
+        async with db.begin_nested():
+            await AnalyticsService.track_card_view(
+                db=db,
+                card=card,
+                event_id=attendee.event_id if attendee else None,
+                source_type=source_type,
+                request=request,
+                autocommit=False  # Committed with the analytics_events row below
+            )
     except Exception as e:
         # Don't fail the request if analytics tracking fails
         logger.warning(
@@ -98,28 +99,27 @@ async def get_card_page(
 
         # Parse user agent for device detection
         user_agent_str = request.headers.get("user-agent", "")
-        device_info = AnalyticsService._parse_user_agent(user_agent_str)
+        device_info = parse_user_agent(user_agent_str)
 
         # Get IP address for geo tracking
         ip_address = request.client.host if request.client else None
 
-        await db.execute(
-            AnalyticsEvent.__table__.insert().values(
-                tenant_id=card.tenant_id,
-                event_type_id=attendee.event_id if attendee else None,
-                event_name="card_viewed",
-                category="engagement",
-                card_id=card.card_id,
-                attendee_id=attendee.attendee_id if attendee else None,
-                user_agent=user_agent_str,
-                device_type=device_info.get("device_type"),
-                os=device_info.get("os"),
-                browser=device_info.get("browser"),
-                ip_address=ip_address,
-                properties={"source_type": source_type}
+        async with db.begin_nested():
+            await db.execute(
+                AnalyticsEvent.__table__.insert().values(
+                    tenant_id=card.tenant_id,
+                    event_type_id=attendee.event_id if attendee else None,
+                    event_name="card_viewed",
+                    category="engagement",
+                    card_id=card.card_id,
+                    attendee_id=attendee.attendee_id if attendee else None,
+                    device_type=device_info.device_type,
+                    os=device_info.os,
+                    browser=device_info.browser,
+                    ip_address=ip_address,
+                    properties={"source_type": source_type}
+                )
             )
-        )
-        await db.commit()
     except Exception as e:
         logger.warning(f"Failed to track card view in Enhanced Analytics: {e}")
 
@@ -204,6 +204,9 @@ async def get_card_page(
     </html>
     """
 
+    # The response is fully built, so a failed commit cannot touch the card
+    await _commit_tracking(db, card_id)
+
     return HTMLResponse(content=html)
 
 
@@ -229,34 +232,20 @@ async def download_vcard(
 
     card, attendee = row
 
-    # Track download - only if we have an event_id
-    if attendee and attendee.event_id:
-        today = date.today()
-        await db.execute(
-            text("""
-            INSERT INTO scans_daily (day, tenant_id, event_id, card_id, scan_count, vcard_downloads)
-            VALUES (:day, :tenant_id, :event_id, :card_id, 0, 1)
-            ON CONFLICT (day, tenant_id, event_id, card_id)
-            DO UPDATE SET vcard_downloads = scans_daily.vcard_downloads + 1
-            """),
-            {
-                "day": today,
-                "tenant_id": card.tenant_id,
-                "event_id": attendee.event_id,
-                "card_id": card.card_id
-            }
-        )
-        await db.commit()
-
-    # Track contact export event (legacy table)
+    # Track contact export event (legacy table). scans_daily is rolled
+    # up from contact_export_events by the contact_export_rollup trigger.
+    # Each tracking write runs in a savepoint: a failure rolls back only
+    # that write, and the loaded card stays usable for the response
     try:
-        await AnalyticsService.track_contact_export(
-            db=db,
-            card=card,
-            event_id=attendee.event_id if attendee else None,
-            export_type="vcard_download",
-            request=request
-        )
+        async with db.begin_nested():
+            await AnalyticsService.track_contact_export(
+                db=db,
+                card=card,
+                event_id=attendee.event_id if attendee else None,
+                export_type="vcard_download",
+                request=request,
+                autocommit=False  # Committed with the analytics_events row below
+            )
     except Exception as e:
         # Don't fail the request if analytics tracking fails
         logger.warning(
@@ -275,28 +264,27 @@ async def download_vcard(
 
         # Parse user agent for device detection
         user_agent_str = request.headers.get("user-agent", "")
-        device_info = AnalyticsService._parse_user_agent(user_agent_str)
+        device_info = parse_user_agent(user_agent_str)
 
         # Get IP address for geo tracking
         ip_address = request.client.host if request.client else None
 
-        await db.execute(
-            AnalyticsEvent.__table__.insert().values(
-                tenant_id=card.tenant_id,
-                event_type_id=attendee.event_id if attendee else None,
-                event_name="vcard_downloaded",
-                category="conversion",
-                card_id=card.card_id,
-                attendee_id=attendee.attendee_id if attendee else None,
-                user_agent=user_agent_str,
-                device_type=device_info.get("device_type"),
-                os=device_info.get("os"),
-                browser=device_info.get("browser"),
-                ip_address=ip_address,
-                properties={"export_type": "vcard_download"}
+        async with db.begin_nested():
+            await db.execute(
+                AnalyticsEvent.__table__.insert().values(
+                    tenant_id=card.tenant_id,
+                    event_type_id=attendee.event_id if attendee else None,
+                    event_name="vcard_downloaded",
+                    category="conversion",
+                    card_id=card.card_id,
+                    attendee_id=attendee.attendee_id if attendee else None,
+                    device_type=device_info.device_type,
+                    os=device_info.os,
+                    browser=device_info.browser,
+                    ip_address=ip_address,
+                    properties={"export_type": "vcard_download"}
+                )
             )
-        )
-        await db.commit()
     except Exception as e:
         logger.warning(f"Failed to track vCard download in Enhanced Analytics: {e}")
 
@@ -314,6 +302,8 @@ async def download_vcard(
     # Return as downloadable file
     filename = f"{card.display_name.replace(' ', '_')}.vcf"
 
+    await _commit_tracking(db, card_id)
+
     return Response(
         content=vcard_str,
         media_type="text/vcard",
@@ -323,6 +313,35 @@ async def download_vcard(
     )
 
 
+# The QR for a card only encodes its URL, so it never changes and CDNs and
+# email image proxies can keep it for a long time
+_QR_CACHE_CONTROL = "public, max-age=2592000, immutable"  # 30 days
+
+# Legacy S3-stored QR PNGs are served through presigned redirects
+_QR_PRESIGN_SECONDS = 86400
+
+
+@router.get("/qr/{card_id}.svg")
+async def get_qr_code_svg(
+    card_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get QR code SVG image for a card"""
+    result = await db.execute(
+        select(QRCode.url).where(QRCode.card_id == card_id)
+    )
+    qr_url = result.scalar_one_or_none()
+
+    if not qr_url:
+        raise QRCodeNotFoundError(card_id=str(card_id))
+
+    return Response(
+        content=await run_cpu_bound(generate_qr_code_svg, qr_url),
+        media_type="image/svg+xml",
+        headers={"Cache-Control": _QR_CACHE_CONTROL}
+    )
+
+
 @router.get("/qr/{card_id}")
 async def get_qr_code(
     card_id: uuid.UUID,
@@ -336,23 +355,66 @@ async def get_qr_code(
     )
     qr_code = result.scalar_one_or_none()
 
-    if not qr_code or not qr_code.s3_key_png:
+    if not qr_code:
         raise QRCodeNotFoundError(card_id=str(card_id))
 
-    # Fetch from S3
-    try:
-        png_bytes = s3_client.get_file(qr_code.s3_key_png)
-
+    # Cards created before QR codes were rendered on request still have a PNG in S3
+    if not qr_code.s3_key_png:
+        png_bytes = await run_cpu_bound(generate_qr_code, qr_code.url)
         return Response(
             content=png_bytes,
             media_type="image/png",
-            headers={
-                "Cache-Control": "public, max-age=86400",  # Cache for 1 day
-                "Content-Type": "image/png"
-            }
+            headers={"Cache-Control": _QR_CACHE_CONTROL}
         )
-    except Exception as e:
-        raise S3DownloadError(key=qr_code.s3_key_png, error=str(e))
+
+    # Send the client to S3 directly instead of proxying the bytes
+    presigned_url = await asyncio.to_thread(
+        s3_client.get_presigned_url, qr_code.s3_key_png, expiration=_QR_PRESIGN_SECONDS
+    )
+    if not presigned_url:
+        raise S3DownloadError(key=qr_code.s3_key_png, error="Could not presign QR code URL")
+
+    return RedirectResponse(
+        presigned_url,
+        status_code=307,
+        # The redirect must not outlive the signature
+        headers={"Cache-Control": f"public, max-age={_QR_PRESIGN_SECONDS // 2}"}
+    )
+
+
+# Apple Wallet downloads are short-lived redirects; the email keeps the
+# stable API URL since a presigned link would expire in the inbox
+_PKPASS_PRESIGN_SECONDS = 3600
+
+
+@router.get(f"{settings.API_V1_STR}/passes/apple/{{card_id}}")
+async def get_apple_wallet_pass(
+    card_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Redirect to the card's Apple Wallet pass (.pkpass) in S3"""
+    result = await db.execute(
+        select(Card.tenant_id).where(Card.card_id == card_id)
+    )
+    tenant_id = result.scalar_one_or_none()
+
+    if not tenant_id:
+        raise CardNotFoundError(card_id=str(card_id))
+
+    # Key written by CardService._generate_apple_wallet_pass; the object is
+    # stored with the pkpass content type, so S3 serves it as-is
+    pkpass_key = f"passes/apple/{tenant_id}/{card_id}.pkpass"
+    presigned_url = await asyncio.to_thread(
+        s3_client.get_presigned_url, pkpass_key, expiration=_PKPASS_PRESIGN_SECONDS
+    )
+    if not presigned_url:
+        raise S3DownloadError(key=pkpass_key, error="Could not presign wallet pass URL")
+
+    return RedirectResponse(
+        presigned_url,
+        status_code=302,
+        headers={"Cache-Control": "private, no-store"}
+    )
 
 
 @router.get("/api/cards/{card_id}", response_model=CardResponse)
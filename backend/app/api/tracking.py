@@ -10,75 +10,17 @@ from fastapi import APIRouter, Depends, Request, Response
 from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import Optional
 import uuid
 
-from datetime import datetime, timedelta
-
-from app.core.database import get_db, AsyncSessionLocal
+from app.core.database import get_db
 from app.models.database import Card, EmailEvent, MessageContext
 from app.services.analytics_service import AnalyticsService
+from app.services.message_context_service import get_message_context
 
 
 router = APIRouter(prefix="/track", tags=["tracking"])
 
 
-def store_message_context(
-    message_id: str,
-    card_id: uuid.UUID,
-    tenant_id: uuid.UUID,
-    event_id: Optional[uuid.UUID] = None,
-    attendee_id: Optional[uuid.UUID] = None,
-    recipient_email: str = ""
-):
-    """
-    Store message context for tracking correlation in database
-
-    Note: This is a synchronous function that uses asyncio.run for database operations.
-    It's called from synchronous email sending code.
-    """
-    import asyncio
-    from datetime import datetime
-
-    async def _store():
-        async with AsyncSessionLocal() as db:
-            context = MessageContext(
-                message_id=message_id,
-                card_id=card_id,
-                tenant_id=tenant_id,
-                event_id=event_id,
-                attendee_id=attendee_id,
-                recipient_email=recipient_email,
-                expires_at=datetime.utcnow() + timedelta(days=7)
-            )
-            db.add(context)
-            await db.commit()
-
-    try:
-        asyncio.run(_store())
-    except Exception as e:
-        import logging
-        logging.getLogger(__name__).warning(f"Failed to store message context: {str(e)}")
-
-
-async def get_message_context(message_id: str, db: AsyncSession) -> Optional[dict]:
-    """Retrieve message context from database"""
-    result = await db.execute(
-        select(MessageContext).where(MessageContext.message_id == message_id)
-    )
-    context = result.scalar_one_or_none()
-
-    if context:
-        return {
-            "card_id": context.card_id,
-            "tenant_id": context.tenant_id,
-            "event_id": context.event_id,
-            "attendee_id": context.attendee_id,
-            "recipient_email": context.recipient_email
-        }
-    return None
-
-
 @router.get("/email/open/{message_id}")
 async def track_email_open(
     message_id: str,
@@ -187,7 +129,8 @@ async def track_email_click(
                 event_id=context.get("event_id"),
                 attendee_id=context.get("attendee_id"),
                 link_url=url,
-                request=request
+                request=request,
+                autocommit=False
             )
 
             # Track wallet button clicks separately
@@ -209,8 +152,12 @@ async def track_email_click(
                             event_id=context["event_id"],
                             platform=platform,
                             event_type="email_clicked",
-                            request=request
+                            request=request,
+                            autocommit=False
                         )
+
+            # One commit for the click and wallet events
+            await db.commit()
         except Exception as e:
             # Log but don't fail redirect
             import logging
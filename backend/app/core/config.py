@@ -16,12 +16,30 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DB_POOL_SIZE: int = 5
     DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 300  # Seconds before a pooled connection is replaced
+    DB_QUERY_CACHE_SIZE: int = 1200  # SQLAlchemy compiled statement cache entries
+
+    # CPU-bound rendering (QR codes); 0 uses threads (required on Lambda)
+    CPU_PROCESS_POOL_WORKERS: int = 0
+
+    # Analytics event writes
+    ANALYTICS_BATCH_WRITES: bool = False  # Needs a long-running process; Lambda freezes background tasks
+    ANALYTICS_BATCH_SIZE: int = 1000
+    ANALYTICS_FLUSH_INTERVAL_MS: int = 250
+    ANALYTICS_QUEUE_SIZE: int = 50000  # Per table; writes fall back to inline inserts when full
+    CLIENT_FINGERPRINT_CACHE_SIZE: int = 10000  # Known fp_ids skipped by the upsert
+    ANALYTICS_USE_DAILY_ROLLUP: bool = False  # Read past days from mv_daily_card_views
+
+    # Feature flags
+    FEATURE_FLAG_CACHE_SIZE: int = 4096
+    FEATURE_FLAG_CACHE_TTL_SECONDS: int = 60  # Upper bound on staleness without NOTIFY
 
     # AWS
     AWS_REGION: str = "us-east-1"
     S3_BUCKET_ASSETS: str
     S3_BUCKET_UPLOADS: str
     SQS_QUEUE_URL: str  # Pass generation queue
+    QR_CDN_BASE: Optional[str] = None  # CDN (e.g. CloudFront) in front of GET /qr/{card_id} for email QR images
 
     # Cognito
     COGNITO_USER_POOL_ID: str
@@ -70,6 +88,10 @@ class Settings(BaseSettings):
     GOOGLE_WALLET_SERVICE_ACCOUNT_FILE: Optional[str] = None  # Path to JSON key file
     GOOGLE_WALLET_ORIGINS: list[str] = []  # Empty by default for email compatibility
     GOOGLE_WALLET_CLASS_SUFFIX: str = "event_pass"  # Suffix for pass class IDs (change to force new class creation)
+    GOOGLE_WALLET_CLASS_CACHE_TTL_SECONDS: int = 3600  # Re-check an event's pass class after this long
+
+    # Brand images (logo/icon/strip) fetched for wallet passes
+    BRAND_IMAGE_CACHE_TTL_SECONDS: int = 3600
 
     class Config:
         case_sensitive = True
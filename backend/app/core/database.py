@@ -1,15 +1,26 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
+import orjson
 
 from app.core.config import settings
 
+
+def json_serializer(value: Any) -> str:
+    """Serialize JSON/JSONB bind values with orjson (handles UUID and datetime natively)"""
+    return orjson.dumps(value).decode()
+
+
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
     pool_size=settings.DB_POOL_SIZE,
     max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    json_serializer=json_serializer,
+    json_deserializer=orjson.loads,
     echo=False,
 )
 
@@ -0,0 +1,54 @@
+"""
+Executors for CPU-bound work
+
+Rendering (QR PNG/SVG) holds the GIL, so threads only keep it off the event
+loop. With CPU_PROCESS_POOL_WORKERS > 0 it runs in a process pool instead
+and uses every core. The pool is off by default: AWS Lambda has no
+/dev/shm, which multiprocessing needs, so it is only for long-running
+container deployments.
+"""
+import asyncio
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """Create the process pool on first use, if enabled"""
+    global _process_pool
+    if _process_pool is None and settings.CPU_PROCESS_POOL_WORKERS > 0:
+        _process_pool = ProcessPoolExecutor(max_workers=settings.CPU_PROCESS_POOL_WORKERS)
+    return _process_pool
+
+
+async def run_cpu_bound(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a CPU-bound function off the event loop
+
+    Args:
+        func: Module-level (picklable) function
+        *args, **kwargs: Picklable arguments
+
+    Returns:
+        The function's return value
+    """
+    pool = _get_process_pool()
+    if pool is None:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+
+
+def shutdown_process_pool() -> None:
+    """Stop the process pool's workers"""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
@@ -6,10 +8,15 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
 from app.core.config import settings
+from app.core.database import engine
+from app.core.executors import shutdown_process_pool
 from app.core.logging import setup_logging, get_logger
 from app.middleware.correlation import CorrelationMiddleware
 from app.middleware.error_handler import register_error_handlers
 from app.api import admin, public, tracking, health, analytics
+from app.services.feature_flag_service import start_flag_listener, stop_flag_listener
+from app.services.analytics_writer import analytics_writer
+from app.services.card_service import preload_wallet_generators
 
 # Configure structured logging
 setup_logging(level=settings.LOG_LEVEL if hasattr(settings, 'LOG_LEVEL') else "INFO")
@@ -18,12 +25,35 @@ logger = get_logger(__name__)
 # Initialize rate limiter
 limiter = Limiter(key_func=get_remote_address)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background listeners"""
+    try:
+        await start_flag_listener(engine)
+    except Exception as e:
+        # Flags still resolve; the cache just falls back to its TTL
+        logger.warning(f"Feature flag listener unavailable: {e}")
+
+    if settings.ANALYTICS_BATCH_WRITES:
+        await analytics_writer.start()
+
+    preload_wallet_generators()
+
+    yield
+
+    await analytics_writer.stop()
+    await stop_flag_listener()
+    shutdown_process_pool()
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Add rate limiter to app state
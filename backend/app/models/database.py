@@ -1,16 +1,67 @@
-from sqlalchemy import Column, String, DateTime, Text, Boolean, Integer, BigInteger, Date, ForeignKey
+from sqlalchemy import (
+    Column, String, DateTime, Text, Boolean, Integer, BigInteger, Date, ForeignKey, Index, CHAR,
+    UniqueConstraint, text
+)
 from sqlalchemy.dialects.postgresql import UUID, JSONB, INET
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime
-import uuid
+from typing import Dict, Optional
 
 from app.core.database import Base
 
 
+class CharCode(TypeDecorator):
+    """
+    Stores a small fixed vocabulary as single-character codes
+
+    Subclasses define ``codes``. Values outside the vocabulary are stored
+    as the code for "unknown".
+    """
+    impl = CHAR(1)
+    cache_ok = True
+
+    codes: Dict[str, str] = {}
+    values: Dict[str, str] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.values = {code: value for value, code in cls.codes.items()}
+
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[str]:
+        if value is None:
+            return None
+        return self.codes.get(value, self.codes["unknown"])
+
+    def process_result_value(self, value: Optional[str], dialect) -> Optional[str]:
+        return self.decode(value)
+
+    @classmethod
+    def decode(cls, code: Optional[str]) -> Optional[str]:
+        """Map a stored code back to its value (for raw SQL results)"""
+        if code is None:
+            return None
+        return cls.values.get(code, "unknown")
+
+
+class PlatformCode(CharCode):
+    """Wallet platform: apple / google"""
+    codes = {"apple": "a", "google": "g", "unknown": "u"}
+
+
+class DeviceTypeCode(CharCode):
+    """Parsed device class, or the platform-implied device for server-side events"""
+    codes = {
+        "mobile": "m", "tablet": "t", "desktop": "d", "bot": "b",
+        "ios": "i", "android": "n", "unknown": "u"
+    }
+
+
 class Tenant(Base):
     __tablename__ = "tenants"
 
-    tenant_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
     name = Column(Text, nullable=False)
     status = Column(Text, nullable=False, default="active")
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -19,8 +70,11 @@ class Tenant(Base):
 
 class Brand(Base):
     __tablename__ = "brands"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "brand_key", name="brands_tenant_id_brand_key_key"),
+    )
 
-    brand_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    brand_id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.tenant_id", ondelete="CASCADE"), nullable=False)
     brand_key = Column(Text, nullable=False)
     display_name = Column(Text, nullable=False)
@@ -34,7 +88,7 @@ class Brand(Base):
 class User(Base):
     __tablename__ = "users"
 
-    user_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.tenant_id", ondelete="CASCADE"), nullable=False)
     email = Column(String, nullable=False)
     full_name = Column(Text)
@@ -47,8 +101,12 @@ class User(Base):
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        # Tenant-wide slug uniqueness (implies uniqueness per brand)
+        UniqueConstraint("tenant_id", "slug", name="events_tenant_id_slug_key"),
+    )
 
-    event_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    event_id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.tenant_id", ondelete="CASCADE"), nullable=False)
     brand_id = Column(UUID(as_uuid=True), ForeignKey("brands.brand_id", ondelete="CASCADE"), nullable=False)
     name = Column(Text, nullable=False)
@@ -62,11 +120,17 @@ class Event(Base):
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
 
+    # Relationships never lazy-load; opt in with joinedload/selectinload
+    brand = relationship("Brand", lazy="raise")
+
 
 class Attendee(Base):
     __tablename__ = "attendees"
+    __table_args__ = (
+        UniqueConstraint("event_id", "email", name="uq_attendee_event_email"),
+    )
 
-    attendee_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    attendee_id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
     event_id = Column(UUID(as_uuid=True), ForeignKey("events.event_id", ondelete="CASCADE"), nullable=False)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.tenant_id", ondelete="CASCADE"), nullable=False)
     email = Column(String)
@@ -81,11 +145,13 @@ class Attendee(Base):
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
 
+    event = relationship("Event", lazy="raise")
+
 
 class Card(Base):
     __tablename__ = "cards"
 
-    card_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    card_id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.tenant_id", ondelete="CASCADE"), nullable=False)
     owner_attendee_id = Column(UUID(as_uuid=True), ForeignKey("attendees.attendee_id", ondelete="SET NULL"))
     owner_user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id", ondelete="SET NULL"))
@@ -96,16 +162,19 @@ class Card(Base):
     title = Column(Text)
     avatar_s3_key = Column(Text)
     links_json = Column(JSONB, nullable=False, default={})
-    vcard_rev = Column(Integer, nullable=False, default=1)
+    vcard_rev = Column(Integer, nullable=False, default=1, server_default=text("1"))  # Raw card INSERTs omit it
     is_personal = Column(Boolean, nullable=False, default=True)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
 
+    # attendees.card_id also points at cards, so the join column is explicit
+    owner_attendee = relationship("Attendee", foreign_keys=[owner_attendee_id], lazy="raise")
+
 
 class WalletPass(Base):
     __tablename__ = "wallet_passes"
 
-    wallet_pass_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    wallet_pass_id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
     card_id = Column(UUID(as_uuid=True), ForeignKey("cards.card_id", ondelete="CASCADE"), nullable=False)
     event_id = Column(UUID(as_uuid=True), ForeignKey("events.event_id", ondelete="CASCADE"))
     platform = Column(Text, nullable=False)
@@ -115,11 +184,13 @@ class WalletPass(Base):
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
 
+    card = relationship("Card", lazy="raise")
+
 
 class QRCode(Base):
     __tablename__ = "qr_codes"
 
-    qr_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    qr_id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.tenant_id", ondelete="CASCADE"), nullable=False)
     event_id = Column(UUID(as_uuid=True), ForeignKey("events.event_id", ondelete="CASCADE"))
     card_id = Column(UUID(as_uuid=True), ForeignKey("cards.card_id", ondelete="CASCADE"), nullable=False)
@@ -127,8 +198,11 @@ class QRCode(Base):
     s3_key_png = Column(Text)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
+    card = relationship("Card", lazy="raise")
+
 
 class ScanDaily(Base):
+    """Daily scan rollup, maintained by triggers on the event tables"""
     __tablename__ = "scans_daily"
 
     day = Column(Date, primary_key=True, nullable=False)
@@ -144,7 +218,7 @@ class ScanDaily(Base):
 class Exhibitor(Base):
     __tablename__ = "exhibitors"
 
-    exhibitor_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    exhibitor_id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
     event_id = Column(UUID(as_uuid=True), ForeignKey("events.event_id", ondelete="CASCADE"), nullable=False)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.tenant_id", ondelete="CASCADE"), nullable=False)
     name = Column(Text, nullable=False)
@@ -157,7 +231,7 @@ class Exhibitor(Base):
 class ExhibitorLead(Base):
     __tablename__ = "exhibitor_leads"
 
-    lead_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    lead_id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
     exhibitor_id = Column(UUID(as_uuid=True), ForeignKey("exhibitors.exhibitor_id", ondelete="CASCADE"), nullable=False)
     event_id = Column(UUID(as_uuid=True), ForeignKey("events.event_id", ondelete="CASCADE"), nullable=False)
     captured_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -193,7 +267,7 @@ class AuditLog(Base):
 class PassGenerationJob(Base):
     __tablename__ = "pass_generation_jobs"
 
-    job_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
     attendee_id = Column(UUID(as_uuid=True), ForeignKey("attendees.attendee_id", ondelete="CASCADE"), nullable=False)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.tenant_id", ondelete="CASCADE"), nullable=False)
 
@@ -244,8 +318,33 @@ class MessageContext(Base):
     expires_at = Column(DateTime(timezone=True), nullable=False)  # created_at + 7 days
 
 
+class ClientFingerprint(Base):
+    """
+    Deduplicated client dimension for the event tables
+
+    The raw User-Agent header is stored once per distinct value; event rows
+    reference it through fingerprint_id. fp_id is a stable 64-bit hash of
+    the User-Agent so it can be computed without a lookup.
+    """
+    __tablename__ = "client_fingerprints"
+
+    fp_id = Column(BigInteger, primary_key=True, autoincrement=False)
+    user_agent = Column(Text, nullable=False)
+    device_type = Column(String(20))
+    browser = Column(String(100))
+    os = Column(String(100))
+    first_seen_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
 class EmailEvent(Base):
     __tablename__ = "email_events"
+    __table_args__ = (
+        Index(
+            "idx_email_events_tenant_event_occurred",
+            "tenant_id", "event_id", "occurred_at",
+            postgresql_include=["event_type"]
+        ),
+    )
 
     email_event_id = Column(BigInteger, primary_key=True, autoincrement=True)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.tenant_id", ondelete="CASCADE"), nullable=False)
@@ -262,8 +361,9 @@ class EmailEvent(Base):
 
     # Event metadata
     link_url = Column(Text)
-    user_agent = Column(Text)
+    user_agent = Column(Text)  # Legacy rows only; see fingerprint_id
     ip_address = Column(INET)
+    fingerprint_id = Column(BigInteger, ForeignKey("client_fingerprints.fp_id"))
 
     # Timestamps
     occurred_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -274,6 +374,14 @@ class EmailEvent(Base):
 
 class WalletPassEvent(Base):
     __tablename__ = "wallet_pass_events"
+    __table_args__ = (
+        Index(
+            "idx_wallet_events_tenant_event_occurred",
+            "tenant_id", "event_id", "occurred_at",
+            postgresql_include=["platform", "event_type"]
+        ),
+        Index("idx_wallet_events_card_type", "card_id", "event_type", postgresql_include=["platform"]),
+    )
 
     wallet_event_id = Column(BigInteger, primary_key=True, autoincrement=True)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.tenant_id", ondelete="CASCADE"), nullable=False)
@@ -281,15 +389,16 @@ class WalletPassEvent(Base):
     card_id = Column(UUID(as_uuid=True), ForeignKey("cards.card_id", ondelete="CASCADE"), nullable=False)
 
     # Platform: apple or google
-    platform = Column(String(20), nullable=False)
+    platform = Column(PlatformCode, nullable=False)
 
     # Event type: generated, email_clicked, added_to_wallet, removed, updated
     event_type = Column(String(50), nullable=False)
 
     # Device/user context
-    user_agent = Column(Text)
+    user_agent = Column(Text)  # Legacy rows only; see fingerprint_id
     ip_address = Column(INET)
-    device_type = Column(String(20))
+    fingerprint_id = Column(BigInteger, ForeignKey("client_fingerprints.fp_id"))
+    device_type = Column(DeviceTypeCode)
 
     # Timestamps
     occurred_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -300,6 +409,16 @@ class WalletPassEvent(Base):
 
 class CardViewEvent(Base):
     __tablename__ = "card_view_events"
+    __table_args__ = (
+        # Covering index: overview counts and breakdowns are index-only scans
+        Index(
+            "idx_cve_tenant_event_occurred",
+            "tenant_id", "event_id", "occurred_at",
+            postgresql_include=["source_type", "device_type", "card_id"]
+        ),
+        # Card detail unique-viewer count reads ip_address from the index
+        Index("idx_card_views_card_ip", "card_id", postgresql_include=["ip_address"]),
+    )
 
     view_event_id = Column(BigInteger, primary_key=True, autoincrement=True)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.tenant_id", ondelete="CASCADE"), nullable=False)
@@ -311,11 +430,12 @@ class CardViewEvent(Base):
     referrer_url = Column(Text)
 
     # Device/user context
-    user_agent = Column(Text)
+    user_agent = Column(Text)  # Legacy rows only; see fingerprint_id
     ip_address = Column(INET)
-    device_type = Column(String(20))
-    browser = Column(String(100))
-    os = Column(String(100))
+    fingerprint_id = Column(BigInteger, ForeignKey("client_fingerprints.fp_id"))
+    device_type = Column(DeviceTypeCode)
+    browser = Column(String(100))  # Legacy rows only; see fingerprint_id
+    os = Column(String(100))  # Legacy rows only; see fingerprint_id
 
     # Session tracking
     session_id = Column(Text)
@@ -329,6 +449,14 @@ class CardViewEvent(Base):
 
 class ContactExportEvent(Base):
     __tablename__ = "contact_export_events"
+    __table_args__ = (
+        Index(
+            "idx_contact_exports_tenant_event_occurred",
+            "tenant_id", "event_id", "occurred_at",
+            postgresql_include=["export_type"]
+        ),
+        Index("idx_contact_exports_card_type", "card_id", postgresql_include=["export_type"]),
+    )
 
     export_event_id = Column(BigInteger, primary_key=True, autoincrement=True)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.tenant_id", ondelete="CASCADE"), nullable=False)
@@ -339,9 +467,10 @@ class ContactExportEvent(Base):
     export_type = Column(String(50), nullable=False)
 
     # Device/user context
-    user_agent = Column(Text)
+    user_agent = Column(Text)  # Legacy rows only; see fingerprint_id
     ip_address = Column(INET)
-    device_type = Column(String(20))
+    fingerprint_id = Column(BigInteger, ForeignKey("client_fingerprints.fp_id"))
+    device_type = Column(DeviceTypeCode)
 
     # Timestamps
     occurred_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -366,7 +495,7 @@ class AnalyticsEvent(Base):
     __tablename__ = "analytics_events"
 
     # Primary key
-    event_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    event_id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
 
     # Tenant context (required for multi-tenant isolation)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.tenant_id", ondelete="CASCADE"), nullable=False)
@@ -387,7 +516,7 @@ class AnalyticsEvent(Base):
     properties = Column(JSONB, nullable=False, default={})
 
     # Technical/device information
-    user_agent = Column(Text)
+    user_agent = Column(Text)  # Legacy rows only; the app stores the parsed fields below
     device_type = Column(String(50))
     os = Column(String(50))
     browser = Column(String(50))
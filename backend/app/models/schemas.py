@@ -115,6 +115,10 @@ class PassIssuanceRequest(BaseModel):
     include_wallet: bool = False
 
 
+class BulkPassIssuanceRequest(BaseModel):
+    attendee_ids: list[UUID4] = Field(..., min_length=1, max_length=500)
+
+
 # Wallet Pass Schemas
 class WalletPass(BaseModel):
     """Digital wallet pass (Apple Wallet, Google Wallet, etc.)"""
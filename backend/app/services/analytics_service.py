@@ -5,20 +5,79 @@ Handles all analytics tracking and reporting for OutreachPass.
 Tracks card views, email engagement, wallet passes, and contact exports.
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, case, desc
-from datetime import datetime, date, timedelta
-from typing import Optional, Dict, Any, List
+from sqlalchemy import (
+    select, insert, func, and_, desc, cast, literal, union_all, table, column,
+    Text, BigInteger, DateTime
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime, date, timedelta, timezone
+from typing import Optional, Dict, Any, List, NamedTuple, Type
+from dataclasses import dataclass
+from functools import lru_cache
+import hashlib
+import re
 import uuid
 from fastapi import Request
+from user_agents import parse as _parse_ua
 
+from app.core.config import settings
+from app.core.database import Base
 from app.models.database import (
-    CardViewEvent, EmailEvent, WalletPassEvent,
-    ContactExportEvent, Card, Event, Attendee, Tenant, AnalyticsEvent
+    CardViewEvent, EmailEvent, WalletPassEvent, ContactExportEvent,
+    Card, Event, Attendee, Tenant, AnalyticsEvent, DeviceTypeCode, PlatformCode
+)
+from app.services.analytics_writer import (
+    analytics_writer, upsert_client_fingerprints, remember_client_fingerprints,
+    is_known_client_fingerprint
 )
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Daily card view rollup (migrations/add_daily_card_view_rollup.sql). Not ORM
+# models: the view and its state row are maintained by refresh_daily_card_views()
+_daily_card_views = table(
+    "mv_daily_card_views",
+    column("tenant_id"),
+    column("event_id"),
+    column("day_start"),
+    column("source_type"),
+    column("device_type"),
+    column("views")
+)
+_rollup_state = table(
+    "analytics_rollup_state",
+    column("rollup_name"),
+    column("covered_until")
+)
+
+
+class UAInfo(NamedTuple):
+    """Parsed User-Agent fields"""
+    device_type: Optional[str]
+    browser: Optional[str]
+    os: Optional[str]
+
+
+_EMPTY_UA = UAInfo(None, None, None)
+
+
+class RequestContext(NamedTuple):
+    """Request fields recorded on tracked events"""
+    user_agent: str
+    ip_address: Optional[str]
+    referrer: Optional[str]
+
+
+_EMPTY_REQUEST = RequestContext("", None, None)
+
+
+@dataclass(slots=True)
+class TrackedEvent:
+    """Identity of a written analytics event row"""
+    id: int
+    occurred_at: datetime
+
 
 class AnalyticsService:
     """Business logic for analytics tracking and reporting"""
@@ -33,8 +92,9 @@ class AnalyticsService:
         card: Card,
         event_id: Optional[uuid.UUID],
         source_type: str,
-        request: Request
-    ) -> CardViewEvent:
+        request: Request,
+        autocommit: bool = True
+    ) -> Optional[TrackedEvent]:
         """
         Track a card view event with device context
 
@@ -44,31 +104,26 @@ class AnalyticsService:
             event_id: Optional event ID for context
             source_type: View source (qr_scan, direct_link, email_link, share)
             request: FastAPI request for user-agent, IP, referrer
+            autocommit: Commit the event; pass False when the caller commits
 
         Returns:
-            Created CardViewEvent
+            TrackedEvent for the new CardViewEvent row, or None if the write was queued
         """
-        # Parse user agent for device detection
-        user_agent_str = request.headers.get("user-agent", "")
-        device_info = AnalyticsService._parse_user_agent(user_agent_str)
-
-        view_event = CardViewEvent(
-            tenant_id=card.tenant_id,
-            event_id=event_id,
-            card_id=card.card_id,
-            source_type=source_type,
-            referrer_url=request.headers.get("referer"),
-            user_agent=user_agent_str,
-            ip_address=request.client.host if request.client else None,
-            device_type=device_info.get("device_type"),
-            browser=device_info.get("browser"),
-            os=device_info.get("os"),
-            session_id=request.cookies.get("session_id")  # If session tracking exists
-        )
-
-        db.add(view_event)
-        await db.commit()
-        await db.refresh(view_event)
+        context = request_context(request)
+        device_info = parse_user_agent(context.user_agent, detailed=False)
+        fingerprint = AnalyticsService._fingerprint_row(context.user_agent, device_info)
+
+        view_event = await AnalyticsService._write_event(db, CardViewEvent, {
+            "tenant_id": card.tenant_id,
+            "event_id": event_id,
+            "card_id": card.card_id,
+            "source_type": source_type,
+            "referrer_url": context.referrer,
+            "ip_address": context.ip_address,
+            "fingerprint_id": fingerprint["fp_id"] if fingerprint else None,
+            "device_type": device_info.device_type,
+            "session_id": request.cookies.get("session_id")  # If session tracking exists
+        }, fingerprint, autocommit)
 
         logger.info(
             "Card view tracked",
@@ -76,7 +131,7 @@ class AnalyticsService:
                 "card_id": str(card.card_id),
                 "event_id": str(event_id) if event_id else None,
                 "source_type": source_type,
-                "device_type": device_info.get("device_type")
+                "device_type": device_info.device_type
             }}
         )
 
@@ -93,8 +148,9 @@ class AnalyticsService:
         event_id: Optional[uuid.UUID] = None,
         attendee_id: Optional[uuid.UUID] = None,
         link_url: Optional[str] = None,
-        request: Optional[Request] = None
-    ) -> EmailEvent:
+        request: Optional[Request] = None,
+        autocommit: bool = True
+    ) -> Optional[TrackedEvent]:
         """
         Track email engagement events
 
@@ -109,26 +165,28 @@ class AnalyticsService:
             attendee_id: Optional attendee ID
             link_url: For click events, the clicked link
             request: Optional FastAPI request for tracking opens/clicks
+            autocommit: Commit the event; pass False when the caller commits
 
         Returns:
-            Created EmailEvent
+            TrackedEvent for the new EmailEvent row, or None if the write was queued
         """
-        email_event = EmailEvent(
-            tenant_id=tenant_id,
-            event_id=event_id,
-            card_id=card_id,
-            attendee_id=attendee_id,
-            message_id=message_id,
-            recipient_email=recipient_email,
-            event_type=event_type,
-            link_url=link_url,
-            user_agent=request.headers.get("user-agent") if request else None,
-            ip_address=request.client.host if request and request.client else None
+        context = request_context(request)
+        fingerprint = AnalyticsService._fingerprint_row(
+            context.user_agent, parse_user_agent(context.user_agent, detailed=False)
         )
 
-        db.add(email_event)
-        await db.commit()
-        await db.refresh(email_event)
+        email_event = await AnalyticsService._write_event(db, EmailEvent, {
+            "tenant_id": tenant_id,
+            "event_id": event_id,
+            "card_id": card_id,
+            "attendee_id": attendee_id,
+            "message_id": message_id,
+            "recipient_email": recipient_email,
+            "event_type": event_type,
+            "link_url": link_url,
+            "ip_address": context.ip_address,
+            "fingerprint_id": fingerprint["fp_id"] if fingerprint else None
+        }, fingerprint, autocommit)
 
         logger.info(
             "Email event tracked",
@@ -142,6 +200,58 @@ class AnalyticsService:
 
         return email_event
 
+    @staticmethod
+    async def track_email_events_bulk(
+        db: AsyncSession,
+        events: List[Dict[str, Any]],
+        autocommit: bool = True
+    ) -> int:
+        """
+        Record a burst of email events with one INSERT and one commit
+
+        For notification batches (e.g. SES delivery, open and click events
+        arriving together) where committing each event separately would
+        multiply WAL flushes. Interactive tracking keeps using
+        track_email_event.
+
+        Args:
+            db: Database session
+            events: Dicts with track_email_event's keyword arguments
+                (tenant_id, message_id, recipient_email, event_type and the
+                optional card_id, event_id, attendee_id, link_url); no request
+            autocommit: Commit the batch; pass False when the caller commits
+
+        Returns:
+            Number of events written
+        """
+        if not events:
+            return 0
+
+        rows = [
+            {
+                "tenant_id": event["tenant_id"],
+                "event_id": event.get("event_id"),
+                "card_id": event.get("card_id"),
+                "attendee_id": event.get("attendee_id"),
+                "message_id": event["message_id"],
+                "recipient_email": event["recipient_email"],
+                "event_type": event["event_type"],
+                "link_url": event.get("link_url")
+            }
+            for event in events
+        ]
+
+        await db.execute(insert(EmailEvent), rows)
+        if autocommit:
+            await db.commit()
+
+        logger.info(
+            "Email events tracked",
+            extra={"extra_fields": {"count": len(rows)}}
+        )
+
+        return len(rows)
+
     @staticmethod
     async def track_wallet_event(
         db: AsyncSession,
@@ -149,8 +259,9 @@ class AnalyticsService:
         event_id: uuid.UUID,
         platform: str,
         event_type: str,
-        request: Optional[Request] = None
-    ) -> WalletPassEvent:
+        request: Optional[Request] = None,
+        autocommit: bool = True
+    ) -> Optional[TrackedEvent]:
         """
         Track wallet pass events
 
@@ -161,27 +272,25 @@ class AnalyticsService:
             platform: Wallet platform (apple or google)
             event_type: Event type (generated, email_clicked, added_to_wallet, removed, updated)
             request: Optional FastAPI request for context
+            autocommit: Commit the event; pass False when the caller commits
 
         Returns:
-            Created WalletPassEvent
+            TrackedEvent for the new WalletPassEvent row, or None if the write was queued
         """
-        user_agent_str = request.headers.get("user-agent", "") if request else ""
-        device_info = AnalyticsService._parse_user_agent(user_agent_str)
-
-        wallet_event = WalletPassEvent(
-            tenant_id=card.tenant_id,
-            event_id=event_id,
-            card_id=card.card_id,
-            platform=platform,
-            event_type=event_type,
-            user_agent=user_agent_str if request else None,
-            ip_address=request.client.host if request and request.client else None,
-            device_type=device_info.get("device_type") if request else platform_to_device(platform)
-        )
-
-        db.add(wallet_event)
-        await db.commit()
-        await db.refresh(wallet_event)
+        context = request_context(request)
+        device_info = parse_user_agent(context.user_agent, detailed=False)
+        fingerprint = AnalyticsService._fingerprint_row(context.user_agent, device_info)
+
+        wallet_event = await AnalyticsService._write_event(db, WalletPassEvent, {
+            "tenant_id": card.tenant_id,
+            "event_id": event_id,
+            "card_id": card.card_id,
+            "platform": platform,
+            "event_type": event_type,
+            "ip_address": context.ip_address,
+            "fingerprint_id": fingerprint["fp_id"] if fingerprint else None,
+            "device_type": device_info.device_type if request else platform_to_device(platform)
+        }, fingerprint, autocommit)
 
         logger.info(
             "Wallet event tracked",
@@ -201,8 +310,9 @@ class AnalyticsService:
         card: Card,
         event_id: Optional[uuid.UUID],
         export_type: str,
-        request: Request
-    ) -> ContactExportEvent:
+        request: Request,
+        autocommit: bool = True
+    ) -> Optional[TrackedEvent]:
         """
         Track contact export/download events
 
@@ -212,26 +322,24 @@ class AnalyticsService:
             event_id: Optional event ID
             export_type: Export type (vcard_download, add_to_contacts, copy_email, copy_phone)
             request: FastAPI request for context
+            autocommit: Commit the event; pass False when the caller commits
 
         Returns:
-            Created ContactExportEvent
+            TrackedEvent for the new ContactExportEvent row, or None if the write was queued
         """
-        user_agent_str = request.headers.get("user-agent", "")
-        device_info = AnalyticsService._parse_user_agent(user_agent_str)
-
-        export_event = ContactExportEvent(
-            tenant_id=card.tenant_id,
-            event_id=event_id,
-            card_id=card.card_id,
-            export_type=export_type,
-            user_agent=user_agent_str,
-            ip_address=request.client.host if request.client else None,
-            device_type=device_info.get("device_type")
-        )
-
-        db.add(export_event)
-        await db.commit()
-        await db.refresh(export_event)
+        context = request_context(request)
+        device_info = parse_user_agent(context.user_agent, detailed=False)
+        fingerprint = AnalyticsService._fingerprint_row(context.user_agent, device_info)
+
+        export_event = await AnalyticsService._write_event(db, ContactExportEvent, {
+            "tenant_id": card.tenant_id,
+            "event_id": event_id,
+            "card_id": card.card_id,
+            "export_type": export_type,
+            "ip_address": context.ip_address,
+            "fingerprint_id": fingerprint["fp_id"] if fingerprint else None,
+            "device_type": device_info.device_type
+        }, fingerprint, autocommit)
 
         logger.info(
             "Contact export tracked",
@@ -239,7 +347,7 @@ class AnalyticsService:
                 "card_id": str(card.card_id),
                 "event_id": str(event_id) if event_id else None,
                 "export_type": export_type,
-                "device_type": device_info.get("device_type")
+                "device_type": device_info.device_type
             }}
         )
 
@@ -270,105 +378,118 @@ class AnalyticsService:
         Returns:
             Dictionary with summary metrics and breakdowns
         """
-        # Build filters
-        filters = [CardViewEvent.tenant_id == tenant_id]
-        if event_id:
-            filters.append(CardViewEvent.event_id == event_id)
-        if start_date:
-            filters.append(CardViewEvent.occurred_at >= datetime.combine(start_date, datetime.min.time()))
-        if end_date:
-            filters.append(CardViewEvent.occurred_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
-
-        # Total card views
-        view_count_result = await db.execute(
-            select(func.count(CardViewEvent.view_event_id))
-            .where(and_(*filters))
-        )
-        total_views = view_count_result.scalar() or 0
-
-        # Card views by source
-        source_breakdown_result = await db.execute(
-            select(
-                CardViewEvent.source_type,
-                func.count(CardViewEvent.view_event_id).label("count")
+        # Date bounds are computed once and shared by every table's filters
+        start_dt = datetime.combine(start_date, datetime.min.time()) if start_date else None
+        end_dt = datetime.combine(end_date + timedelta(days=1), datetime.min.time()) if end_date else None
+
+        filters = AnalyticsService._date_filters(CardViewEvent, tenant_id, event_id, start_dt, end_dt)
+        email_filters = AnalyticsService._date_filters(EmailEvent, tenant_id, event_id, start_dt, end_dt)
+        wallet_filters = AnalyticsService._date_filters(WalletPassEvent, tenant_id, event_id, start_dt, end_dt)
+        export_filters = AnalyticsService._date_filters(ContactExportEvent, tenant_id, event_id, start_dt, end_dt)
+
+        # Card views grouped by (source, device) once; both breakdowns and
+        # the total are derived from this CTE so the table is scanned once
+        if settings.ANALYTICS_USE_DAILY_ROLLUP:
+            card_views = AnalyticsService._card_views_with_rollup(
+                tenant_id, event_id, start_dt, end_dt
+            ).cte("card_views")
+        else:
+            card_views = (
+                select(
+                    CardViewEvent.source_type,
+                    func.coalesce(cast(CardViewEvent.device_type, Text), "u").label("device_code"),
+                    func.count().label("views")
+                )
+                .where(and_(*filters))
+                .group_by(CardViewEvent.source_type, CardViewEvent.device_type)
+                .cte("card_views")
             )
-            .where(and_(*filters))
-            .group_by(CardViewEvent.source_type)
+        source_counts = (
+            select(card_views.c.source_type, func.sum(card_views.c.views).label("views"))
+            .group_by(card_views.c.source_type)
+            .subquery("source_counts")
         )
-        source_breakdown = {row[0]: row[1] for row in source_breakdown_result}
-
-        # Device type breakdown
-        device_breakdown_result = await db.execute(
-            select(
-                CardViewEvent.device_type,
-                func.count(CardViewEvent.view_event_id).label("count")
-            )
-            .where(and_(*filters))
-            .group_by(CardViewEvent.device_type)
+        device_counts = (
+            select(card_views.c.device_code, func.sum(card_views.c.views).label("views"))
+            .group_by(card_views.c.device_code)
+            .subquery("device_counts")
         )
-        device_breakdown = {row[0] or "unknown": row[1] for row in device_breakdown_result}
 
         # Email engagement
-        email_filters = [EmailEvent.tenant_id == tenant_id]
-        if event_id:
-            email_filters.append(EmailEvent.event_id == event_id)
-        if start_date:
-            email_filters.append(EmailEvent.occurred_at >= datetime.combine(start_date, datetime.min.time()))
-        if end_date:
-            email_filters.append(EmailEvent.occurred_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
-
-        email_stats_result = await db.execute(
+        email_stats = (
             select(
-                func.count(case((EmailEvent.event_type == "sent", 1))).label("sent"),
-                func.count(case((EmailEvent.event_type == "opened", 1))).label("opened"),
-                func.count(case((EmailEvent.event_type == "clicked", 1))).label("clicked")
+                func.count().filter(EmailEvent.event_type == "sent").label("sent"),
+                func.count().filter(EmailEvent.event_type == "opened").label("opened"),
+                func.count().filter(EmailEvent.event_type == "clicked").label("clicked")
             )
             .where(and_(*email_filters))
+            .cte("email_stats")
         )
-        email_stats = email_stats_result.first()
 
         # Wallet pass stats
-        wallet_filters = [WalletPassEvent.tenant_id == tenant_id]
-        if event_id:
-            wallet_filters.append(WalletPassEvent.event_id == event_id)
-        if start_date:
-            wallet_filters.append(WalletPassEvent.occurred_at >= datetime.combine(start_date, datetime.min.time()))
-        if end_date:
-            wallet_filters.append(WalletPassEvent.occurred_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
-
-        wallet_stats_result = await db.execute(
+        wallet_counts = (
             select(
-                WalletPassEvent.platform,
-                func.count(case((WalletPassEvent.event_type == "generated", 1))).label("generated"),
-                func.count(case((WalletPassEvent.event_type == "added_to_wallet", 1))).label("added")
+                cast(WalletPassEvent.platform, Text).label("platform_code"),
+                func.count().filter(WalletPassEvent.event_type == "generated").label("generated"),
+                func.count().filter(WalletPassEvent.event_type == "added_to_wallet").label("added")
             )
             .where(and_(*wallet_filters))
             .group_by(WalletPassEvent.platform)
+            .cte("wallet_counts")
         )
-        wallet_stats = {row[0]: {"generated": row[1], "added": row[2]} for row in wallet_stats_result}
 
-        # Contact exports
-        export_filters = [ContactExportEvent.tenant_id == tenant_id]
-        if event_id:
-            export_filters.append(ContactExportEvent.event_id == event_id)
-        if start_date:
-            export_filters.append(ContactExportEvent.occurred_at >= datetime.combine(start_date, datetime.min.time()))
-        if end_date:
-            export_filters.append(ContactExportEvent.occurred_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
-
-        export_count_result = await db.execute(
-            select(func.count(ContactExportEvent.export_event_id))
-            .where(and_(*export_filters))
+        result = await db.execute(
+            select(
+                select(cast(func.coalesce(func.sum(card_views.c.views), 0), BigInteger))
+                .scalar_subquery().label("total_views"),
+                select(func.jsonb_object_agg(source_counts.c.source_type, source_counts.c.views, type_=JSONB))
+                .scalar_subquery().label("by_source"),
+                select(func.jsonb_object_agg(device_counts.c.device_code, device_counts.c.views, type_=JSONB))
+                .scalar_subquery().label("by_device"),
+                email_stats.c.sent,
+                email_stats.c.opened,
+                email_stats.c.clicked,
+                select(
+                    func.jsonb_object_agg(
+                        wallet_counts.c.platform_code,
+                        func.jsonb_build_object(
+                            "generated", wallet_counts.c.generated,
+                            "added", wallet_counts.c.added
+                        ),
+                        type_=JSONB
+                    )
+                ).scalar_subquery().label("by_platform"),
+                select(cast(func.coalesce(func.sum(wallet_counts.c.generated), 0), BigInteger))
+                .scalar_subquery().label("wallet_generated"),
+                select(cast(func.coalesce(func.sum(wallet_counts.c.added), 0), BigInteger))
+                .scalar_subquery().label("wallet_added"),
+                select(func.count(ContactExportEvent.export_event_id))
+                .where(and_(*export_filters))
+                .scalar_subquery().label("total_exports")
+            )
+            .select_from(email_stats)
         )
-        total_exports = export_count_result.scalar() or 0
+        row = result.one()
+
+        total_views = row.total_views
+        source_breakdown = row.by_source or {}
+        device_breakdown = {
+            DeviceTypeCode.decode(code): count
+            for code, count in (row.by_device or {}).items()
+        }
+        wallet_stats = {
+            PlatformCode.decode(code): stats
+            for code, stats in (row.by_platform or {}).items()
+        }
+        total_exports = row.total_exports
 
         return {
             "total_card_views": total_views,
-            "total_email_sends": email_stats[0] if email_stats else 0,
-            "total_email_opens": email_stats[1] if email_stats else 0,
-            "total_email_clicks": email_stats[2] if email_stats else 0,
-            "total_wallet_passes": sum(s["generated"] for s in wallet_stats.values()),
-            "total_wallet_adds": sum(s["added"] for s in wallet_stats.values()),
+            "total_email_sends": row.sent,
+            "total_email_opens": row.opened,
+            "total_email_clicks": row.clicked,
+            "total_wallet_passes": row.wallet_generated,
+            "total_wallet_adds": row.wallet_added,
             "total_contact_exports": total_exports,
             "breakdown": {
                 "by_source": source_breakdown,
@@ -392,61 +513,65 @@ class AnalyticsService:
         Returns:
             Dictionary with card-specific metrics
         """
-        # Card views
-        view_count_result = await db.execute(
-            select(func.count(CardViewEvent.view_event_id))
-            .where(CardViewEvent.card_id == card_id)
-        )
-        total_views = view_count_result.scalar() or 0
-
-        # Unique viewers (by IP)
-        unique_viewers_result = await db.execute(
-            select(func.count(func.distinct(CardViewEvent.ip_address)))
-            .where(and_(CardViewEvent.card_id == card_id, CardViewEvent.ip_address.isnot(None)))
-        )
-        unique_viewers = unique_viewers_result.scalar() or 0
-
-        # VCard downloads
-        vcard_downloads_result = await db.execute(
-            select(func.count(ContactExportEvent.export_event_id))
-            .where(and_(
-                ContactExportEvent.card_id == card_id,
-                ContactExportEvent.export_type == "vcard_download"
-            ))
-        )
-        vcard_downloads = vcard_downloads_result.scalar() or 0
-
-        # Email opened
-        email_opened_result = await db.execute(
-            select(EmailEvent.occurred_at)
-            .where(and_(
-                EmailEvent.card_id == card_id,
-                EmailEvent.event_type == "opened"
-            ))
-            .order_by(EmailEvent.occurred_at)
-            .limit(1)
-        )
-        email_opened = email_opened_result.scalar()
-
         # Wallet adds by platform
-        wallet_adds_result = await db.execute(
+        wallet_add_counts = (
             select(
-                WalletPassEvent.platform,
-                func.count(WalletPassEvent.wallet_event_id)
+                cast(WalletPassEvent.platform, Text).label("platform_code"),
+                func.count().label("adds")
             )
             .where(and_(
                 WalletPassEvent.card_id == card_id,
                 WalletPassEvent.event_type == "added_to_wallet"
             ))
             .group_by(WalletPassEvent.platform)
+            .subquery("wallet_add_counts")
+        )
+
+        # Every metric is a scalar subquery so the card needs one round trip
+        result = await db.execute(
+            select(
+                # Card views
+                select(func.count(CardViewEvent.view_event_id))
+                .where(CardViewEvent.card_id == card_id)
+                .scalar_subquery().label("total_views"),
+                # Unique viewers (by IP)
+                select(func.count(func.distinct(CardViewEvent.ip_address)))
+                .where(and_(CardViewEvent.card_id == card_id, CardViewEvent.ip_address.isnot(None)))
+                .scalar_subquery().label("unique_viewers"),
+                # VCard downloads
+                select(func.count(ContactExportEvent.export_event_id))
+                .where(and_(
+                    ContactExportEvent.card_id == card_id,
+                    ContactExportEvent.export_type == "vcard_download"
+                ))
+                .scalar_subquery().label("vcard_downloads"),
+                # First email open; min() needs no sort and is NULL without opens
+                select(func.min(EmailEvent.occurred_at))
+                .where(and_(
+                    EmailEvent.card_id == card_id,
+                    EmailEvent.event_type == "opened"
+                ))
+                .scalar_subquery().label("email_opened"),
+                # Wallet adds, keyed by platform code
+                select(func.jsonb_object_agg(
+                    wallet_add_counts.c.platform_code, wallet_add_counts.c.adds, type_=JSONB
+                ))
+                .scalar_subquery().label("wallet_adds")
+            )
         )
-        wallet_adds = {row[0]: row[1] for row in wallet_adds_result}
+        row = result.one()
+
+        email_opened = row.email_opened
+        wallet_adds = {
+            PlatformCode.decode(code): count
+            for code, count in (row.wallet_adds or {}).items()
+        }
 
         return {
             "card_id": str(card_id),
-            "total_views": total_views,
-            "unique_viewers": unique_viewers,
-            "vcard_downloads": vcard_downloads,
+            "total_views": row.total_views,
+            "unique_viewers": row.unique_viewers,
+            "vcard_downloads": row.vcard_downloads,
             "email_opened": email_opened is not None,
             "email_opened_at": email_opened.isoformat() if email_opened else None,
             "wallet_adds": wallet_adds
@@ -490,8 +615,9 @@ class AnalyticsService:
             event_id=event_id
         )
 
-        # Top cards by views
-        top_cards_result = await db.execute(
+        # Top cards by views, consumed from a server-side cursor so the list
+        # is built row by row rather than from a fully buffered result
+        top_cards_result = await db.stream(
             select(
                 CardViewEvent.card_id,
                 Card.display_name,
@@ -504,8 +630,8 @@ class AnalyticsService:
             .limit(10)
         )
         top_cards = [
-            {"card_id": str(row[0]), "display_name": row[1], "views": row[2]}
-            for row in top_cards_result
+            {"card_id": str(top_card_id), "display_name": display_name, "views": views}
+            async for top_card_id, display_name, views in top_cards_result
         ]
 
         # Engagement rate (% of attendees who had card views)
@@ -531,48 +657,292 @@ class AnalyticsService:
     # ========================================================================
 
     @staticmethod
-    def _parse_user_agent(user_agent_str: str) -> Dict[str, Optional[str]]:
+    def _date_filters(
+        model: Type[Base],
+        tenant_id: uuid.UUID,
+        event_id: Optional[uuid.UUID],
+        start_dt: Optional[datetime],
+        end_dt: Optional[datetime]
+    ) -> List[Any]:
         """
-        Parse user agent string for device type, browser, and OS using user-agents library
+        Build tenant/event/time-window filters for an event table
 
         Args:
-            user_agent_str: User agent string from request headers
+            model: Event model with tenant_id, event_id and occurred_at
+            tenant_id: Tenant to query
+            event_id: Optional event filter
+            start_dt: Inclusive lower bound on occurred_at
+            end_dt: Exclusive upper bound on occurred_at
 
         Returns:
-            Dictionary with device_type, browser, os
+            List of filter expressions
+        """
+        filters = [model.tenant_id == tenant_id]
+        if event_id:
+            filters.append(model.event_id == event_id)
+        if start_dt:
+            filters.append(model.occurred_at >= start_dt)
+        if end_dt:
+            filters.append(model.occurred_at < end_dt)
+        return filters
+
+    @staticmethod
+    def _card_views_with_rollup(
+        tenant_id: uuid.UUID,
+        event_id: Optional[uuid.UUID],
+        start_dt: Optional[datetime],
+        end_dt: Optional[datetime]
+    ):
+        """
+        Card views by (source, device) from the daily rollup plus recent raw rows
+
+        Days before the rollup's covered_until boundary are read from
+        mv_daily_card_views; anything newer (normally just today) is counted
+        from card_view_events. Date filters are whole days, so they line up
+        with the rollup's day_start buckets.
+
+        Args:
+            tenant_id: Tenant to query
+            event_id: Optional event filter
+            start_dt: Inclusive lower bound (midnight UTC)
+            end_dt: Exclusive upper bound (midnight UTC)
+
+        Returns:
+            UNION ALL of (source_type, device_code, views) rows
+        """
+        rollup_filters = [_daily_card_views.c.tenant_id == tenant_id]
+        if event_id:
+            rollup_filters.append(_daily_card_views.c.event_id == event_id)
+        if start_dt:
+            rollup_filters.append(_daily_card_views.c.day_start >= start_dt)
+        if end_dt:
+            rollup_filters.append(_daily_card_views.c.day_start < end_dt)
+
+        rolled_up = (
+            select(
+                _daily_card_views.c.source_type,
+                func.coalesce(cast(_daily_card_views.c.device_type, Text), "u").label("device_code"),
+                cast(func.sum(_daily_card_views.c.views), BigInteger).label("views")
+            )
+            .where(and_(*rollup_filters))
+            .group_by(_daily_card_views.c.source_type, _daily_card_views.c.device_type)
+        )
+
+        covered_until = (
+            select(_rollup_state.c.covered_until)
+            .where(_rollup_state.c.rollup_name == "daily_card_views")
+            .scalar_subquery()
+        )
+        raw_filters = AnalyticsService._date_filters(CardViewEvent, tenant_id, event_id, start_dt, end_dt)
+        raw_filters.append(
+            CardViewEvent.occurred_at >= func.coalesce(
+                covered_until, cast(literal("-infinity"), DateTime(timezone=True))
+            )
+        )
+        recent = (
+            select(
+                CardViewEvent.source_type,
+                func.coalesce(cast(CardViewEvent.device_type, Text), "u").label("device_code"),
+                func.count().label("views")
+            )
+            .where(and_(*raw_filters))
+            .group_by(CardViewEvent.source_type, CardViewEvent.device_type)
+        )
+
+        return union_all(rolled_up, recent)
+
+    @staticmethod
+    def _fingerprint_id(user_agent_str: str) -> int:
+        """Stable signed 64-bit identifier for a User-Agent string"""
+        digest = hashlib.blake2b(user_agent_str.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big", signed=True)
+
+    @staticmethod
+    def _fingerprint_row(user_agent_str: str, device_info: UAInfo) -> Optional[Dict[str, Any]]:
         """
-        from user_agents import parse
+        Build the client_fingerprints row for a User-Agent
+
+        Args:
+            user_agent_str: Raw User-Agent header
+            device_info: Parsed fields from parse_user_agent (detailed or not)
 
+        Returns:
+            Row dict (fp_id is stored on the event), or None without a User-Agent
+        """
         if not user_agent_str:
-            return {"device_type": None, "browser": None, "os": None}
-
-        # Parse user agent with user-agents library
-        ua = parse(user_agent_str)
-
-        # Device type detection
-        if ua.is_mobile:
-            device_type = "mobile"
-        elif ua.is_tablet:
-            device_type = "tablet"
-        elif ua.is_pc:
-            device_type = "desktop"
-        elif ua.is_bot:
-            device_type = "bot"
-        else:
-            device_type = "unknown"
+            return None
 
-        # Browser detection
-        browser = ua.browser.family if ua.browser.family else "Unknown"
+        fp_id = AnalyticsService._fingerprint_id(user_agent_str)
+        if is_known_client_fingerprint(fp_id):
+            # Already stored; the upsert will skip it
+            return {"fp_id": fp_id}
 
-        # OS detection
-        os = ua.os.family if ua.os.family else "Unknown"
+        if device_info.browser is None:
+            # Fast-path result; the fingerprint row keeps browser and OS
+            device_info = parse_user_agent(user_agent_str)
 
         return {
-            "device_type": device_type,
-            "browser": browser,
-            "os": os
+            "fp_id": fp_id,
+            "user_agent": user_agent_str,
+            "device_type": device_info.device_type,
+            "browser": device_info.browser,
+            "os": device_info.os
         }
 
+    @staticmethod
+    async def _write_event(
+        db: AsyncSession,
+        model: Type[Base],
+        row: Dict[str, Any],
+        fingerprint: Optional[Dict[str, Any]],
+        autocommit: bool = True
+    ) -> Optional[TrackedEvent]:
+        """
+        Hand an event row to the background writer, or insert it now
+
+        With autocommit=False the row is inserted in the caller's open
+        transaction and committed (or rolled back) with the caller's own
+        writes. The background writer, when running, takes the row either
+        way; queued rows are never part of the caller's transaction.
+
+        Args:
+            db: Database session for the synchronous path
+            model: Event model the row belongs to
+            row: Column values
+            fingerprint: Optional client_fingerprints row the event references
+            autocommit: Commit after the insert
+
+        Returns:
+            TrackedEvent for the inserted row, or None if the write was queued
+        """
+        if analytics_writer.running:
+            # Stamp the event time now rather than at flush time
+            queued_row = {**row, "occurred_at": datetime.now(timezone.utc)}
+            if analytics_writer.enqueue(model, queued_row, fingerprint):
+                return None
+
+        if fingerprint:
+            await upsert_client_fingerprints(db, [fingerprint])
+
+        # RETURNING only the generated id and occurred_at; no ORM object is
+        # built or added to the identity map
+        primary_key = model.__mapper__.primary_key[0]
+        result = await db.execute(
+            insert(model).values(**row).returning(primary_key, model.occurred_at)
+        )
+        row_id, occurred_at = result.one()
+        if autocommit:
+            await db.commit()
+            if fingerprint:
+                remember_client_fingerprints([fingerprint])
+        return TrackedEvent(id=row_id, occurred_at=occurred_at)
+
+    @staticmethod
+    def _parse_user_agent(user_agent_str: str) -> Dict[str, Optional[str]]:
+        """
+        Parse user agent string for device type, browser, and OS
+
+        Kept for existing callers; new code should use parse_user_agent().
+
+        Args:
+            user_agent_str: User agent string from request headers
+
+        Returns:
+            Dictionary with device_type, browser, os
+        """
+        return parse_user_agent(user_agent_str)._asdict()
+
+
+# Coarse device classification for the common cases, checked in this order.
+# Anything none of them match goes to the full user-agents parser.
+_BOT_RE = re.compile(r"bot|crawl|spider|slurp|facebookexternalhit|curl|wget|python-requests", re.I)
+_TABLET_RE = re.compile(r"iPad|Tablet|Kindle|Silk|PlayBook|Android(?!.*Mobile)", re.I)
+_MOBILE_RE = re.compile(r"iPhone|iPod|Windows Phone|Mobile", re.I)
+_DESKTOP_RE = re.compile(r"Windows NT|Macintosh|X11|CrOS")
+
+
+def _fast_device_type(user_agent_str: str) -> Optional[str]:
+    """Classify device type with a few pre-compiled regexes, or None if unsure"""
+    if _BOT_RE.search(user_agent_str):
+        return "bot"
+    if _TABLET_RE.search(user_agent_str):
+        return "tablet"
+    if _MOBILE_RE.search(user_agent_str):
+        return "mobile"
+    if _DESKTOP_RE.search(user_agent_str):
+        return "desktop"
+    return None
+
+
+@lru_cache(maxsize=4096)
+def parse_user_agent(user_agent_str: str, detailed: bool = True) -> UAInfo:
+    """
+    Parse user agent string for device type, browser, and OS using user-agents library
+
+    Results are cached: real traffic repeats a small set of User-Agent
+    strings, and the library's regex matching dominates tracking CPU.
+
+    Args:
+        user_agent_str: User agent string from request headers
+        detailed: When False, only device_type is needed; common agents are
+            classified by regex and returned with browser/os set to None
+
+    Returns:
+        UAInfo with device_type, browser, os
+    """
+    if not user_agent_str:
+        return _EMPTY_UA
+
+    if not detailed:
+        device_type = _fast_device_type(user_agent_str)
+        if device_type is not None:
+            return UAInfo(device_type=device_type, browser=None, os=None)
+
+    # Parse user agent with user-agents library
+    ua = _parse_ua(user_agent_str)
+
+    # Device type detection
+    if ua.is_mobile:
+        device_type = "mobile"
+    elif ua.is_tablet:
+        device_type = "tablet"
+    elif ua.is_pc:
+        device_type = "desktop"
+    elif ua.is_bot:
+        device_type = "bot"
+    else:
+        device_type = "unknown"
+
+    # Browser detection
+    browser = ua.browser.family if ua.browser.family else "Unknown"
+
+    # OS detection
+    os = ua.os.family if ua.os.family else "Unknown"
+
+    return UAInfo(device_type=device_type, browser=browser, os=os)
+
+
+def request_context(request: Optional[Request]) -> RequestContext:
+    """
+    Read the tracked request fields once
+
+    Args:
+        request: FastAPI request, or None for server-side events
+
+    Returns:
+        RequestContext with user agent ("" if absent), client IP and referrer
+    """
+    if request is None:
+        return _EMPTY_REQUEST
+
+    headers = request.headers
+    client = request.client
+    return RequestContext(
+        user_agent=headers.get("user-agent", ""),
+        ip_address=client.host if client else None,
+        referrer=headers.get("referer")
+    )
+
 
 def platform_to_device(platform: str) -> str:
     """Map wallet platform to device type"""
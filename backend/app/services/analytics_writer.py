@@ -0,0 +1,265 @@
+"""
+Analytics Writer
+
+Buffers legacy analytics event rows (card views, email, wallet and contact
+export events) in memory and writes them in bulk from background tasks,
+one per event table. Enabled with ANALYTICS_BATCH_WRITES on long-running
+API processes; when it is not running AnalyticsService writes each event
+synchronously.
+"""
+import asyncio
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, Base
+from app.core.logging import get_logger
+from app.models.database import (
+    CardViewEvent,
+    ClientFingerprint,
+    ContactExportEvent,
+    EmailEvent,
+    WalletPassEvent,
+)
+
+logger = get_logger(__name__)
+
+# (event row, client_fingerprints row or None)
+QueuedEvent = Tuple[Dict[str, Any], Optional[Dict[str, Any]]]
+
+BATCHED_MODELS = (CardViewEvent, EmailEvent, WalletPassEvent, ContactExportEvent)
+
+# Batches at least this large are written with COPY instead of INSERT
+COPY_THRESHOLD = 100
+
+# Queue sentinel: flush the current batch and exit
+_STOP = object()
+
+
+# fp_ids known to be committed to client_fingerprints, oldest first. A few
+# thousand User-Agents cover nearly all traffic, so most events skip the
+# upsert entirely.
+_known_fingerprints: "OrderedDict[int, None]" = OrderedDict()
+
+
+def is_known_client_fingerprint(fp_id: int) -> bool:
+    """Whether fp_id is already stored in client_fingerprints"""
+    return fp_id in _known_fingerprints
+
+
+def remember_client_fingerprints(rows: List[Dict[str, Any]]) -> None:
+    """
+    Mark fingerprints as stored once the transaction that upserted them commits
+
+    Args:
+        rows: Fingerprint rows passed to upsert_client_fingerprints
+    """
+    for row in rows:
+        _known_fingerprints[row["fp_id"]] = None
+        _known_fingerprints.move_to_end(row["fp_id"])
+    while len(_known_fingerprints) > settings.CLIENT_FINGERPRINT_CACHE_SIZE:
+        _known_fingerprints.popitem(last=False)
+
+
+async def upsert_client_fingerprints(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert client_fingerprints rows that do not exist yet
+
+    Rows already known to be stored are skipped without a round trip. So
+    are bare {"fp_id"} rows: they are only built for fingerprints that were
+    committed earlier, and may reach here after dropping out of the cache.
+
+    Args:
+        db: Database session (committed by the caller)
+        rows: Fingerprint rows keyed by fp_id
+    """
+    unique_rows = [
+        row for fp_id, row in {row["fp_id"]: row for row in rows if "user_agent" in row}.items()
+        if fp_id not in _known_fingerprints
+    ]
+    if not unique_rows:
+        return
+
+    await db.execute(
+        insert(ClientFingerprint)
+        .values(unique_rows)
+        .on_conflict_do_nothing(index_elements=["fp_id"])
+    )
+
+
+class AnalyticsWriter:
+    """Background bulk writer for analytics event rows"""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        batch_size: int = settings.ANALYTICS_BATCH_SIZE,
+        flush_interval: float = settings.ANALYTICS_FLUSH_INTERVAL_MS / 1000,
+        max_queue_size: int = settings.ANALYTICS_QUEUE_SIZE
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self._queues: Dict[Type[Base], asyncio.Queue] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._copy_plans: Dict[Type[Base], Tuple[Tuple[str, ...], List[Tuple[str, Any, Any]]]] = {}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Start one flush task per event table"""
+        if self.running:
+            return
+
+        for model in BATCHED_MODELS:
+            queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._queues[model] = queue
+            self._tasks.append(asyncio.create_task(self._drain(model, queue)))
+
+        logger.info(
+            "Analytics writer started",
+            extra={"extra_fields": {
+                "batch_size": self.batch_size,
+                "flush_interval": self.flush_interval
+            }}
+        )
+
+    async def stop(self) -> None:
+        """Flush everything still queued and stop the flush tasks"""
+        tasks, self._tasks = self._tasks, []
+        for queue in self._queues.values():
+            await queue.put(_STOP)
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._queues.clear()
+
+    def enqueue(
+        self,
+        model: Type[Base],
+        row: Dict[str, Any],
+        fingerprint: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Queue an event row for the next bulk write
+
+        Returns:
+            False if the writer is not running or the queue is full; the
+            caller should then write the row itself
+        """
+        queue = self._queues.get(model)
+        if queue is None or not self.running:
+            return False
+
+        try:
+            queue.put_nowait((row, fingerprint))
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def _drain(self, model: Type[Base], queue: asyncio.Queue) -> None:
+        """Collect up to batch_size rows or flush_interval seconds, then flush"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(model, batch)
+
+    async def _flush(self, model: Type[Base], batch: List[QueuedEvent]) -> None:
+        """Write one batch in a single transaction"""
+        rows = [row for row, _ in batch]
+        fingerprints = [fp for _, fp in batch if fp]
+
+        try:
+            async with self.session_factory() as session:
+                await upsert_client_fingerprints(session, fingerprints)
+                if len(rows) >= COPY_THRESHOLD:
+                    await self._copy_rows(session, model, rows)
+                else:
+                    await session.execute(insert(model), rows)
+                await session.commit()
+            remember_client_fingerprints(fingerprints)
+        except Exception as e:
+            # Analytics is best-effort; never let a bad batch stop the writer
+            logger.warning(
+                "Failed to flush analytics batch",
+                exc_info=True,
+                extra={"extra_fields": {
+                    "table": model.__tablename__,
+                    "rows": len(rows),
+                    "error": str(e)
+                }}
+            )
+
+    async def _copy_rows(self, session: AsyncSession, model: Type[Base], rows: List[Dict[str, Any]]) -> None:
+        """
+        Write rows with COPY on the session's asyncpg connection
+
+        COPY bypasses SQLAlchemy's type handling, so each value goes through
+        the column's bind processor (JSONB serialization, CharCode mapping)
+        and omitted columns get their Python-side scalar defaults. The
+        statement-level rollup triggers still fire for COPY.
+        """
+        conn = await session.connection()
+        columns, plan = self._copy_plan(model, conn.dialect)
+
+        records = []
+        for row in rows:
+            record = []
+            for name, process, default in plan:
+                value = row.get(name, default)
+                record.append(process(value) if process and value is not None else value)
+            records.append(tuple(record))
+
+        raw_connection = await conn.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            model.__tablename__,
+            records=records,
+            columns=columns
+        )
+
+    def _copy_plan(self, model: Type[Base], dialect) -> Tuple[Tuple[str, ...], List[Tuple[str, Any, Any]]]:
+        """Column names plus (name, bind processor, default) per column, built once per table"""
+        plan = self._copy_plans.get(model)
+        if plan is None:
+            # Primary keys are sequence-generated
+            columns = [column for column in model.__table__.columns if not column.primary_key]
+            plan = (
+                tuple(column.name for column in columns),
+                [
+                    (
+                        column.name,
+                        column.type.bind_processor(dialect),
+                        column.default.arg if column.default is not None and column.default.is_scalar else None
+                    )
+                    for column in columns
+                ]
+            )
+            self._copy_plans[model] = plan
+        return plan
+
+
+analytics_writer = AnalyticsWriter()
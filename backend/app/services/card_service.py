@@ -1,21 +1,31 @@
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-from typing import Optional, List, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import select, insert, text, bindparam
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import joinedload, raiseload
+from sqlalchemy.orm.attributes import set_committed_value
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple
+from datetime import datetime, timedelta, timezone
+import asyncio
+import functools
+import io
+import time
 import uuid
 
-from app.models.database import Card, Attendee, QRCode, Event, Brand
+from app.models.database import Card, Attendee, Event, Brand, AnalyticsEvent, MessageContext
 from app.models.schemas import CardCreate, PassIssuanceResponse, WalletPass
-from app.utils.qr import generate_qr_code
 from app.utils.s3 import s3_client
-from app.utils.email import email_client
-from app.utils.images import fetch_brand_images
-from app.utils.apple_wallet import AppleWalletPassGenerator
+from app.utils.email import email_client, new_message_id, run_in_ses_thread
+from app.utils.images import cached_fetch_brand_images
+from app.utils.apple_wallet import AppleWalletPassGenerator, EventPassTemplate
 from app.utils.google_wallet import GoogleWalletPassGenerator
+from app.services.analytics_service import AnalyticsService
 from app.core.config import settings
+from app.core.database import AsyncSessionLocal
 from app.core.logging import get_logger
 from app.core.exceptions import (
     AttendeeNotFoundError,
+    CardNotFoundError,
     S3UploadError,
     WalletPassGenerationError,
     EmailDeliveryError
@@ -23,6 +33,199 @@ from app.core.exceptions import (
 
 logger = get_logger(__name__)
 
+# Pass email queued during bulk issuance: (card, attendee, wallet passes,
+# EmailClient.send_pass_emails_bulk recipient)
+PendingEmail = Tuple[Card, Attendee, List[WalletPass], Dict[str, Any]]
+
+# Data-modifying CTEs run exactly once even when the outer query does not
+# read them, so one statement inserts the card and its QR record and links
+# the attendee. The QR url format mirrors create_card_for_attendee; the PNG
+# is rendered on request by GET /qr/{card_id}, so no S3 key is stored.
+_CREATE_CARD_SQL = text("""
+    WITH new_card AS (
+        INSERT INTO cards (
+            tenant_id, owner_attendee_id, display_name, email, phone,
+            org_name, title, links_json, is_personal
+        )
+        VALUES (
+            :tenant_id, :attendee_id, :display_name, :email, :phone,
+            :org_name, :title, :links_json, false
+        )
+        RETURNING *
+    ), new_qr AS (
+        INSERT INTO qr_codes (tenant_id, event_id, card_id, url)
+        SELECT
+            tenant_id,
+            CAST(:event_id AS UUID),
+            card_id,
+            CAST(:base_domain AS TEXT) || '/c/' || card_id::TEXT
+        FROM new_card
+    ), linked_attendee AS (
+        UPDATE attendees SET card_id = (SELECT card_id FROM new_card), updated_at = now()
+        WHERE attendee_id = :attendee_id
+    )
+    SELECT * FROM new_card
+""").bindparams(bindparam("links_json", type_=JSONB))
+
+# Bulk variant for a set of attendees without a card: one statement creates
+# the cards, their QR records, the attendee links and the qr_generated
+# analytics rows. Display name and links mirror create_card_for_attendee.
+# SKIP LOCKED leaves attendees a concurrent run is already handling.
+_CREATE_CARDS_SQL = """
+    WITH pending AS (
+        SELECT
+            attendee_id, tenant_id, event_id, email, phone, org_name, title,
+            COALESCE(
+                NULLIF(TRIM(CONCAT_WS(' ', first_name, last_name)), ''),
+                NULLIF(email, ''),
+                'Attendee'
+            ) AS display_name,
+            CASE
+                WHEN COALESCE(linkedin_url, '') <> ''
+                THEN jsonb_build_object('linkedin', linkedin_url)
+                ELSE '{{}}'::jsonb
+            END AS links_json
+        FROM attendees
+        WHERE {attendee_filter} AND card_id IS NULL
+        FOR UPDATE SKIP LOCKED
+    ), new_cards AS (
+        INSERT INTO cards (
+            tenant_id, owner_attendee_id, display_name, email, phone,
+            org_name, title, links_json, is_personal
+        )
+        SELECT
+            tenant_id, attendee_id, display_name, email, phone,
+            org_name, title, links_json, false
+        FROM pending
+        RETURNING *
+    ), new_qr AS (
+        INSERT INTO qr_codes (tenant_id, event_id, card_id, url)
+        SELECT
+            new_cards.tenant_id,
+            pending.event_id,
+            new_cards.card_id,
+            CAST(:base_domain AS TEXT) || '/c/' || new_cards.card_id::TEXT
+        FROM new_cards
+        JOIN pending ON pending.attendee_id = new_cards.owner_attendee_id
+    ), qr_events AS (
+        INSERT INTO analytics_events (
+            tenant_id, event_type_id, event_name, category, card_id, attendee_id, properties
+        )
+        SELECT
+            new_cards.tenant_id,
+            pending.event_id,
+            'qr_generated',
+            'delivery',
+            new_cards.card_id,
+            new_cards.owner_attendee_id,
+            jsonb_build_object('url', CAST(:base_domain AS TEXT) || '/c/' || new_cards.card_id::TEXT)
+        FROM new_cards
+        JOIN pending ON pending.attendee_id = new_cards.owner_attendee_id
+    ), linked_attendees AS (
+        UPDATE attendees SET card_id = new_cards.card_id, updated_at = now()
+        FROM new_cards
+        WHERE attendees.attendee_id = new_cards.owner_attendee_id
+    )
+    SELECT card_id FROM new_cards
+"""
+_CREATE_CARDS_FOR_EVENT_SQL = text(_CREATE_CARDS_SQL.format(attendee_filter="event_id = :event_id"))
+_CREATE_CARDS_FOR_ATTENDEES_SQL = text(_CREATE_CARDS_SQL.format(attendee_filter="attendee_id = ANY(:attendee_ids)"))
+
+def _brand_domain(brand_key: str) -> str:
+    """Public base URL for a brand's card links, OutreachPass when unknown"""
+    domains = settings.BRAND_DOMAINS
+    return domains.get(brand_key) or domains["OUTREACHPASS"]
+
+
+# Google Wallet classes already created (or found to exist) by this process,
+# (issuer_id, class_id) -> monotonic time confirmed. Every attendee of an
+# event shares one class, so it is only re-checked once the TTL expires.
+_google_class_ids_created: Dict[tuple[str, str], float] = {}
+_google_class_lock = asyncio.Lock()
+
+
+def _google_class_known(key: tuple[str, str]) -> bool:
+    """Whether the class was confirmed within GOOGLE_WALLET_CLASS_CACHE_TTL_SECONDS"""
+    confirmed_at = _google_class_ids_created.get(key)
+    return (
+        confirmed_at is not None
+        and time.monotonic() - confirmed_at < settings.GOOGLE_WALLET_CLASS_CACHE_TTL_SECONDS
+    )
+
+# (event_id, event updated_at, brand_id, brand updated_at) -> Apple pass
+# template, least recently used first
+_apple_pass_templates: "OrderedDict[tuple, EventPassTemplate]" = OrderedDict()
+_APPLE_PASS_TEMPLATE_CACHE_SIZE = 64
+
+
+@functools.lru_cache(maxsize=16)
+def _get_apple_generator(
+    team_id: str,
+    pass_type_id: str,
+    organization_name: str,
+    cert_path: Optional[str],
+    key_path: Optional[str],
+    wwdr_cert_path: Optional[str]
+) -> AppleWalletPassGenerator:
+    """Apple Wallet generator per brand, reused across attendees"""
+    return AppleWalletPassGenerator(
+        team_id=team_id,
+        pass_type_id=pass_type_id,
+        organization_name=organization_name,
+        cert_path=cert_path,
+        key_path=key_path,
+        wwdr_cert_path=wwdr_cert_path
+    )
+
+
+@functools.lru_cache(maxsize=16)
+def _get_google_generator(
+    issuer_id: str,
+    service_account_email: str,
+    service_account_file: Optional[str],
+    origins: tuple[str, ...]
+) -> GoogleWalletPassGenerator:
+    """Google Wallet generator (and its authorized session), reused across attendees"""
+    return GoogleWalletPassGenerator(
+        issuer_id=issuer_id,
+        service_account_email=service_account_email,
+        service_account_file=service_account_file,
+        origins=list(origins)
+    )
+
+
+def preload_wallet_generators() -> None:
+    """
+    Build the default wallet generators ahead of the first pass
+
+    Loads the Apple signing certificates and the Google service account
+    credentials at process start (Lambda init) instead of on the first
+    request. Generators for other brands reuse the same parsed certificates.
+    """
+    try:
+        if settings.APPLE_WALLET_ENABLED and settings.APPLE_WALLET_TEAM_ID and settings.APPLE_WALLET_PASS_TYPE_ID:
+            _get_apple_generator(
+                settings.APPLE_WALLET_TEAM_ID,
+                settings.APPLE_WALLET_PASS_TYPE_ID,
+                settings.APPLE_WALLET_ORGANIZATION_NAME,
+                settings.APPLE_WALLET_CERT_PATH,
+                settings.APPLE_WALLET_KEY_PATH,
+                settings.APPLE_WALLET_WWDR_CERT_PATH
+            )
+        if settings.GOOGLE_WALLET_ENABLED and settings.GOOGLE_WALLET_ISSUER_ID and settings.GOOGLE_WALLET_SERVICE_ACCOUNT_EMAIL:
+            _get_google_generator(
+                settings.GOOGLE_WALLET_ISSUER_ID,
+                settings.GOOGLE_WALLET_SERVICE_ACCOUNT_EMAIL,
+                settings.GOOGLE_WALLET_SERVICE_ACCOUNT_FILE,
+                tuple(settings.GOOGLE_WALLET_ORIGINS)
+            )
+    except Exception as e:
+        # Generators are built on demand if preloading fails
+        logger.warning(
+            "Failed to preload wallet generators",
+            extra={"extra_fields": {"error": str(e)}}
+        )
+
 
 class CardService:
     """Business logic for card operations"""
@@ -31,293 +234,643 @@ class CardService:
     async def create_card_for_attendee(
         db: AsyncSession,
         attendee_id: uuid.UUID,
-        brand_key: str = "OUTREACHPASS"
+        brand_key: str = "OUTREACHPASS",
+        deliver: bool = True
     ) -> Optional[PassIssuanceResponse]:
-        """Create card, QR code, and optionally wallet pass for an attendee"""
+        """
+        Create card, QR code, and optionally wallet pass for an attendee
+
+        With deliver=False only the card and QR code are created; wallet
+        passes and the email are produced later by deliver_card().
+        """
 
-        # Fetch attendee
+        # Fetch attendee with its event and brand in one round trip; any
+        # other relationship access raises instead of issuing a hidden query
         result = await db.execute(
-            select(Attendee).where(Attendee.attendee_id == attendee_id)
+            select(Attendee)
+            .options(
+                joinedload(Attendee.event).joinedload(Event.brand),
+                raiseload("*")
+            )
+            .where(Attendee.attendee_id == attendee_id)
         )
         attendee = result.scalar_one_or_none()
 
         if not attendee:
             raise AttendeeNotFoundError(attendee_id=str(attendee_id))
 
-        # Fetch event
-        event_result = await db.execute(
-            select(Event)
-            .where(Event.event_id == attendee.event_id)
-        )
-        event = event_result.scalar_one_or_none()
-
-        # Fetch brand separately if event has one
-        brand = None
-        if event and event.brand_id:
-            brand_result = await db.execute(
-                select(Brand).where(Brand.brand_id == event.brand_id)
-            )
-            brand = brand_result.scalar_one_or_none()
+        event = attendee.event
+        brand = event.brand if event else None
 
         # Create card
-        display_name = f"{attendee.first_name or ''} {attendee.last_name or ''}".strip()
-        if not display_name:
-            display_name = attendee.email or "Attendee"
+        display_name = CardService._build_display_name(attendee)
 
         links_json = {}
         if attendee.linkedin_url:
             links_json['linkedin'] = attendee.linkedin_url
 
-        card = Card(
-            tenant_id=attendee.tenant_id,
-            owner_attendee_id=attendee.attendee_id,
-            display_name=display_name,
-            email=attendee.email,
-            phone=attendee.phone,
-            org_name=attendee.org_name,
-            title=attendee.title,
-            links_json=links_json,
-            is_personal=False  # Event-temporary card
+        base_domain = _brand_domain(brand_key)
+
+        # Create card, its QR code record and the attendee back-reference
+        # in a single round trip
+        result = await db.execute(
+            select(Card).from_statement(_CREATE_CARD_SQL),
+            {
+                "tenant_id": attendee.tenant_id,
+                "attendee_id": attendee.attendee_id,
+                "event_id": attendee.event_id,
+                "display_name": display_name,
+                "email": attendee.email,
+                "phone": attendee.phone,
+                "org_name": attendee.org_name,
+                "title": attendee.title,
+                "links_json": links_json,
+                "base_domain": base_domain
+            }
         )
+        card = result.scalar_one()
+        set_committed_value(attendee, "card_id", card.card_id)
 
-        db.add(card)
-        await db.flush()
+        # Must match the url computed in _CREATE_CARD_SQL
+        card_url = f"{base_domain}/c/{card.card_id}"
 
-        # Update attendee with card reference
-        attendee.card_id = card.card_id
+        await db.commit()
 
-        # Generate card URL
-        base_domain = settings.BRAND_DOMAINS.get(brand_key, settings.BRAND_DOMAINS["OUTREACHPASS"])
-        card_url = f"{base_domain}/c/{card.card_id}"
+        # Enhanced Analytics rows are buffered and written once at the end
+        analytics_events = [
+            CardService._analytics_event(
+                attendee, card, "qr_generated", "delivery",
+                {"url": card_url}
+            )
+        ]
 
-        # Generate QR code
-        qr_bytes = generate_qr_code(card_url)
+        # Wallet passes and email can be deferred to the worker's delivery step
+        wallet_passes = []
+        if deliver:
+            wallet_passes = await CardService._deliver_card(
+                db=db,
+                card=card,
+                attendee=attendee,
+                event=event,
+                brand=brand,
+                card_url=card_url,
+                base_domain=base_domain,
+                analytics_events=analytics_events
+            )
 
-        # Upload to S3
-        s3_key = f"qr/{attendee.tenant_id}/{card.card_id}.png"
-        s3_client.upload_file(
-            file_bytes=qr_bytes,
-            key=s3_key,
-            content_type="image/png"
-        )
+        await CardService._flush_analytics_events(db, analytics_events)
 
-        # Create QR code record
-        qr_code = QRCode(
-            tenant_id=attendee.tenant_id,
-            event_id=attendee.event_id,
+        return PassIssuanceResponse(
             card_id=card.card_id,
-            url=card_url,
-            s3_key_png=s3_key
+            qr_url=card_url,
+            qr_s3_key=None,  # QR PNG is rendered on request
+            wallet_passes=wallet_passes
         )
 
-        db.add(qr_code)
-        await db.commit()
+    @staticmethod
+    def _build_display_name(attendee: Attendee) -> str:
+        """
+        Card display name: full name, else email, else "Attendee"
 
-        # Track QR code generation (Enhanced Analytics)
-        try:
-            from app.services.analytics_service import AnalyticsService
-            from app.models.database import AnalyticsEvent
-
-            await db.execute(
-                AnalyticsEvent.__table__.insert().values(
-                    tenant_id=attendee.tenant_id,
-                    event_type_id=attendee.event_id,
-                    event_name="qr_generated",
-                    category="delivery",
-                    card_id=card.card_id,
-                    attendee_id=attendee.attendee_id,
-                    properties={"s3_key": s3_key, "url": card_url}
-                )
-            )
+        Stored on the card and reused from card.display_name everywhere
+        else. _CREATE_CARDS_FOR_EVENT_SQL mirrors this in SQL.
+        """
+        display_name = f"{attendee.first_name or ''} {attendee.last_name or ''}".strip()
+        return display_name or attendee.email or "Attendee"
+
+    @staticmethod
+    async def create_cards_for_event(
+        event_id: uuid.UUID,
+        brand_key: str = "OUTREACHPASS",
+        concurrency: int = 16,
+        session_factory: async_sessionmaker = AsyncSessionLocal
+    ) -> List[PassIssuanceResponse]:
+        """
+        Create cards (and deliver passes) for every attendee of an event without one
+
+        See _create_cards() for how cards are created and delivered.
+
+        Returns:
+            Issuance results for every card created
+        """
+        return await CardService._create_cards(
+            _CREATE_CARDS_FOR_EVENT_SQL,
+            {"event_id": event_id},
+            brand_key=brand_key,
+            concurrency=concurrency,
+            session_factory=session_factory,
+            log_fields={"event_id": str(event_id)}
+        )
+
+    @staticmethod
+    async def create_cards_for_attendees(
+        attendee_ids: List[uuid.UUID],
+        brand_key: str = "OUTREACHPASS",
+        concurrency: int = 16,
+        session_factory: async_sessionmaker = AsyncSessionLocal
+    ) -> List[PassIssuanceResponse]:
+        """
+        Create cards (and deliver passes) for the given attendees
+
+        Attendees that already have a card are skipped. See _create_cards()
+        for how cards are created and delivered.
+
+        Returns:
+            Issuance results for every card created
+        """
+        if not attendee_ids:
+            return []
+
+        return await CardService._create_cards(
+            _CREATE_CARDS_FOR_ATTENDEES_SQL,
+            {"attendee_ids": list(attendee_ids)},
+            brand_key=brand_key,
+            concurrency=concurrency,
+            session_factory=session_factory,
+            log_fields={"attendees": len(attendee_ids)}
+        )
+
+    @staticmethod
+    async def _create_cards(
+        statement,
+        params: Dict[str, Any],
+        brand_key: str,
+        concurrency: int,
+        session_factory: async_sessionmaker,
+        log_fields: Dict[str, Any]
+    ) -> List[PassIssuanceResponse]:
+        """
+        Run a bulk card creation statement, then deliver every new card
+
+        All cards are created with one statement and one commit. Delivery
+        then runs concurrently, up to `concurrency` cards at a time, so the
+        wallet calls of different attendees overlap. Each delivery gets its
+        own session, since an AsyncSession cannot be shared between tasks. A
+        failed delivery is logged and does not stop the others.
+
+        Pass emails are collected during delivery and sent afterwards with
+        SES bulk templated sends, one API call per 50 attendees.
+        """
+        base_domain = _brand_domain(brand_key)
+
+        async with session_factory() as db:
+            result = await db.execute(statement, {**params, "base_domain": base_domain})
+            card_ids = result.scalars().all()
             await db.commit()
-        except Exception as e:
-            logger.warning(f"Failed to track QR generation: {e}")
 
-        # Generate wallet passes if enabled
+        semaphore = asyncio.Semaphore(concurrency)
+        pending_emails: List[PendingEmail] = []
+
+        async def deliver_one(card_id: uuid.UUID) -> List[WalletPass]:
+            async with semaphore, session_factory() as db:
+                try:
+                    return await CardService.deliver_card(
+                        db, card_id, brand_key, pending_emails=pending_emails
+                    )
+                except Exception as e:
+                    logger.error(
+                        "Failed to deliver card in bulk run",
+                        exc_info=True,
+                        extra={"extra_fields": {
+                            **log_fields,
+                            "card_id": str(card_id),
+                            "error": str(e)
+                        }}
+                    )
+                    return []
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(deliver_one(card_id)) for card_id in card_ids]
+
+        await CardService._send_pending_emails(pending_emails, session_factory)
+
+        logger.info(
+            "Bulk card creation finished",
+            extra={"extra_fields": {
+                **log_fields,
+                "created": len(card_ids)
+            }}
+        )
+        return [
+            PassIssuanceResponse(
+                card_id=card_id,
+                qr_url=f"{base_domain}/c/{card_id}",
+                qr_s3_key=None,  # QR PNG is rendered on request
+                wallet_passes=task.result()
+            )
+            for card_id, task in zip(card_ids, tasks, strict=True)
+        ]
+
+    @staticmethod
+    async def deliver_card(
+        db: AsyncSession,
+        card_id: uuid.UUID,
+        brand_key: str = "OUTREACHPASS",
+        pending_emails: Optional[List[PendingEmail]] = None
+    ) -> List[WalletPass]:
+        """
+        Generate wallet passes and send the pass email for an existing card
+
+        Used by the worker after create_card_for_attendee(deliver=False), so
+        slow wallet and email calls run as their own queued step.
+
+        Args:
+            db: Database session
+            card_id: Card created for an attendee
+            brand_key: Brand whose domain the card URLs use
+            pending_emails: When given, the pass email is appended here for
+                _send_pending_emails() instead of being sent
+
+        Returns:
+            Wallet passes that were generated
+        """
+        result = await db.execute(
+            select(Card)
+            .options(
+                joinedload(Card.owner_attendee)
+                .joinedload(Attendee.event)
+                .joinedload(Event.brand),
+                raiseload("*")
+            )
+            .where(Card.card_id == card_id)
+        )
+        card = result.scalar_one_or_none()
+
+        if not card:
+            raise CardNotFoundError(card_id=str(card_id))
+        if not card.owner_attendee:
+            raise AttendeeNotFoundError(attendee_id=str(card.owner_attendee_id))
+
+        attendee = card.owner_attendee
+        event = attendee.event
+        base_domain = _brand_domain(brand_key)
+
+        analytics_events: List[Dict[str, Any]] = []
+        wallet_passes = await CardService._deliver_card(
+            db=db,
+            card=card,
+            attendee=attendee,
+            event=event,
+            brand=event.brand if event else None,
+            card_url=f"{base_domain}/c/{card.card_id}",
+            base_domain=base_domain,
+            analytics_events=analytics_events,
+            pending_emails=pending_emails
+        )
+        await CardService._flush_analytics_events(db, analytics_events)
+
+        return wallet_passes
+
+    @staticmethod
+    async def _deliver_card(
+        db: AsyncSession,
+        card: Card,
+        attendee: Attendee,
+        event: Optional[Event],
+        brand: Optional[Brand],
+        card_url: str,
+        base_domain: str,
+        analytics_events: List[Dict[str, Any]],
+        pending_emails: Optional[List[PendingEmail]] = None
+    ) -> List[WalletPass]:
+        """
+        Generate enabled wallet passes and email them to the attendee
+
+        Enhanced Analytics rows are appended to analytics_events for the
+        caller to write with _flush_analytics_events(). With pending_emails,
+        the email is queued there instead of sent.
+        """
         wallet_passes = []
 
-        # Apple Wallet pass
+        # Extra fields shown on both passes
+        additional_fields = {}
+        if attendee.org_name:
+            additional_fields["organization"] = {
+                "label": "ORGANIZATION",
+                "value": attendee.org_name
+            }
+        if attendee.title:
+            additional_fields["title"] = {
+                "label": "TITLE",
+                "value": attendee.title
+            }
+
+        # Apple and Google passes share no state, so generate them
+        # concurrently; neither touches the session
+        wallet_jobs = []
+        wallet_kwargs = {
+            "card": card,
+            "attendee": attendee,
+            "event": event,
+            "brand": brand,
+            "card_url": card_url,
+            "base_domain": base_domain,
+            "display_name": card.display_name,  # Same name/email fallback as the attendee
+            "additional_fields": additional_fields,
+            "analytics_events": analytics_events
+        }
         if settings.APPLE_WALLET_ENABLED and event:
-            try:
-                apple_wallet_pass = await CardService._generate_apple_wallet_pass(
-                    db=db,
-                    card=card,
-                    attendee=attendee,
-                    event=event,
-                    brand=brand,
-                    card_url=card_url,
-                    base_domain=base_domain
-                )
-                if apple_wallet_pass:
-                    wallet_passes.append(apple_wallet_pass)
-            except Exception as e:
+            wallet_jobs.append(("Apple", CardService._generate_apple_wallet_pass(**wallet_kwargs)))
+        if settings.GOOGLE_WALLET_ENABLED and event:
+            wallet_jobs.append(("Google", CardService._generate_google_wallet_pass(**wallet_kwargs)))
+
+        results = await asyncio.gather(*(job for _, job in wallet_jobs), return_exceptions=True)
+        for (platform_name, _), result in zip(wallet_jobs, results, strict=True):
+            if isinstance(result, Exception):
                 # Log wallet pass generation failure but don't fail card creation
                 logger.warning(
-                    "Failed to generate Apple Wallet pass",
-                    exc_info=True,
+                    f"Failed to generate {platform_name} Wallet pass",
+                    exc_info=result,
                     extra={"extra_fields": {
                         "card_id": str(card.card_id),
                         "attendee_id": str(attendee.attendee_id),
-                        "error": str(e)
+                        "error": str(result)
                     }}
                 )
+            elif result:
+                wallet_passes.append(result)
 
-        # Google Wallet pass
-        if settings.GOOGLE_WALLET_ENABLED and event:
-            try:
-                google_wallet_pass = await CardService._generate_google_wallet_pass(
-                    db=db,
+        # The email only needs the pass URLs, so send it while the legacy
+        # wallet events are written
+        email_task = None
+        if attendee.email and event:
+            # Store the tracking context in this session (committed with
+            # the analytics rows) so the SES call can run in a thread
+            message_id = new_message_id()
+            db.add(MessageContext(
+                message_id=message_id,
+                card_id=card.card_id,
+                tenant_id=attendee.tenant_id,
+                event_id=attendee.event_id,
+                attendee_id=attendee.attendee_id,
+                recipient_email=attendee.email,
+                expires_at=datetime.now(timezone.utc) + timedelta(days=7)
+            ))
+            if pending_emails is not None:
+                pending_emails.append((card, attendee, wallet_passes, {
+                    "to_email": attendee.email,
+                    "display_name": card.display_name,
+                    "event_name": event.name,
+                    "card_url": card_url,
+                    "qr_url": CardService._qr_url(card, base_domain),
+                    "wallet_passes": wallet_passes,
+                    "vcard_url": f"{base_domain}/c/{card.card_id}/vcard",
+                    "brand_name": brand.display_name if brand else None,
+                    "brand_theme": brand.theme_json if brand else None,
+                    "card_id": card.card_id,
+                    "tenant_id": attendee.tenant_id,
+                    "message_id": message_id
+                }))
+            else:
+                email_task = asyncio.create_task(CardService._send_pass_email(
                     card=card,
                     attendee=attendee,
                     event=event,
                     brand=brand,
                     card_url=card_url,
-                    base_domain=base_domain
+                    base_domain=base_domain,
+                    wallet_passes=wallet_passes,
+                    message_id=message_id,
+                    analytics_events=analytics_events
+                ))
+
+        # Track wallet pass generation (legacy table) once both are done.
+        # This is not a duplicate of the *_wallet_generated rows above:
+        # AnalyticsService.get_overview() reads its generated counts and
+        # per-platform breakdown from wallet_pass_events only
+        for wallet_pass in wallet_passes:
+            try:
+                await AnalyticsService.track_wallet_event(
+                    db=db,
+                    card=card,
+                    event_id=event.event_id,
+                    platform=wallet_pass.type,
+                    event_type="generated",
+                    request=None,
+                    autocommit=False  # Committed with the buffered analytics rows
                 )
-                if google_wallet_pass:
-                    wallet_passes.append(google_wallet_pass)
             except Exception as e:
-                # Log wallet pass generation failure but don't fail card creation
                 logger.warning(
-                    "Failed to generate Google Wallet pass",
-                    exc_info=True,
+                    "Failed to track wallet pass generation",
                     extra={"extra_fields": {
                         "card_id": str(card.card_id),
-                        "attendee_id": str(attendee.attendee_id),
+                        "platform": wallet_pass.type,
                         "error": str(e)
                     }}
                 )
 
-        # Send email if attendee has email (non-blocking)
-        if attendee.email and event:
-            try:
-                # Extract brand information for email customization
-                brand_name = brand.display_name if brand else None
-                brand_theme = brand.theme_json if brand else None
+        if email_task is not None:
+            await email_task
 
-                # Generate pre-signed URL for QR code (valid for 7 days)
-                qr_s3_url = s3_client.get_presigned_url(s3_key, expiration=604800)  # 7 days = 604800 seconds
+        return wallet_passes
 
-                vcard_url = f"{base_domain}/c/{card.card_id}/vcard"
-                email_sent = email_client.send_pass_email(
-                    to_email=attendee.email,
-                    display_name=display_name,
-                    event_name=event.name,
-                    card_url=card_url,
-                    qr_url=qr_s3_url,
-                    wallet_passes=wallet_passes,
-                    vcard_url=vcard_url,
-                    # Brand customization
-                    brand_name=brand_name,
-                    brand_theme=brand_theme,
-                    # Tracking parameters
-                    card_id=card.card_id,
-                    tenant_id=attendee.tenant_id,
-                    event_id=attendee.event_id,
-                    attendee_id=attendee.attendee_id,
-                    db=db
-                )
+    @staticmethod
+    async def _send_pass_email(
+        card: Card,
+        attendee: Attendee,
+        event: Event,
+        brand: Optional[Brand],
+        card_url: str,
+        base_domain: str,
+        wallet_passes: List[WalletPass],
+        message_id: str,
+        analytics_events: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Send the pass email (in a worker thread) and record the outcome
 
-                # Track email sent in Enhanced Analytics
-                if email_sent:
-                    try:
-                        from app.models.database import AnalyticsEvent
-                        await db.execute(
-                            AnalyticsEvent.__table__.insert().values(
-                                tenant_id=attendee.tenant_id,
-                                event_type_id=attendee.event_id,
-                                event_name="email_sent",
-                                category="delivery",
-                                card_id=card.card_id,
-                                attendee_id=attendee.attendee_id,
-                                properties={
-                                    "recipient": attendee.email,
-                                    "has_apple_wallet": any(p.type == "apple" for p in wallet_passes),
-                                    "has_google_wallet": any(p.type == "google" for p in wallet_passes),
-                                    "wallet_count": len(wallet_passes)
-                                }
-                            )
-                        )
-                        await db.commit()
-                    except Exception as e:
-                        logger.warning(f"Failed to track email in Enhanced Analytics: {e}")
-                else:
-                    # Track email failure
-                    try:
-                        from app.models.database import AnalyticsEvent
-                        await db.execute(
-                            AnalyticsEvent.__table__.insert().values(
-                                tenant_id=attendee.tenant_id,
-                                event_type_id=attendee.event_id,
-                                event_name="email_failed",
-                                category="error",
-                                card_id=card.card_id,
-                                attendee_id=attendee.attendee_id,
-                                properties={"recipient": attendee.email}
-                            )
-                        )
-                        await db.commit()
-                    except Exception as e:
-                        logger.warning(f"Failed to track email failure in Enhanced Analytics: {e}")
+        Does not touch the session, so it can run alongside other writes.
+        Failures are logged and recorded, never raised.
+        """
+        try:
+            # Extract brand information for email customization
+            brand_name = brand.display_name if brand else None
+            brand_theme = brand.theme_json if brand else None
+
+            qr_url = CardService._qr_url(card, base_domain)
+            vcard_url = f"{base_domain}/c/{card.card_id}/vcard"
+            email_sent = await run_in_ses_thread(
+                email_client.send_pass_email,
+                to_email=attendee.email,
+                display_name=card.display_name,
+                event_name=event.name,
+                card_url=card_url,
+                qr_url=qr_url,
+                wallet_passes=wallet_passes,
+                vcard_url=vcard_url,
+                # Brand customization
+                brand_name=brand_name,
+                brand_theme=brand_theme,
+                # Tracking parameters
+                card_id=card.card_id,
+                tenant_id=attendee.tenant_id,
+                event_id=attendee.event_id,
+                attendee_id=attendee.attendee_id,
+                message_id=message_id
+            )
 
-            except Exception as e:
-                # Log email failure but don't fail pass generation
-                logger.warning(
-                    "Failed to send pass email",
-                    exc_info=True,
-                    extra={"extra_fields": {
-                        "recipient_email": attendee.email,
-                        "card_id": str(card.card_id),
-                        "attendee_id": str(attendee.attendee_id),
-                        "error": str(e)
-                    }}
-                )
+            analytics_events.append(
+                CardService._email_outcome_event(card, attendee, wallet_passes, email_sent)
+            )
 
-                # Track email error in Enhanced Analytics
-                try:
-                    from app.models.database import AnalyticsEvent
-                    await db.execute(
-                        AnalyticsEvent.__table__.insert().values(
-                            tenant_id=attendee.tenant_id,
-                            event_type_id=attendee.event_id if event else None,
-                            event_name="email_error",
-                            category="error",
-                            card_id=card.card_id,
-                            attendee_id=attendee.attendee_id,
-                            properties={"recipient": attendee.email, "error": str(e)}
-                        )
-                    )
-                    await db.commit()
-                except Exception as track_error:
-                    logger.warning(f"Failed to track email error in Enhanced Analytics: {track_error}")
+        except Exception as e:
+            # Log email failure but don't fail pass generation
+            logger.warning(
+                "Failed to send pass email",
+                exc_info=True,
+                extra={"extra_fields": {
+                    "recipient_email": attendee.email,
+                    "card_id": str(card.card_id),
+                    "attendee_id": str(attendee.attendee_id),
+                    "error": str(e)
+                }}
+            )
 
-        return PassIssuanceResponse(
-            card_id=card.card_id,
-            qr_url=card_url,
-            qr_s3_key=s3_key,
-            wallet_passes=wallet_passes
+            # Track email error in Enhanced Analytics
+            analytics_events.append(CardService._analytics_event(
+                attendee, card, "email_error", "error",
+                {"recipient": attendee.email, "error": str(e)}
+            ))
+
+    @staticmethod
+    async def _send_pending_emails(
+        pending_emails: List[PendingEmail],
+        session_factory: async_sessionmaker
+    ) -> None:
+        """
+        Send emails queued by _deliver_card() with SES bulk sends and record the outcomes
+
+        Failures are logged and recorded, never raised.
+        """
+        if not pending_emails:
+            return
+
+        try:
+            sent = await run_in_ses_thread(
+                email_client.send_pass_emails_bulk,
+                [data for _, _, _, data in pending_emails]
+            )
+        except Exception as e:
+            logger.warning(
+                "Failed to send bulk pass emails",
+                exc_info=True,
+                extra={"extra_fields": {
+                    "recipients": len(pending_emails),
+                    "error": str(e)
+                }}
+            )
+            sent = [False] * len(pending_emails)
+
+        analytics_events = [
+            CardService._email_outcome_event(card, attendee, wallet_passes, email_sent)
+            for (card, attendee, wallet_passes, _), email_sent in zip(pending_emails, sent, strict=True)
+        ]
+        async with session_factory() as db:
+            await CardService._flush_analytics_events(db, analytics_events)
+
+    @staticmethod
+    def _qr_url(card: Card, base_domain: str) -> str:
+        """QR image URL for the pass email"""
+        # Rendered on request by GET /qr/{card_id}; the URL is stable per
+        # card, so it can be served from a CDN
+        return f"{settings.QR_CDN_BASE or base_domain}/qr/{card.card_id}"
+
+    @staticmethod
+    def _email_outcome_event(
+        card: Card,
+        attendee: Attendee,
+        wallet_passes: List[WalletPass],
+        email_sent: bool
+    ) -> Dict[str, Any]:
+        """Enhanced Analytics row for a sent or failed pass email"""
+        if email_sent:
+            return CardService._analytics_event(
+                attendee, card, "email_sent", "delivery",
+                {
+                    "recipient": attendee.email,
+                    "has_apple_wallet": any(p.type == "apple" for p in wallet_passes),
+                    "has_google_wallet": any(p.type == "google" for p in wallet_passes),
+                    "wallet_count": len(wallet_passes)
+                }
+            )
+        return CardService._analytics_event(
+            attendee, card, "email_failed", "error",
+            {"recipient": attendee.email}
         )
 
+    @staticmethod
+    def _analytics_event(
+        attendee: Attendee,
+        card: Card,
+        event_name: str,
+        category: str,
+        properties: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build an analytics_events row for the card delivery path"""
+        return {
+            "tenant_id": attendee.tenant_id,
+            "event_type_id": attendee.event_id,
+            "event_name": event_name,
+            "category": category,
+            "card_id": card.card_id,
+            "attendee_id": attendee.attendee_id,
+            "properties": properties
+        }
+
+    @staticmethod
+    async def _flush_analytics_events(
+        db: AsyncSession,
+        analytics_events: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Write buffered Enhanced Analytics rows with one INSERT and commit
+
+        The commit also covers the other pending delivery writes (legacy
+        wallet events, the email's MessageContext).
+        """
+        try:
+            if analytics_events:
+                await db.execute(insert(AnalyticsEvent), analytics_events)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.warning(
+                "Failed to track Enhanced Analytics events",
+                extra={"extra_fields": {
+                    "events": [event["event_name"] for event in analytics_events],
+                    "error": str(e)
+                }}
+            )
+
     @staticmethod
     async def get_card_by_id(
         db: AsyncSession,
         card_id: uuid.UUID
     ) -> Optional[Card]:
-        """Retrieve card by ID"""
+        """
+        Retrieve card by ID
+
+        No relationships are loaded; callers that need the owner attendee
+        should query it with an explicit loader option.
+        """
         result = await db.execute(
-            select(Card).where(Card.card_id == card_id)
+            select(Card)
+            .where(Card.card_id == card_id)
+            .options(raiseload("*"))
         )
         return result.scalar_one_or_none()
 
     @staticmethod
     async def _generate_apple_wallet_pass(
-        db: AsyncSession,
         card: Card,
         attendee: Attendee,
         event: Event,
         brand: Optional[Brand],
         card_url: str,
-        base_domain: str
+        base_domain: str,
+        display_name: str,
+        additional_fields: Dict[str, Any],
+        analytics_events: List[Dict[str, Any]]
     ) -> Optional[WalletPass]:
         """
         Generate an Apple Wallet (.pkpass) file for the attendee
@@ -328,6 +881,9 @@ class CardService:
             event: Event database record
             card_url: URL to the digital card
             base_domain: Base domain for URLs
+            display_name: Attendee name shown on the pass
+            additional_fields: Extra pass fields (organization, title)
+            analytics_events: Buffer for Enhanced Analytics rows
 
         Returns:
             WalletPass object with download URL or None if generation failed
@@ -345,65 +901,75 @@ class CardService:
             brand_name = brand.display_name if brand else settings.APPLE_WALLET_ORGANIZATION_NAME
             brand_theme = brand.theme_json if brand else {}
 
-            # Create generator instance with brand name
-            generator = AppleWalletPassGenerator(
-                team_id=settings.APPLE_WALLET_TEAM_ID,
-                pass_type_id=settings.APPLE_WALLET_PASS_TYPE_ID,
-                organization_name=brand_name,
-                cert_path=settings.APPLE_WALLET_CERT_PATH,
-                key_path=settings.APPLE_WALLET_KEY_PATH,
-                wwdr_cert_path=settings.APPLE_WALLET_WWDR_CERT_PATH
+            # Generator with brand name (cached per brand)
+            generator = _get_apple_generator(
+                settings.APPLE_WALLET_TEAM_ID,
+                settings.APPLE_WALLET_PASS_TYPE_ID,
+                brand_name,
+                settings.APPLE_WALLET_CERT_PATH,
+                settings.APPLE_WALLET_KEY_PATH,
+                settings.APPLE_WALLET_WWDR_CERT_PATH
             )
 
-            # Prepare additional fields for the pass
-            additional_fields = {}
-            if attendee.org_name:
-                additional_fields["organization"] = {
-                    "label": "ORGANIZATION",
-                    "value": attendee.org_name
-                }
-            if attendee.title:
-                additional_fields["title"] = {
-                    "label": "TITLE",
-                    "value": attendee.title
-                }
-
-            # Generate the .pkpass file
-            display_name = f"{attendee.first_name or ''} {attendee.last_name or ''}".strip()
-            if not display_name:
-                display_name = attendee.email or "Attendee"
-
-            # Extract brand colors for wallet pass styling
-            apple_wallet_theme = brand_theme.get('apple_wallet', {})
-            background_color = apple_wallet_theme.get('background_color') or brand_theme.get('primary_color', '#1E40AF')
-            foreground_color = apple_wallet_theme.get('foreground_color', '#FFFFFF')
-            label_color = apple_wallet_theme.get('label_color', '#E5E7EB')
-
-            # Fetch brand images from URLs (if configured)
-            brand_images = await fetch_brand_images(brand_theme, wallet_type='apple')
-            logo_image = brand_images.get('logo')
-            icon_image = brand_images.get('icon')
-            strip_image = brand_images.get('strip')
+            # Event-level pass parts are built once and reused for every
+            # attendee until the event or brand changes
+            template_key = (
+                event.event_id,
+                event.updated_at,
+                brand.brand_id if brand else None,
+                brand.updated_at if brand else None
+            )
+            template = _apple_pass_templates.get(template_key)
+            if template is None:
+                # Extract brand colors for wallet pass styling
+                apple_wallet_theme = brand_theme.get('apple_wallet', {})
+                background_color = apple_wallet_theme.get('background_color') or brand_theme.get('primary_color', '#1E40AF')
+                foreground_color = apple_wallet_theme.get('foreground_color', '#FFFFFF')
+                label_color = apple_wallet_theme.get('label_color', '#E5E7EB')
+
+                # Fetch brand images from URLs (if configured), cached per brand
+                brand_images = await cached_fetch_brand_images(
+                    brand.brand_id if brand else None, brand_theme, wallet_type='apple'
+                )
 
-            pkpass_bytes = generator.create_event_pass(
+                template = await asyncio.to_thread(
+                    generator.build_event_template,
+                    event_name=event.name,
+                    event_date=event.starts_at,
+                    logo_image=brand_images.get('logo'),
+                    icon_image=brand_images.get('icon'),
+                    strip_image=brand_images.get('strip'),
+                    background_color=background_color,
+                    foreground_color=foreground_color,
+                    label_color=label_color
+                )
+                _apple_pass_templates[template_key] = template
+                if len(_apple_pass_templates) > _APPLE_PASS_TEMPLATE_CACHE_SIZE:
+                    _apple_pass_templates.popitem(last=False)
+            else:
+                _apple_pass_templates.move_to_end(template_key)
+
+            # Signing and S3 upload are blocking; run them off the event loop
+            # so the Google pass can progress concurrently. The archive is
+            # written into one buffer that is uploaded as-is, without copying
+            # it out to bytes first.
+            pkpass_buffer = io.BytesIO()
+            await asyncio.to_thread(
+                generator.create_event_pass,
+                template,
                 serial_number=str(card.card_id),
                 attendee_name=display_name,
-                event_name=event.name,
-                event_date=event.starts_at,
                 qr_code_url=card_url,
-                background_color=background_color,
-                foreground_color=foreground_color,
-                label_color=label_color,
                 additional_fields=additional_fields,
-                logo_image=logo_image,
-                icon_image=icon_image,
-                strip_image=strip_image
+                output=pkpass_buffer
             )
 
             # Upload .pkpass file to S3
             pkpass_s3_key = f"passes/apple/{attendee.tenant_id}/{card.card_id}.pkpass"
-            s3_client.upload_file(
-                file_bytes=pkpass_bytes,
+            pkpass_buffer.seek(0)
+            await asyncio.to_thread(
+                s3_client.upload_fileobj,
+                pkpass_buffer,
                 key=pkpass_s3_key,
                 content_type="application/vnd.apple.pkpass"
             )
@@ -420,40 +986,11 @@ class CardService:
                 }}
             )
 
-            # Track wallet pass generation (legacy table)
-            try:
-                from app.services.analytics_service import AnalyticsService
-                await AnalyticsService.track_wallet_event(
-                    db=db,
-                    card=card,
-                    event_id=event.event_id,
-                    platform="apple",
-                    event_type="generated",
-                    request=None
-                )
-            except Exception as e:
-                logger.warning(
-                    "Failed to track Apple Wallet pass generation",
-                    extra={"extra_fields": {"card_id": str(card.card_id), "error": str(e)}}
-                )
-
             # Track in Enhanced Analytics
-            try:
-                from app.models.database import AnalyticsEvent
-                await db.execute(
-                    AnalyticsEvent.__table__.insert().values(
-                        tenant_id=attendee.tenant_id,
-                        event_type_id=event.event_id,
-                        event_name="apple_wallet_generated",
-                        category="delivery",
-                        card_id=card.card_id,
-                        attendee_id=attendee.attendee_id,
-                        properties={"platform": "apple", "s3_key": pkpass_s3_key}
-                    )
-                )
-                await db.commit()
-            except Exception as e:
-                logger.warning(f"Failed to track Apple Wallet in Enhanced Analytics: {e}")
+            analytics_events.append(CardService._analytics_event(
+                attendee, card, "apple_wallet_generated", "delivery",
+                {"platform": "apple", "s3_key": pkpass_s3_key}
+            ))
 
             return WalletPass(
                 type="apple",
@@ -471,13 +1008,15 @@ class CardService:
 
     @staticmethod
     async def _generate_google_wallet_pass(
-        db: AsyncSession,
         card: Card,
         attendee: Attendee,
         event: Event,
         brand: Optional[Brand],
         card_url: str,
-        base_domain: str
+        base_domain: str,
+        display_name: str,
+        additional_fields: Dict[str, Any],
+        analytics_events: List[Dict[str, Any]]
     ) -> Optional[WalletPass]:
         """
         Generate a Google Wallet pass for the attendee
@@ -488,6 +1027,9 @@ class CardService:
             event: Event database record
             card_url: URL to the digital card
             base_domain: Base domain for URLs
+            display_name: Attendee name shown on the pass
+            additional_fields: Extra pass fields (organization, title)
+            analytics_events: Buffer for Enhanced Analytics rows
 
         Returns:
             WalletPass object with save URL or None if generation failed
@@ -504,48 +1046,40 @@ class CardService:
             # Extract brand information for customization
             brand_name = brand.display_name if brand else "OutreachPass"
 
-            # Create generator instance
-            generator = GoogleWalletPassGenerator(
-                issuer_id=settings.GOOGLE_WALLET_ISSUER_ID,
-                service_account_email=settings.GOOGLE_WALLET_SERVICE_ACCOUNT_EMAIL,
-                service_account_file=settings.GOOGLE_WALLET_SERVICE_ACCOUNT_FILE,
-                origins=settings.GOOGLE_WALLET_ORIGINS
+            # Generator instance (credentials are loaded once per process)
+            generator = _get_google_generator(
+                settings.GOOGLE_WALLET_ISSUER_ID,
+                settings.GOOGLE_WALLET_SERVICE_ACCOUNT_EMAIL,
+                settings.GOOGLE_WALLET_SERVICE_ACCOUNT_FILE,
+                tuple(settings.GOOGLE_WALLET_ORIGINS)
             )
 
             # Generate class ID from event (one class per event)
             # Use configurable suffix to allow forcing new class creation with all required fields
             class_id = f"{settings.GOOGLE_WALLET_CLASS_SUFFIX}_{event.event_id}".replace("-", "_")
 
-            # Create/update the pass class (template) for this event
-            generator.create_event_pass_class(
-                class_id=class_id,
-                event_name=event.name,
-                organization_name=brand_name
-            )
-
-            # Prepare additional fields for the pass
-            additional_fields = {}
-            if attendee.org_name:
-                additional_fields["organization"] = {
-                    "label": "ORGANIZATION",
-                    "value": attendee.org_name
-                }
-            if attendee.title:
-                additional_fields["title"] = {
-                    "label": "TITLE",
-                    "value": attendee.title
-                }
-
-            # Get attendee display name
-            display_name = f"{attendee.first_name or ''} {attendee.last_name or ''}".strip()
-            if not display_name:
-                display_name = attendee.email or "Attendee"
+            # Create the pass class (template) for this event once per process
+            # Google Wallet REST calls are blocking; run them off the event loop
+            class_key = (settings.GOOGLE_WALLET_ISSUER_ID, class_id)
+            if not _google_class_known(class_key):
+                async with _google_class_lock:
+                    if not _google_class_known(class_key):
+                        full_class_id = await asyncio.to_thread(
+                            generator.create_event_pass_class,
+                            class_id=class_id,
+                            event_name=event.name,
+                            organization_name=brand_name
+                        )
+                        # Failures are retried for the next attendee
+                        if full_class_id:
+                            _google_class_ids_created[class_key] = time.monotonic()
 
             # Generate object ID from card
             object_id = f"card_{card.card_id}".replace("-", "_")
 
             # Create the pass object for this attendee
-            full_object_id = generator.create_event_pass_object(
+            full_object_id = await asyncio.to_thread(
+                generator.create_event_pass_object,
                 class_id=class_id,
                 object_id=object_id,
                 attendee_name=display_name,
@@ -556,6 +1090,9 @@ class CardService:
             )
 
             if not full_object_id:
+                # The class may have been removed on Google's side; create it
+                # again on the next attempt
+                _google_class_ids_created.pop(class_key, None)
                 logger.warning(
                     "Failed to create Google Wallet pass object",
                     extra={"extra_fields": {"card_id": str(card.card_id), "class_id": class_id}}
@@ -577,40 +1114,11 @@ class CardService:
                 }}
             )
 
-            # Track wallet pass generation (legacy table)
-            try:
-                from app.services.analytics_service import AnalyticsService
-                await AnalyticsService.track_wallet_event(
-                    db=db,
-                    card=card,
-                    event_id=event.event_id,
-                    platform="google",
-                    event_type="generated",
-                    request=None
-                )
-            except Exception as e:
-                logger.warning(
-                    "Failed to track Google Wallet pass generation",
-                    extra={"extra_fields": {"card_id": str(card.card_id), "error": str(e)}}
-                )
-
             # Track in Enhanced Analytics
-            try:
-                from app.models.database import AnalyticsEvent
-                await db.execute(
-                    AnalyticsEvent.__table__.insert().values(
-                        tenant_id=attendee.tenant_id,
-                        event_type_id=event.event_id,
-                        event_name="google_wallet_generated",
-                        category="delivery",
-                        card_id=card.card_id,
-                        attendee_id=attendee.attendee_id,
-                        properties={"platform": "google", "save_url": save_url}
-                    )
-                )
-                await db.commit()
-            except Exception as e:
-                logger.warning(f"Failed to track Google Wallet in Enhanced Analytics: {e}")
+            analytics_events.append(CardService._analytics_event(
+                attendee, card, "google_wallet_generated", "delivery",
+                {"platform": "google", "save_url": save_url}
+            ))
 
             return WalletPass(
                 type="google",
@@ -0,0 +1,129 @@
+"""
+Feature Flag Service
+
+Resolves per-tenant/per-brand feature flags with an in-process cache.
+Flags are read on hot paths but change rarely, so lookups are served from
+memory and invalidated by the ``flag_changed`` NOTIFY channel (see
+migrations/add_feature_flag_notify.sql). A TTL bounds staleness when the
+listener is not running (e.g. between Lambda invocations).
+"""
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.database import FeatureFlag
+
+logger = get_logger(__name__)
+
+# Tenant-wide flags are stored with the all-zero brand_id (schema default)
+TENANT_WIDE_BRAND_ID = uuid.UUID(int=0)
+
+FLAG_CHANGED_CHANNEL = "flag_changed"
+
+_FlagKey = Tuple[str, uuid.UUID, uuid.UUID]
+
+# (flag_key, tenant_id, brand_id) -> (cache version, cached_at, is_enabled)
+_flag_cache: "OrderedDict[_FlagKey, Tuple[int, float, bool]]" = OrderedDict()
+_cache_version = 0
+_listener_connection: Optional[AsyncConnection] = None
+
+
+def invalidate_flag_cache() -> None:
+    """Drop every cached flag by bumping the cache version"""
+    global _cache_version
+    _cache_version += 1
+    _flag_cache.clear()
+
+
+def _on_flag_changed(connection, pid, channel, payload) -> None:
+    """asyncpg NOTIFY callback"""
+    logger.info(
+        "Feature flag changed, invalidating cache",
+        extra={"extra_fields": {"payload": payload}}
+    )
+    invalidate_flag_cache()
+
+
+async def start_flag_listener(engine: AsyncEngine) -> None:
+    """
+    LISTEN on the flag_changed channel using a dedicated connection
+
+    Args:
+        engine: Async engine to take the listener connection from
+    """
+    global _listener_connection
+    if _listener_connection is not None:
+        return
+
+    _listener_connection = await engine.connect()
+    raw_connection = await _listener_connection.get_raw_connection()
+    await raw_connection.driver_connection.add_listener(FLAG_CHANGED_CHANNEL, _on_flag_changed)
+    logger.info("Feature flag listener started")
+
+
+async def stop_flag_listener() -> None:
+    """Release the listener connection"""
+    global _listener_connection
+    if _listener_connection is None:
+        return
+
+    await _listener_connection.close()
+    _listener_connection = None
+
+
+class FeatureFlagService:
+    """Business logic for feature flag resolution"""
+
+    @staticmethod
+    async def get_flag(
+        db: AsyncSession,
+        flag_key: str,
+        tenant_id: uuid.UUID,
+        brand_id: Optional[uuid.UUID] = None
+    ) -> bool:
+        """
+        Check whether a feature flag is enabled
+
+        Args:
+            db: Database session (only used on cache miss)
+            flag_key: Flag identifier
+            tenant_id: Tenant to resolve for
+            brand_id: Optional brand; tenant-wide flag when omitted
+
+        Returns:
+            True if the flag exists and is enabled
+        """
+        key = (flag_key, tenant_id, brand_id or TENANT_WIDE_BRAND_ID)
+        now = time.monotonic()
+
+        cached = _flag_cache.get(key)
+        if cached is not None:
+            version, cached_at, is_enabled = cached
+            if version == _cache_version and now - cached_at < settings.FEATURE_FLAG_CACHE_TTL_SECONDS:
+                _flag_cache.move_to_end(key)
+                return is_enabled
+
+        version = _cache_version
+        result = await db.execute(
+            select(FeatureFlag.is_enabled).where(
+                FeatureFlag.flag_key == key[0],
+                FeatureFlag.tenant_id == key[1],
+                FeatureFlag.brand_id == key[2]
+            )
+        )
+        is_enabled = bool(result.scalar())
+
+        # A NOTIFY may have arrived while the query was in flight
+        if version == _cache_version:
+            _flag_cache[key] = (version, now, is_enabled)
+            _flag_cache.move_to_end(key)
+            if len(_flag_cache) > settings.FEATURE_FLAG_CACHE_SIZE:
+                _flag_cache.popitem(last=False)
+
+        return is_enabled
@@ -0,0 +1,90 @@
+"""
+Message Context Storage
+
+Maps email message IDs to the card, tenant, event and attendee they were
+sent for, so the tracking endpoints can attribute opens and clicks. The
+store functions are synchronous because they are called from the email
+sending code, which runs in worker threads.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal
+from app.core.logging import get_logger
+from app.models.database import MessageContext
+
+logger = get_logger(__name__)
+
+
+def store_message_context(
+    message_id: str,
+    card_id: uuid.UUID,
+    tenant_id: uuid.UUID,
+    event_id: Optional[uuid.UUID] = None,
+    attendee_id: Optional[uuid.UUID] = None,
+    recipient_email: str = ""
+):
+    """
+    Store message context for tracking correlation in database
+
+    Note: This is a synchronous function that uses asyncio.run for database operations.
+    It's called from synchronous email sending code.
+    """
+    store_message_contexts_bulk([{
+        "message_id": message_id,
+        "card_id": card_id,
+        "tenant_id": tenant_id,
+        "event_id": event_id,
+        "attendee_id": attendee_id,
+        "recipient_email": recipient_email
+    }])
+
+
+def store_message_contexts_bulk(contexts: List[Dict[str, Any]]):
+    """
+    Store several message contexts with one INSERT
+
+    Synchronous like store_message_context; each dict takes the same
+    fields as its arguments.
+    """
+    if not contexts:
+        return
+
+    expires_at = datetime.now(timezone.utc) + timedelta(days=7)
+    rows = [
+        {"event_id": None, "attendee_id": None, "recipient_email": "", **context, "expires_at": expires_at}
+        for context in contexts
+    ]
+
+    async def _store():
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(MessageContext), rows)
+            await db.commit()
+
+    try:
+        asyncio.run(_store())
+    except Exception as e:
+        logger.warning(f"Failed to store message context: {str(e)}")
+
+
+async def get_message_context(message_id: str, db: AsyncSession) -> Optional[dict]:
+    """Retrieve message context from database"""
+    result = await db.execute(
+        select(MessageContext).where(MessageContext.message_id == message_id)
+    )
+    context = result.scalar_one_or_none()
+
+    if context:
+        return {
+            "card_id": context.card_id,
+            "tenant_id": context.tenant_id,
+            "event_id": context.event_id,
+            "attendee_id": context.attendee_id,
+            "recipient_email": context.recipient_email
+        }
+    return None
@@ -8,8 +8,9 @@ A .pkpass file is a signed ZIP archive containing:
 - manifest.json (file checksums)
 - signature (cryptographic signature)
 
-Implementation uses native Python libraries and OpenSSL for signing.
-No third-party wallet libraries required.
+Implementation uses native Python libraries; the manifest is signed
+in-process with cryptography's PKCS#7 builder (no openssl subprocess or
+temp files). No third-party wallet libraries required.
 
 Certificate Setup:
 1. Create Pass Type ID in Apple Developer Portal
@@ -22,20 +23,59 @@ Example OpenSSL commands:
   openssl pkcs12 -in Certificates.p12 -out key.pem -nodes
   openssl x509 -inform DER -in AppleWWDRCA.cer -out wwdr.pem
 """
+import functools
 import logging
-import json
 import hashlib
 import zipfile
 import io
 import os
-import subprocess
-import tempfile
-from typing import Optional, Dict, Any
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, BinaryIO, List, Tuple
 from datetime import datetime
 from pathlib import Path
 
+import orjson
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.serialization import pkcs7
+
 logger = logging.getLogger(__name__)
 
+def _sha1_hex(data: bytes) -> str:
+    """
+    SHA-1 hex digest for manifest.json (required by the pkpass format)
+
+    The digest is a file checksum, not a security control, so it is
+    flagged as such to stay on OpenSSL's SHA-1 path on FIPS builds.
+    """
+    return hashlib.sha1(data, usedforsecurity=False).hexdigest()
+
+
+@dataclass(frozen=True)
+class EventPassTemplate:
+    """Parts of pass.json and the .pkpass archive shared by every pass of an event"""
+    pass_fields: Dict[str, Any]  # Top-level pass.json fields
+    header_fields: List[Dict[str, Any]]
+    secondary_fields: List[Dict[str, Any]]
+    image_hashes: Dict[str, str]  # filename -> SHA-1 for manifest.json
+    zip_skeleton: bytes  # ZIP archive holding only the images
+
+
+# (signing certificate, private key, WWDR intermediate certificate)
+Signer = Tuple[x509.Certificate, Any, x509.Certificate]
+
+
+@functools.lru_cache(maxsize=4)
+def _load_signer(cert_path: str, key_path: str, wwdr_cert_path: str) -> Signer:
+    """Parse the signing certificate, key and WWDR chain once per process"""
+    with open(cert_path, "rb") as f:
+        cert = x509.load_pem_x509_certificate(f.read())
+    with open(key_path, "rb") as f:
+        key = serialization.load_pem_private_key(f.read(), password=None)
+    with open(wwdr_cert_path, "rb") as f:
+        wwdr_cert = x509.load_pem_x509_certificate(f.read())
+    return cert, key, wwdr_cert
+
 
 class AppleWalletPassGenerator:
     """Generate Apple Wallet (.pkpass) passes"""
@@ -75,189 +115,228 @@ class AppleWalletPassGenerator:
         if wwdr_cert_path and not os.path.exists(wwdr_cert_path):
             logger.warning(f"WWDR certificate not found at {wwdr_cert_path}")
 
-    def create_event_pass(
+        self._signer: Optional[Signer] = None
+        if cert_path and key_path and wwdr_cert_path:
+            try:
+                self._signer = _load_signer(cert_path, key_path, wwdr_cert_path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Failed to load Apple Wallet signing certificates: {str(e)}")
+
+    def build_event_template(
         self,
-        serial_number: str,
-        attendee_name: str,
         event_name: str,
         event_date: datetime,
-        qr_code_url: str,
         logo_image: Optional[bytes] = None,
         icon_image: Optional[bytes] = None,
         strip_image: Optional[bytes] = None,
         background_color: str = "#1E40AF",  # Blue
         foreground_color: str = "#FFFFFF",  # White
         label_color: str = "#E5E7EB",  # Light gray
-        additional_fields: Optional[Dict[str, Any]] = None
-    ) -> bytes:
+    ) -> EventPassTemplate:
         """
-        Create an Apple Wallet event pass
+        Precompute everything the passes of one event have in common
 
         Args:
-            serial_number: Unique identifier for this pass (e.g., card_id)
-            attendee_name: Name to display on pass
             event_name: Event name
             event_date: Event start date/time
-            qr_code_url: URL for QR code on back of pass
             logo_image: Logo image bytes (PNG, ~160x50px)
             icon_image: Icon image bytes (PNG, 58x58px)
             strip_image: Strip image bytes (PNG, 375x123px for 1x)
             background_color: Hex color for background
             foreground_color: Hex color for text
             label_color: Hex color for field labels
-            additional_fields: Additional key-value pairs to display
 
         Returns:
-            bytes: Complete .pkpass file as bytes
+            EventPassTemplate to pass to create_event_pass
         """
-        try:
-            # Create pass object
-            pass_obj = Pass(
-                passTypeIdentifier=self.pass_type_id,
-                organizationName=self.organization_name,
-                teamIdentifier=self.team_id,
-                serialNumber=serial_number,
-                description=f"{event_name} - Digital Contact Card"
-            )
+        pass_fields = {
+            "formatVersion": 1,
+            "passTypeIdentifier": self.pass_type_id,
+            "organizationName": self.organization_name,
+            "teamIdentifier": self.team_id,
+            "description": f"{event_name} - Digital Contact Card",
+            "backgroundColor": background_color,
+            "foregroundColor": foreground_color,
+            "labelColor": label_color,
+            "logoText": event_name
+        }
+
+        header_fields = [
+            {
+                "key": "event",
+                "label": "EVENT",
+                "value": event_name
+            }
+        ]
+        secondary_fields = [
+            {
+                "key": "date",
+                "label": "DATE",
+                "value": event_date.strftime("%B %d, %Y"),
+                "dateStyle": "PKDateStyleMedium"
+            },
+            {
+                "key": "time",
+                "label": "TIME",
+                "value": event_date.strftime("%I:%M %p"),
+                "timeStyle": "PKDateStyleShort"
+            }
+        ]
+
+        # Archive the images once; each pass copies this archive and appends
+        # its own pass.json, manifest.json and signature. PNGs are already
+        # DEFLATE-compressed, so they are stored as-is. Each image is hashed
+        # right before it is written (same file for 1x and 2x), while its
+        # bytes are still in cache.
+        image_hashes = {}
+        zip_buffer = io.BytesIO()
+        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_STORED) as zip_file:
+            for name, image in (("logo", logo_image), ("icon", icon_image), ("strip", strip_image)):
+                if not image:
+                    continue
+                digest = _sha1_hex(image)
+                for filename in (f"{name}.png", f"{name}@2x.png"):
+                    zip_file.writestr(filename, image)
+                    image_hashes[filename] = digest
+
+        return EventPassTemplate(
+            pass_fields=pass_fields,
+            header_fields=header_fields,
+            secondary_fields=secondary_fields,
+            image_hashes=image_hashes,
+            zip_skeleton=zip_buffer.getvalue()
+        )
 
-            # Set visual appearance
-            pass_obj.backgroundColor = background_color
-            pass_obj.foregroundColor = foreground_color
-            pass_obj.labelColor = label_color
-            pass_obj.logoText = event_name
-
-            # Add barcode/QR code for back of pass
-            pass_obj.barcode = Barcode(
-                message=qr_code_url,
-                format=BarcodeFormat.QR,
-                altText=attendee_name
-            )
+    def create_event_pass(
+        self,
+        template: EventPassTemplate,
+        serial_number: str,
+        attendee_name: str,
+        qr_code_url: str,
+        additional_fields: Optional[Dict[str, Any]] = None,
+        output: Optional[BinaryIO] = None
+    ) -> Optional[bytes]:
+        """
+        Create an Apple Wallet event pass
+
+        Only pass.json differs between the passes of an event, so this
+        hashes one file and signs the manifest; the images come
+        precompressed from the template.
+
+        Args:
+            template: Event template from build_event_template
+            serial_number: Unique identifier for this pass (e.g., card_id)
+            attendee_name: Name to display on pass
+            qr_code_url: URL for QR code on back of pass
+            additional_fields: Additional key-value pairs to display
+            output: Empty, seekable binary file to write the .pkpass into
+                instead of returning it (avoids copying the archive out of memory)
 
-            # Event ticket style
-            pass_obj.eventTicket = {
-                "headerFields": [
-                    {
-                        "key": "event",
-                        "label": "EVENT",
-                        "value": event_name
-                    }
-                ],
-                "primaryFields": [
-                    {
-                        "key": "attendee",
-                        "label": "ATTENDEE",
-                        "value": attendee_name
-                    }
-                ],
-                "secondaryFields": [
-                    {
-                        "key": "date",
-                        "label": "DATE",
-                        "value": event_date.strftime("%B %d, %Y"),
-                        "dateStyle": "PKDateStyleMedium"
-                    },
-                    {
-                        "key": "time",
-                        "label": "TIME",
-                        "value": event_date.strftime("%I:%M %p"),
-                        "timeStyle": "PKDateStyleShort"
-                    }
-                ],
-                "auxiliaryFields": [],
-                "backFields": [
-                    {
-                        "key": "contact_card",
-                        "label": "Digital Contact Card",
-                        "value": qr_code_url
-                    }
-                ]
+        Returns:
+            bytes: Complete .pkpass file as bytes, or None when written to output
+        """
+        try:
+            auxiliary_fields = []
+            for key, value in (additional_fields or {}).items():
+                if isinstance(value, dict):
+                    auxiliary_fields.append({
+                        "key": key,
+                        "label": value.get("label", key.upper()),
+                        "value": value.get("value", "")
+                    })
+                else:
+                    auxiliary_fields.append({
+                        "key": key,
+                        "label": key.upper().replace("_", " "),
+                        "value": str(value)
+                    })
+
+            barcode = {
+                "message": qr_code_url,
+                "format": "PKBarcodeFormatQR",
+                "messageEncoding": "iso-8859-1",
+                "altText": attendee_name
             }
 
-            # Add any additional fields
-            if additional_fields:
-                for key, value in additional_fields.items():
-                    if isinstance(value, dict):
-                        pass_obj.eventTicket["auxiliaryFields"].append({
-                            "key": key,
-                            "label": value.get("label", key.upper()),
-                            "value": value.get("value", "")
-                        })
-                    else:
-                        pass_obj.eventTicket["auxiliaryFields"].append({
-                            "key": key,
-                            "label": key.upper().replace("_", " "),
-                            "value": str(value)
-                        })
-
-            # Add images if provided
-            if logo_image:
-                pass_obj.addFile("logo.png", logo_image)
-                pass_obj.addFile("logo@2x.png", logo_image)
-
-            if icon_image:
-                pass_obj.addFile("icon.png", icon_image)
-                pass_obj.addFile("icon@2x.png", icon_image)
-
-            if strip_image:
-                pass_obj.addFile("strip.png", strip_image)
-                pass_obj.addFile("strip@2x.png", strip_image)
-
-            # Generate .pkpass file
+            # Compact UTF-8 bytes, hashed and zipped as-is
+            pass_json = orjson.dumps({
+                **template.pass_fields,
+                "serialNumber": serial_number,
+                "barcode": barcode,
+                "barcodes": [barcode],
+                "eventTicket": {
+                    "headerFields": template.header_fields,
+                    "primaryFields": [
+                        {
+                            "key": "attendee",
+                            "label": "ATTENDEE",
+                            "value": attendee_name
+                        }
+                    ],
+                    "secondaryFields": template.secondary_fields,
+                    "auxiliaryFields": auxiliary_fields,
+                    "backFields": [
+                        {
+                            "key": "contact_card",
+                            "label": "Digital Contact Card",
+                            "value": qr_code_url
+                        }
+                    ]
+                }
+            })
+
+            manifest = dict(template.image_hashes)
+            manifest["pass.json"] = _sha1_hex(pass_json)
+            manifest_json = orjson.dumps(manifest)
+
+            signature = None
             if self.cert_path and self.key_path and self.wwdr_cert_path:
-                # Sign the pass with certificates
-                pkpass_bytes = pass_obj.create(
-                    self.cert_path,
-                    self.key_path,
-                    self.wwdr_cert_path
-                )
+                signature = self._sign_manifest(manifest_json)
             else:
                 # For development/testing: create unsigned pass
                 logger.warning("Creating unsigned .pkpass file - certificates not configured")
-                pkpass_bytes = self._create_unsigned_pass(pass_obj)
 
-            return pkpass_bytes
+            target = output if output is not None else io.BytesIO()
+            target.write(template.zip_skeleton)
+            target.seek(0)
+            # Level 1 is several times faster than the default for these
+            # small JSON entries at a negligible size cost
+            with zipfile.ZipFile(target, 'a', zipfile.ZIP_DEFLATED, compresslevel=1) as zip_file:
+                zip_file.writestr("pass.json", pass_json)
+                zip_file.writestr("manifest.json", manifest_json)
+                if signature is not None:
+                    zip_file.writestr("signature", signature)
+
+            return target.getvalue() if output is None else None
 
         except Exception as e:
             logger.error(f"Error creating Apple Wallet pass: {str(e)}", exc_info=True)
             raise
 
-    def _create_unsigned_pass(self, pass_obj: Dict[str, Any]) -> bytes:
+    def _sign_manifest(self, manifest_json: bytes) -> bytes:
         """
-        Create an unsigned .pkpass file for development/testing
-
-        WARNING: Unsigned passes will not work on actual devices.
-        This is only for testing the structure.
+        Create the detached PKCS#7 signature of manifest.json
 
         Args:
-            pass_obj: Pass object to package
+            manifest_json: manifest.json contents
 
         Returns:
-            bytes: Unsigned .pkpass file
+            bytes: DER-encoded signature
         """
-        # Create a ZIP file in memory
-        zip_buffer = io.BytesIO()
-
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            # Add pass.json
-            pass_json = json.dumps(pass_obj.json, indent=2)
-            zip_file.writestr("pass.json", pass_json)
-
-            # Add image files
-            for filename, file_data in pass_obj.files.items():
-                zip_file.writestr(filename, file_data)
-
-            # Create manifest (checksums)
-            manifest = {}
-            manifest["pass.json"] = hashlib.sha1(pass_json.encode()).hexdigest()
-            for filename, file_data in pass_obj.files.items():
-                manifest[filename] = hashlib.sha1(file_data).hexdigest()
-
-            zip_file.writestr("manifest.json", json.dumps(manifest, indent=2))
-
-            # Note: Skipping signature for unsigned pass
-            # In production, this would contain a cryptographic signature
-
-        return zip_buffer.getvalue()
+        if self._signer is None:
+            raise RuntimeError("Apple Wallet signing certificates could not be loaded")
+
+        cert, key, wwdr_cert = self._signer
+        return (
+            pkcs7.PKCS7SignatureBuilder()
+            .set_data(manifest_json)
+            .add_signer(cert, key, hashes.SHA256())
+            .add_certificate(wwdr_cert)
+            .sign(
+                serialization.Encoding.DER,
+                [pkcs7.PKCS7Options.DetachedSignature, pkcs7.PKCS7Options.Binary]
+            )
+        )
 
 
 # Global instance (will be configured from settings)
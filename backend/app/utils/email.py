@@ -1,30 +1,166 @@
+import asyncio
+import functools
+import json
 import logging
 import boto3
 import os
+import secrets
 import uuid
-from urllib.parse import quote
+from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor
 from botocore.config import Config
 from botocore.exceptions import ClientError
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Callable, TypeVar
 from app.core.config import settings
+from app.services.message_context_service import store_message_context
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# SES calls run on their own threads, so sends are not queued behind S3
+# uploads and pass signing in the event loop's default executor (only
+# cpu_count + 4 threads on Lambda). Kept below the client's connection pool.
+SES_MAX_WORKERS = 16
+_ses_executor = ThreadPoolExecutor(max_workers=SES_MAX_WORKERS, thread_name_prefix="ses")
+
+
+def new_message_id() -> str:
+    """Random tracking id for a sent email (32 hex chars, fits message_contexts)"""
+    return secrets.token_hex(16)
+
+
+async def run_in_ses_thread(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking EmailClient call on the SES thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_ses_executor, functools.partial(func, *args, **kwargs))
+
 # Google Wallet button now uses styled HTML button instead of image
 
+# Email colors used when the brand theme does not set them
+_DEFAULT_THEME = {
+    "primary_color": "#0066cc",  # Blue, card button
+    "secondary_color": "#28a745",  # Green, vCard button
+    "text_color": "#333",
+    "light_text_color": "#555",
+}
+
+
+def _email_theme(brand_theme: Optional[dict]) -> Dict[str, Any]:
+    """Brand theme over the default email colors"""
+    return {**_DEFAULT_THEME, **brand_theme} if brand_theme else _DEFAULT_THEME
+
+
+# Wallet pass links in send_pass_email, by pass type
+_WALLET_TEXT = {
+    "apple": "\n\nAdd to Apple Wallet: {url}",
+    "google": "\n\nAdd to Google Wallet: {url}",
+}
+
+_APPLE_WALLET_BUTTON = """
+    <p style="margin-top: 20px;">
+        <a href="{url}" style="background-color: #000000; color: white; padding: 12px 24px; text-decoration: none; border-radius: 8px; display: inline-block; font-weight: 600;">
+            <img src="https://developer.apple.com/wallet/add-to-apple-wallet-logo.svg" alt="Add to Apple Wallet" style="height: 20px; vertical-align: middle; margin-right: 8px;">
+            Add to Apple Wallet
+        </a>
+    </p>"""
+
+_GOOGLE_WALLET_BUTTON = """
+    <p style="margin-top: 20px;">
+        <a href="{url}" style="background-color: #1a73e8; color: white; padding: 12px 24px; text-decoration: none; border-radius: 8px; display: inline-block; font-weight: 600; font-family: Arial, sans-serif;">
+            📱 Add to Google Wallet
+        </a>
+    </p>"""
+
+# SES template used for pass emails; mirrors send_pass_email's inline body
+PASS_EMAIL_TEMPLATE_NAME = "OutreachPassCard"
+
+# SendBulkTemplatedEmail accepts at most 50 destinations per call
+SES_BULK_BATCH_SIZE = 50
+
+PASS_EMAIL_TEMPLATE = {
+    'TemplateName': PASS_EMAIL_TEMPLATE_NAME,
+    'SubjectPart': 'Your {{event_name}} Digital Contact Card',
+    'TextPart': """
+Hello {{display_name}},
+
+Your digital contact card for {{event_name}} is ready!
+
+Access your card: {{card_url}}
+{{#if apple_wallet_url}}
+
+Add to Apple Wallet: {{apple_wallet_url}}{{/if}}{{#if google_wallet_url}}
+
+Add to Google Wallet: {{google_wallet_url}}{{/if}}{{#if vcard_url}}
+
+Download contact (.vcf): {{vcard_url}}{{/if}}
+
+Share your contact info instantly by showing your QR code or sharing your link.
+
+Best regards,
+The {{sender_name}} Team
+""",
+    'HtmlPart': """
+<html>
+<head></head>
+<body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
+    <h2 style="color: {{text_color}};">Hello {{display_name}},</h2>
+    <p style="font-size: 16px; color: {{light_text_color}};">Your digital contact card for <strong>{{event_name}}</strong> is ready!</p>
+    <p style="margin-top: 20px;">
+        <a href="{{card_url}}" style="background-color: {{primary_color}}; color: white; padding: 12px 24px; text-decoration: none; border-radius: 4px; display: inline-block; font-weight: 600;">
+            Access Your Card
+        </a>
+    </p>
+    {{#if apple_wallet_tracked_url}}
+    <p style="margin-top: 20px;">
+        <a href="{{apple_wallet_tracked_url}}" style="background-color: #000000; color: white; padding: 12px 24px; text-decoration: none; border-radius: 8px; display: inline-block; font-weight: 600;">
+            <img src="https://developer.apple.com/wallet/add-to-apple-wallet-logo.svg" alt="Add to Apple Wallet" style="height: 20px; vertical-align: middle; margin-right: 8px;">
+            Add to Apple Wallet
+        </a>
+    </p>{{/if}}{{#if google_wallet_url}}
+    <p style="margin-top: 20px;">
+        <a href="{{google_wallet_url}}" style="background-color: #1a73e8; color: white; padding: 12px 24px; text-decoration: none; border-radius: 8px; display: inline-block; font-weight: 600; font-family: Arial, sans-serif;">
+            📱 Add to Google Wallet
+        </a>
+    </p>{{/if}}{{#if vcard_url}}
+    <p style="margin-top: 20px;">
+        <a href="{{vcard_url}}" style="background-color: {{secondary_color}}; color: white; padding: 12px 24px; text-decoration: none; border-radius: 4px; display: inline-block; font-weight: 600;">
+            📥 Download Contact Card (.vcf)
+        </a>
+    </p>{{/if}}
+    <div style="margin-top: 40px; text-align: center; padding: 20px; background-color: #f5f5f5; border-radius: 8px;">
+        <h3 style="color: {{text_color}}; margin-bottom: 15px;">Your Contact QR Code</h3>
+        <p style="font-size: 14px; color: #666; margin-bottom: 15px;">Share this QR code so others can save your contact info instantly</p>
+        <img src="{{qr_url}}" alt="Contact QR Code" style="width: 250px; height: 250px; border: 2px solid #ddd; border-radius: 8px;" />
+    </div>
+    <p style="margin-top: 30px; font-size: 14px; color: #777;">Share your contact info instantly by showing your QR code or sharing your link.</p>
+    <p style="margin-top: 30px; color: #666; font-size: 14px;">Best regards,<br/>The {{sender_name}} Team</p>
+    {{#if tracking_pixel_url}}<img src="{{tracking_pixel_url}}" width="1" height="1" style="display:none;" alt="" />{{/if}}
+</body>
+</html>
+""",
+}
+
 
 class EmailClient:
     """SES email operations wrapper"""
 
     def __init__(self):
-        # Configure SES client with timeout to prevent Lambda timeouts
+        # Configure SES client with timeout to prevent Lambda timeouts.
+        # Keep-alive and a larger pool let concurrent sends (one thread per
+        # card in bulk delivery) reuse warm TLS connections.
         ses_config = Config(
             connect_timeout=5,
             read_timeout=5,
-            retries={'max_attempts': 2}
+            retries={'max_attempts': 2},
+            tcp_keepalive=True,
+            max_pool_connections=50
         )
         self.ses = boto3.client('ses', region_name=settings.SES_REGION, config=ses_config)
         self.from_email = settings.SES_FROM_EMAIL
+        self._track_base = f"{settings.API_BASE_URL.rstrip('/')}/api/track/email"
+        self._pass_template_ready = False
+        self._pass_template_failed = False
 
     def send_email(
         self,
@@ -36,7 +172,7 @@ class EmailClient:
     ) -> bool:
         """Send email via SES"""
         try:
-            logger.info(f"Attempting to send email to {to_addresses} with subject: {subject}")
+            logger.info("Attempting to send email to %s with subject: %s", to_addresses, subject)
 
             body_data = {'Text': {'Data': body_text, 'Charset': 'UTF-8'}}
             if body_html:
@@ -47,22 +183,18 @@ class EmailClient:
                 'Body': body_data
             }
 
-            kwargs = {
-                'Source': self.from_email,
-                'Destination': {'ToAddresses': to_addresses},
-                'Message': message
-            }
-
-            if reply_to:
-                kwargs['ReplyToAddresses'] = [reply_to]
-
-            response = self.ses.send_email(**kwargs)
+            response = self.ses.send_email(
+                Source=self.from_email,
+                Destination={'ToAddresses': to_addresses},
+                Message=message,
+                **({'ReplyToAddresses': [reply_to]} if reply_to else {})
+            )
             message_id = response.get('MessageId', 'unknown')
-            logger.info(f"Email sent successfully to {to_addresses}. MessageId: {message_id}")
+            logger.info("Email sent successfully to %s. MessageId: %s", to_addresses, message_id)
             return True
 
         except ClientError as e:
-            logger.error(f"SES send error: {e.response['Error']['Code']}",
+            logger.error("SES send error: %s", e.response['Error']['Code'],
                         extra={"error_message": e.response['Error']['Message']})
             return False
 
@@ -83,37 +215,35 @@ class EmailClient:
         tenant_id: Optional[uuid.UUID] = None,
         event_id: Optional[uuid.UUID] = None,
         attendee_id: Optional[uuid.UUID] = None,
-        db: Optional[any] = None
+        db: Optional[any] = None,
+        message_id: Optional[str] = None
     ) -> bool:
-        """Send pass issuance email with optional wallet passes and brand customization"""
-        logger.info(f"send_pass_email called for {to_email}, event: {event_name}, wallet_passes: {len(wallet_passes) if wallet_passes else 0}")
+        """
+        Send pass issuance email with optional wallet passes and brand customization
+
+        Pass message_id when the caller has already stored the tracking
+        MessageContext for it; otherwise one is generated and stored here.
+        """
+        logger.info("send_pass_email called for %s, event: %s, wallet_passes: %d", to_email, event_name, len(wallet_passes or ()))
 
         # Extract brand colors for email styling
-        primary_color = "#0066cc"  # Default blue
-        secondary_color = "#28a745"  # Default green
-        text_color = "#333"
-        light_text_color = "#555"
+        theme = _email_theme(brand_theme)
+        primary_color = theme['primary_color']
+        secondary_color = theme['secondary_color']  # VCard download button
+        text_color = theme['text_color']
+        light_text_color = theme['light_text_color']
         sender_name = brand_name or "OutreachPass"
 
-        if brand_theme:
-            # Primary button color
-            primary_color = brand_theme.get('primary_color', primary_color)
-            # VCard download button color
-            secondary_color = brand_theme.get('secondary_color', secondary_color)
-            # Text colors
-            text_color = brand_theme.get('text_color', text_color)
-            # Lighter text for body
-            light_text_color = brand_theme.get('light_text_color', light_text_color)
-
         subject = f"Your {event_name} Digital Contact Card"
 
         # Generate unique message ID for tracking
-        message_id = str(uuid.uuid4())
+        store_context = message_id is None
+        message_id = message_id or new_message_id()
+        tracked = bool(card_id and tenant_id)
 
         # Store message context for tracking correlation (if tracking enabled)
-        if card_id and tenant_id:
+        if store_context and tracked:
             try:
-                from app.api.tracking import store_message_context
                 store_message_context(
                     message_id=message_id,
                     card_id=card_id,
@@ -123,28 +253,46 @@ class EmailClient:
                     recipient_email=to_email
                 )
             except Exception as e:
-                logger.warning(f"Failed to store message context: {str(e)}")
+                logger.warning("Failed to store message context: %s", e)
 
         # Track email sent event (if db session provided)
         # Note: Analytics tracking is handled by the async caller if needed
         # This synchronous function cannot use await for analytics tracking
 
+        # Send with the stored SES template, so only the per-recipient
+        # values are built and uploaded; the inline body below is the
+        # fallback when the template cannot be created
+        if self._pass_template_available():
+            return self._send_templated_pass_email(self.build_pass_email_data(
+                to_email=to_email,
+                display_name=display_name,
+                event_name=event_name,
+                card_url=card_url,
+                qr_url=qr_url,
+                wallet_passes=wallet_passes,
+                vcard_url=vcard_url,
+                brand_name=brand_name,
+                brand_theme=brand_theme,
+                card_id=card_id,
+                tenant_id=tenant_id,
+                message_id=message_id
+            ))
+
         # Helper function to wrap URLs with click tracking
-        def wrap_url(url: str, link_type: str) -> str:
-            """Wrap URL with tracking redirect if tracking is enabled"""
-            if card_id and tenant_id:
-                base_url = settings.API_BASE_URL.rstrip('/')
-                return f"{base_url}/api/track/email/click?url={quote(url)}&mid={message_id}&type={link_type}"
-            return url
+        if tracked:
+            def wrap_url(url: str, link_type: str) -> str:
+                """Wrap URL with tracking redirect"""
+                return self._click_tracking_url(url, message_id, link_type)
+        else:
+            def wrap_url(url: str, link_type: str) -> str:
+                return url
 
         # Build wallet pass text for plain text email
-        wallet_text = ""
-        if wallet_passes:
-            for wallet_pass in wallet_passes:
-                if wallet_pass.type == "apple":
-                    wallet_text += f"\n\nAdd to Apple Wallet: {wallet_pass.url}"
-                elif wallet_pass.type == "google":
-                    wallet_text += f"\n\nAdd to Google Wallet: {wallet_pass.url}"
+        wallet_text = "".join(
+            _WALLET_TEXT[wallet_pass.type].format(url=wallet_pass.url)
+            for wallet_pass in wallet_passes or ()
+            if wallet_pass.type in _WALLET_TEXT
+        )
 
         # Add VCard download link
         vcard_text = ""
@@ -166,28 +314,15 @@ The {sender_name} Team
 """
 
         # Build wallet pass buttons for HTML email
-        wallet_buttons = ""
-        if wallet_passes:
-            for wallet_pass in wallet_passes:
-                # IMPORTANT: Google Wallet URLs are JWT-signed and MUST NOT be wrapped/redirected
-                # Apple Wallet URLs can use tracking since they're direct .pkpass downloads
-                if wallet_pass.type == "apple":
-                    tracked_wallet_url = wrap_url(wallet_pass.url, "wallet")
-                    wallet_buttons += f"""
-    <p style="margin-top: 20px;">
-        <a href="{tracked_wallet_url}" style="background-color: #000000; color: white; padding: 12px 24px; text-decoration: none; border-radius: 8px; display: inline-block; font-weight: 600;">
-            <img src="https://developer.apple.com/wallet/add-to-apple-wallet-logo.svg" alt="Add to Apple Wallet" style="height: 20px; vertical-align: middle; margin-right: 8px;">
-            Add to Apple Wallet
-        </a>
-    </p>"""
-                elif wallet_pass.type == "google":
-                    # Use direct URL - Google Wallet JWT-signed URLs cannot be redirected
-                    wallet_buttons += f"""
-    <p style="margin-top: 20px;">
-        <a href="{wallet_pass.url}" style="background-color: #1a73e8; color: white; padding: 12px 24px; text-decoration: none; border-radius: 8px; display: inline-block; font-weight: 600; font-family: Arial, sans-serif;">
-            📱 Add to Google Wallet
-        </a>
-    </p>"""
+        # IMPORTANT: Google Wallet URLs are JWT-signed and MUST NOT be wrapped/redirected
+        # Apple Wallet URLs can use tracking since they're direct .pkpass downloads
+        wallet_buttons = "".join(
+            _APPLE_WALLET_BUTTON.format(url=wrap_url(wallet_pass.url, "wallet"))
+            if wallet_pass.type == "apple"
+            else _GOOGLE_WALLET_BUTTON.format(url=wallet_pass.url)
+            for wallet_pass in wallet_passes or ()
+            if wallet_pass.type in ("apple", "google")
+        )
 
         # Build VCard download button for HTML email (tracking disabled for reliability)
         vcard_button = ""
@@ -204,9 +339,8 @@ The {sender_name} Team
 
         # Generate tracking pixel URL
         tracking_pixel = ""
-        if card_id and tenant_id:
-            base_url = settings.API_BASE_URL.rstrip('/')
-            tracking_pixel = f'<img src="{base_url}/api/track/email/open/{message_id}" width="1" height="1" style="display:none;" alt="" />'
+        if tracked:
+            tracking_pixel = f'<img src="{self._track_base}/open/{message_id}" width="1" height="1" style="display:none;" alt="" />'
 
         body_html = f"""
 <html>
@@ -239,6 +373,157 @@ The {sender_name} Team
             body_html=body_html
         )
 
+    def _click_tracking_url(self, url: str, message_id: str, link_type: str) -> str:
+        """Click tracking redirect for a link in a pass email"""
+        return f"{self._track_base}/click?{urlencode({'url': url, 'mid': message_id, 'type': link_type})}"
+
+    def ensure_pass_email_template(self) -> None:
+        """Create (or refresh) the bulk pass email SES template, once per process"""
+        if self._pass_template_ready:
+            return
+
+        try:
+            self.ses.create_template(Template=PASS_EMAIL_TEMPLATE)
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'AlreadyExists':
+                raise
+            self.ses.update_template(Template=PASS_EMAIL_TEMPLATE)
+        self._pass_template_ready = True
+
+    def _pass_template_available(self) -> bool:
+        """Ensure the pass email template exists; after one failure, stop trying"""
+        if self._pass_template_failed:
+            return False
+        try:
+            self.ensure_pass_email_template()
+            return True
+        except ClientError as e:
+            logger.warning("SES pass template unavailable, sending inline bodies: %s", e.response['Error']['Code'])
+            self._pass_template_failed = True
+            return False
+
+    def _send_templated_pass_email(self, recipient: Dict[str, Any]) -> bool:
+        """Send one pass email with the SES template"""
+        try:
+            response = self.ses.send_templated_email(
+                Source=self.from_email,
+                Destination={'ToAddresses': [recipient['email']]},
+                Template=PASS_EMAIL_TEMPLATE_NAME,
+                TemplateData=json.dumps(recipient)
+            )
+            logger.info("Email sent successfully to %s. MessageId: %s", recipient['email'], response.get('MessageId', 'unknown'))
+            return True
+        except ClientError as e:
+            logger.error("SES templated send error: %s", e.response['Error']['Code'],
+                        extra={"error_message": e.response['Error']['Message']})
+            return False
+
+    def build_pass_email_data(
+        self,
+        to_email: str,
+        display_name: str,
+        event_name: str,
+        card_url: str,
+        qr_url: str,
+        wallet_passes: Optional[List] = None,
+        vcard_url: Optional[str] = None,
+        brand_name: Optional[str] = None,
+        brand_theme: Optional[dict] = None,
+        card_id: Optional[uuid.UUID] = None,
+        tenant_id: Optional[uuid.UUID] = None,
+        message_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the SES template data for one pass email
+
+        Takes the same values as send_pass_email. The tracking
+        MessageContext for message_id must already be stored by the caller.
+        """
+        theme = _email_theme(brand_theme)
+        tracked = bool(card_id and tenant_id and message_id)
+
+        data = {
+            'email': to_email,
+            'display_name': display_name,
+            'event_name': event_name,
+            'card_url': card_url,
+            'qr_url': qr_url,
+            'vcard_url': vcard_url or '',
+            'sender_name': brand_name or "OutreachPass",
+            'primary_color': theme['primary_color'],
+            'secondary_color': theme['secondary_color'],
+            'text_color': theme['text_color'],
+            'light_text_color': theme['light_text_color'],
+            'apple_wallet_url': '',
+            'apple_wallet_tracked_url': '',
+            'google_wallet_url': '',
+            'tracking_pixel_url': f"{self._track_base}/open/{message_id}" if tracked else '',
+        }
+
+        for wallet_pass in wallet_passes or []:
+            if wallet_pass.type == "apple":
+                data['apple_wallet_url'] = wallet_pass.url
+                data['apple_wallet_tracked_url'] = (
+                    self._click_tracking_url(wallet_pass.url, message_id, "wallet")
+                    if tracked else wallet_pass.url
+                )
+            elif wallet_pass.type == "google":
+                # Google Wallet JWT-signed URLs cannot be redirected
+                data['google_wallet_url'] = wallet_pass.url
+
+        return data
+
+    def send_pass_emails_bulk(self, recipients: List[Dict[str, Any]]) -> List[bool]:
+        """
+        Send pass emails with the SES template, 50 recipients per API call
+
+        When the template cannot be created, each email is sent on its own
+        with the inline body of send_pass_email instead.
+
+        Args:
+            recipients: build_pass_email_data keyword arguments per email; the
+                MessageContext for each message_id must already be stored
+
+        Returns:
+            Whether SES accepted each recipient's email, in input order
+        """
+        if not recipients:
+            return []
+
+        if not self._pass_template_available():
+            return [self.send_pass_email(**recipient) for recipient in recipients]
+
+        template_data = [self.build_pass_email_data(**recipient) for recipient in recipients]
+
+        sent: List[bool] = []
+        for start in range(0, len(template_data), SES_BULK_BATCH_SIZE):
+            batch = template_data[start:start + SES_BULK_BATCH_SIZE]
+            try:
+                response = self.ses.send_bulk_templated_email(
+                    Source=self.from_email,
+                    Template=PASS_EMAIL_TEMPLATE_NAME,
+                    DefaultTemplateData='{}',
+                    Destinations=[
+                        {
+                            'Destination': {'ToAddresses': [recipient['email']]},
+                            'ReplacementTemplateData': json.dumps(recipient)
+                        }
+                        for recipient in batch
+                    ]
+                )
+                statuses = response.get('Status', [])
+                sent.extend(
+                    i < len(statuses) and statuses[i].get('Status') == 'Success'
+                    for i in range(len(batch))
+                )
+            except ClientError as e:
+                logger.error("SES bulk send error: %s", e.response['Error']['Code'],
+                            extra={"error_message": e.response['Error']['Message']})
+                sent.extend([False] * len(batch))
+
+        logger.info("Bulk pass emails sent: %d/%d", sum(sent), len(recipients))
+        return sent
+
 
 # Global email client instance
 email_client = EmailClient()
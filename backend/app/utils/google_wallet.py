@@ -11,19 +11,36 @@ Key concepts:
 """
 import logging
 import json
+import threading
 import uuid
 import time
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime
 from google.auth import jwt, crypt
 from google.auth.transport.requests import AuthorizedSession
 from google.oauth2 import service_account
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
 # Google Wallet API base URL
 WALLET_API_BASE = "https://walletobjects.googleapis.com/walletobjects/v1"
 
+# Keep-alive connections to the Wallet API per generator. Calls arrive from
+# worker threads (one per concurrent pass), and requests' default of 10 would
+# make the extra threads open and drop a fresh TLS connection each time.
+HTTP_POOL_SIZE = 32
+
+# Signed save URLs by (service account, full object id), newest last, as
+# (monotonic expiry, url). Tokens are valid for an hour; they are reused
+# for 55 minutes so a cached link never goes out about to expire.
+SAVE_URL_TOKEN_LIFETIME_SECONDS = 3600
+SAVE_URL_CACHE_TTL_SECONDS = 3300
+SAVE_URL_CACHE_SIZE = 10000
+_save_url_cache: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+_save_url_lock = threading.Lock()  # generate_save_url runs in worker threads
+
 
 class GoogleWalletPassGenerator:
     """Generate Google Wallet passes using the Google Wallet API"""
@@ -52,13 +69,22 @@ class GoogleWalletPassGenerator:
         # Initialize credentials if service account file is provided
         self.credentials = None
         self.http_client = None
+        self._signer = None
         if service_account_file:
             try:
                 self.credentials = service_account.Credentials.from_service_account_file(
                     service_account_file,
                     scopes=['https://www.googleapis.com/auth/wallet_object.issuer']
                 )
+                # The session reuses connections and caches the access
+                # token until it expires, so generators should be long-lived
                 self.http_client = AuthorizedSession(self.credentials)
+                self.http_client.mount(
+                    "https://",
+                    HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+                )
+                # Parse the private key once for signing save URLs
+                self._signer = crypt.RSASigner.from_service_account_file(service_account_file)
             except Exception as e:
                 logger.warning(f"Failed to initialize Google Wallet credentials: {str(e)}")
 
@@ -267,6 +293,14 @@ class GoogleWalletPassGenerator:
         try:
             full_object_id = f"{self.issuer_id}.{object_id}"
 
+            # Redeliveries of the same pass skip the RSA signature
+            cache_key = (self.service_account_email, full_object_id)
+            with _save_url_lock:
+                cached = _save_url_cache.get(cache_key)
+                if cached is not None and cached[0] > time.monotonic():
+                    _save_url_cache.move_to_end(cache_key)
+                    return cached[1]
+
             # Create JWT payload with reference to pre-created object
             current_time = int(time.time())
             payload = {
@@ -274,7 +308,7 @@ class GoogleWalletPassGenerator:
                 "aud": "google",
                 "typ": "savetowallet",
                 "iat": current_time,
-                "exp": current_time + 3600,  # Token valid for 1 hour
+                "exp": current_time + SAVE_URL_TOKEN_LIFETIME_SECONDS,  # Token valid for 1 hour
                 # Reference the pre-created pass object
                 "payload": {
                     "eventTicketObjects": [
@@ -287,18 +321,23 @@ class GoogleWalletPassGenerator:
             # IMPORTANT: Do NOT include 'origins' field for email-based links
 
             # Sign the JWT with service account credentials
-            if not self.credentials:
+            if not self._signer:
                 logger.error("No credentials available for JWT signing")
                 return f"https://pay.google.com/gp/v/save/{full_object_id}"
 
-            signer = crypt.RSASigner.from_service_account_file(self.service_account_file)
-            token = jwt.encode(signer, payload)
+            token = jwt.encode(self._signer, payload)
 
             # Decode bytes to string if needed
             if isinstance(token, bytes):
                 token = token.decode('utf-8')
 
             save_url = f"https://pay.google.com/gp/v/save/{token}"
+
+            with _save_url_lock:
+                _save_url_cache[cache_key] = (time.monotonic() + SAVE_URL_CACHE_TTL_SECONDS, save_url)
+                _save_url_cache.move_to_end(cache_key)
+                while len(_save_url_cache) > SAVE_URL_CACHE_SIZE:
+                    _save_url_cache.popitem(last=False)
             logger.info(f"Generated JWT-signed Google Wallet save URL for object {full_object_id}")
             logger.info(f"JWT token length: {len(token)} characters")
 
@@ -1,5 +1,8 @@
 """Image fetching and processing utilities for wallet passes"""
+import asyncio
 import logging
+import time
+import uuid
 from typing import Optional
 from urllib.parse import urlparse
 import httpx
@@ -8,6 +11,13 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# (brand_id, wallet_type) -> (images, fetched_at). Every attendee of an event
+# shares the brand images, so they are fetched once per TTL, not per pass.
+brand_image_cache: dict[tuple[uuid.UUID, str], tuple[dict, float]] = {}
+# One lock per cache key, so concurrent misses for a brand share one fetch
+# without waiting on other brands' (possibly slow) fetches
+_brand_image_locks: dict[tuple[uuid.UUID, str], asyncio.Lock] = {}
+
 
 async def fetch_image_from_url(
     url: str,
@@ -96,8 +106,9 @@ async def _fetch_from_http(url: str, timeout: int, max_size_mb: int) -> Optional
 async def _fetch_from_s3(bucket: str, key: str) -> Optional[bytes]:
     """Fetch image from S3 bucket"""
     try:
-        # Note: get_file raises Exception on error, doesn't return None
-        image_bytes = s3_client.get_file(key=key, bucket=bucket)
+        # Note: get_file raises Exception on error, doesn't return None.
+        # boto3 blocks, so keep it off the event loop.
+        image_bytes = await asyncio.to_thread(s3_client.get_file, key=key, bucket=bucket)
 
         if not image_bytes:
             logger.warning(f"Empty S3 object: s3://{bucket}/{key}")
@@ -197,3 +208,43 @@ async def fetch_brand_images(
             images['hero'] = await fetch_image_from_url(hero_url)
 
     return images
+
+
+async def cached_fetch_brand_images(
+    brand_id: Optional[uuid.UUID],
+    brand_theme: dict,
+    wallet_type: str = 'apple',
+    ttl: int = settings.BRAND_IMAGE_CACHE_TTL_SECONDS
+) -> dict:
+    """
+    fetch_brand_images with a per-process cache keyed by brand and wallet type
+
+    Results with a failed fetch are not cached, so the next pass retries.
+
+    Args:
+        brand_id: Brand the theme belongs to (no caching when None)
+        brand_theme: Brand theme_json dictionary
+        wallet_type: 'apple' or 'google'
+        ttl: Seconds a cached result stays valid
+
+    Returns:
+        Same dictionary as fetch_brand_images
+    """
+    if brand_id is None:
+        return await fetch_brand_images(brand_theme, wallet_type)
+
+    key = (brand_id, wallet_type)
+    cached = brand_image_cache.get(key)
+    if cached is not None and time.monotonic() - cached[1] < ttl:
+        return cached[0]
+
+    async with _brand_image_locks.setdefault(key, asyncio.Lock()):
+        # Another pass may have fetched the images while we waited
+        cached = brand_image_cache.get(key)
+        if cached is not None and time.monotonic() - cached[1] < ttl:
+            return cached[0]
+
+        images = await fetch_brand_images(brand_theme, wallet_type)
+        if all(image is not None for image in images.values()):
+            brand_image_cache[key] = (images, time.monotonic())
+        return images
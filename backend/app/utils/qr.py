@@ -1,8 +1,20 @@
-import qrcode
+import functools
+import segno
 from io import BytesIO
-from typing import Optional
 
+# QR images are requested again and again for the same card (email opens,
+# page reloads), and the output only depends on the URL
+QR_CACHE_SIZE = 256
 
+
+def _make_qr(url: str) -> segno.QRCode:
+    """Smallest regular QR code for url at error correction level L"""
+    # boost_error would raise the level when it fits in the same version,
+    # changing the pattern; keep it at L like the codes already issued
+    return segno.make_qr(url, error="l", boost_error=False)
+
+
+@functools.lru_cache(maxsize=QR_CACHE_SIZE)
 def generate_qr_code(
     url: str,
     box_size: int = 10,
@@ -10,21 +22,23 @@ def generate_qr_code(
 ) -> bytes:
     """Generate QR code PNG as bytes"""
 
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=box_size,
-        border=border,
-    )
+    # segno writes the 1-bit PNG rows itself, without building an image
+    # object; fast zlib settings cost almost nothing in size
+    buffer = BytesIO()
+    _make_qr(url).save(buffer, kind="png", scale=box_size, border=border, compresslevel=1)
+
+    return buffer.getvalue()
 
-    qr.add_data(url)
-    qr.make(fit=True)
 
-    img = qr.make_image(fill_color="black", back_color="white")
+@functools.lru_cache(maxsize=QR_CACHE_SIZE)
+def generate_qr_code_svg(
+    url: str,
+    border: int = 4,
+    box_size: int = 10,
+) -> str:
+    """Generate QR code SVG markup (no pixel encoding, a fraction of the PNG size)"""
 
-    # Convert to bytes
     buffer = BytesIO()
-    img.save(buffer, format="PNG")
-    buffer.seek(0)
+    _make_qr(url).save(buffer, kind="svg", scale=box_size, border=border)
 
-    return buffer.getvalue()
+    return buffer.getvalue().decode()
@@ -1,24 +1,46 @@
 import boto3
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig, create_transfer_manager
 from botocore.config import Config
 from botocore.exceptions import ClientError
-from typing import Optional
+from io import BytesIO
+from typing import Optional, BinaryIO
 from app.core.config import settings
 
+MB = 1024 * 1024
+
+# Multipart only pays off for large objects; QR codes and passes stay well
+# below the threshold and go out as a single PUT
+MULTIPART_THRESHOLD = 8 * MB
+_transfer_config = TransferConfig(
+    multipart_threshold=MULTIPART_THRESHOLD,
+    multipart_chunksize=5 * MB,
+    max_concurrency=8,
+    use_threads=True
+)
+
 
 class S3Client:
     """S3 operations wrapper"""
 
     def __init__(self):
-        # Configure S3 client with timeout to prevent Lambda timeouts
+        # Configure S3 client with timeout to prevent Lambda timeouts. One
+        # client is shared process-wide (and across to_thread workers), so
+        # give it a connection pool large enough to keep HTTPS connections warm.
         s3_config = Config(
             connect_timeout=5,
             read_timeout=30,  # S3 uploads might take longer
-            retries={'max_attempts': 2}
+            retries={'max_attempts': 3, 'mode': 'adaptive'},
+            max_pool_connections=50
         )
         self.s3 = boto3.client('s3', region_name=settings.AWS_REGION, config=s3_config)
         self.assets_bucket = settings.S3_BUCKET_ASSETS
         self.uploads_bucket = settings.S3_BUCKET_UPLOADS
 
+        # One transfer manager for every upload, so its part-upload threads
+        # and buffers are reused instead of rebuilt per call
+        self.transfer_manager = create_transfer_manager(self.s3, _transfer_config)
+
     def upload_file(
         self,
         file_bytes: bytes,
@@ -26,7 +48,10 @@ class S3Client:
         bucket: Optional[str] = None,
         content_type: str = "application/octet-stream"
     ) -> bool:
-        """Upload file to S3"""
+        """Upload file to S3 (multipart above MULTIPART_THRESHOLD)"""
+        if len(file_bytes) >= MULTIPART_THRESHOLD:
+            return self.upload_fileobj(BytesIO(file_bytes), key, bucket, content_type)
+
         try:
             bucket = bucket or self.assets_bucket
             self.s3.put_object(
@@ -41,6 +66,30 @@ class S3Client:
             print(f"S3 upload error: {e}")
             return False
 
+    def upload_fileobj(
+        self,
+        fileobj: BinaryIO,
+        key: str,
+        bucket: Optional[str] = None,
+        content_type: str = "application/octet-stream"
+    ) -> bool:
+        """Upload a file-like object to S3 (multipart above MULTIPART_THRESHOLD)"""
+        try:
+            bucket = bucket or self.assets_bucket
+            self.transfer_manager.upload(
+                fileobj,
+                bucket,
+                key,
+                extra_args={
+                    'ContentType': content_type,
+                    'ServerSideEncryption': 'AES256'
+                }
+            ).result()
+            return True
+        except (ClientError, S3UploadFailedError) as e:
+            print(f"S3 upload error: {e}")
+            return False
+
     def get_presigned_url(
         self,
         key: str,
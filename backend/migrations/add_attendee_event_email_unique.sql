@@ -0,0 +1,83 @@
+-- Migration: Enforce one attendee per email within an event
+-- Purpose: Let attendee creation and CSV import use
+--          INSERT ... ON CONFLICT (event_id, email) DO NOTHING instead of a
+--          SELECT-then-INSERT, which cost an extra round trip and raced.
+--
+-- brands(tenant_id, brand_key) and events(tenant_id, slug) are already unique
+-- (001_initial_schema.sql); the ORM models now declare those constraints too.
+
+-- Blank emails from older CSV imports are stored as NULL so they do not
+-- collide with each other.
+UPDATE attendees SET email = NULL WHERE email = '';
+
+-- ============================================================================
+-- Guard: stop before building the index if duplicates remain
+-- ============================================================================
+
+-- Duplicates are not removed automatically: each attendee may own a card,
+-- scans and analytics rows. List them with:
+--
+-- SELECT event_id, email, COUNT(*)
+-- FROM attendees
+-- WHERE email IS NOT NULL
+-- GROUP BY event_id, email
+-- HAVING COUNT(*) > 1;
+
+DO $$
+DECLARE
+    duplicate_groups BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO duplicate_groups
+    FROM (
+        SELECT 1
+        FROM attendees
+        WHERE email IS NOT NULL
+        GROUP BY event_id, email
+        HAVING COUNT(*) > 1
+    ) duplicates;
+
+    IF duplicate_groups > 0 THEN
+        RAISE EXCEPTION '% (event_id, email) pairs have more than one attendee; merge them before adding uq_attendee_event_email', duplicate_groups;
+    END IF;
+END $$;
+
+-- ============================================================================
+-- Unique constraint (built without blocking writes)
+-- ============================================================================
+
+-- A failed CREATE INDEX CONCURRENTLY leaves an INVALID index behind, which
+-- IF NOT EXISTS would then skip. Drop it so the migration can be re-run.
+-- A valid index (or the finished constraint) is left in place.
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = 'uq_attendee_event_email'
+          AND NOT i.indisvalid
+    ) THEN
+        DROP INDEX IF EXISTS uq_attendee_event_email;
+    END IF;
+END $$;
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_attendee_event_email
+ON attendees(event_id, email);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'uq_attendee_event_email'
+          AND conrelid = 'attendees'::regclass
+    ) THEN
+        ALTER TABLE attendees
+            ADD CONSTRAINT uq_attendee_event_email UNIQUE USING INDEX uq_attendee_event_email;
+    END IF;
+END $$;
+
+-- Notes:
+-- NULL emails never conflict, so phone-only attendees are unaffected.
+-- email is CITEXT, so the constraint is case-insensitive.
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+-- Every step is guarded, so the file can be run again after a failure.
@@ -0,0 +1,44 @@
+-- Migration: Add client_fingerprints dimension for the legacy event tables
+-- Purpose: Stop repeating the full User-Agent string (150-300 bytes) on every
+--          email/wallet/card-view/contact-export row. Each distinct User-Agent
+--          is stored once; event rows carry an 8-byte fingerprint_id.
+
+-- fp_id is a stable 64-bit BLAKE2b hash of the User-Agent computed by the
+-- application, so inserts never need a lookup round trip to resolve it.
+CREATE TABLE IF NOT EXISTS client_fingerprints (
+    fp_id BIGINT PRIMARY KEY,
+    user_agent TEXT NOT NULL,
+    device_type VARCHAR(20),
+    browser VARCHAR(100),
+    os VARCHAR(100),
+    first_seen_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+-- ============================================================================
+-- Event table references
+-- ============================================================================
+
+ALTER TABLE email_events
+    ADD COLUMN IF NOT EXISTS fingerprint_id BIGINT REFERENCES client_fingerprints(fp_id);
+
+ALTER TABLE wallet_pass_events
+    ADD COLUMN IF NOT EXISTS fingerprint_id BIGINT REFERENCES client_fingerprints(fp_id);
+
+ALTER TABLE card_view_events
+    ADD COLUMN IF NOT EXISTS fingerprint_id BIGINT REFERENCES client_fingerprints(fp_id);
+
+ALTER TABLE contact_export_events
+    ADD COLUMN IF NOT EXISTS fingerprint_id BIGINT REFERENCES client_fingerprints(fp_id);
+
+-- ============================================================================
+-- Notes
+-- ============================================================================
+
+-- New rows leave user_agent (and browser/os on card_view_events) NULL; the
+-- columns are kept so existing rows remain readable. device_type stays on
+-- the event rows because the overview breakdowns group by it.
+--
+-- Resolve the User-Agent for an event:
+-- SELECT e.*, f.user_agent, f.browser, f.os
+-- FROM card_view_events e
+-- LEFT JOIN client_fingerprints f ON f.fp_id = e.fingerprint_id;
@@ -0,0 +1,41 @@
+-- Migration: BRIN indexes on occurred_at for the append-only event tables
+-- Purpose: Cheap time-range pruning for the large event tables.
+--
+-- occurred_at stays TIMESTAMPTZ. It is already stored as an 8-byte UTC
+-- integer, and asyncpg transfers it in binary form, so reads pay no session
+-- time zone conversion. Switching to epoch BIGINT would break the date_trunc
+-- and interval arithmetic in the analytics SQL, the daily rollup triggers and
+-- the materialized views for no storage gain. What the bigint proposal was
+-- really after is small, fast range pruning on an insert-ordered column, and
+-- BRIN provides that on TIMESTAMPTZ directly.
+
+-- ============================================================================
+-- BRIN (block range) indexes
+-- ============================================================================
+
+-- Rows are inserted in occurred_at order, so each 128-page block range
+-- covers a narrow time window. The index is a few hundred KB even at
+-- billions of rows, and inserts barely maintain it.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_email_events_occurred_brin
+ON email_events USING BRIN (occurred_at) WITH (pages_per_range = 128, autosummarize = on);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_wallet_events_occurred_brin
+ON wallet_pass_events USING BRIN (occurred_at) WITH (pages_per_range = 128, autosummarize = on);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_card_views_occurred_brin
+ON card_view_events USING BRIN (occurred_at) WITH (pages_per_range = 128, autosummarize = on);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contact_exports_occurred_brin
+ON contact_export_events USING BRIN (occurred_at) WITH (pages_per_range = 128, autosummarize = on);
+
+-- ============================================================================
+-- Notes
+-- ============================================================================
+
+-- The planner uses these for platform-wide time-window scans (retention
+-- cleanup, cross-tenant reporting, rollup backfills). Tenant-scoped
+-- dashboard queries keep using the B-tree composites from
+-- add_analytics_indexes.sql.
+--
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
@@ -0,0 +1,24 @@
+-- Migration: Publish feature flag changes on the flag_changed channel
+-- Purpose: Let API processes cache flag lookups in memory and drop the
+--          cache as soon as a flag is written (see FeatureFlagService).
+
+CREATE OR REPLACE FUNCTION notify_feature_flag_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify(
+        'flag_changed',
+        COALESCE(NEW.flag_key, OLD.flag_key) || ':' || COALESCE(NEW.tenant_id, OLD.tenant_id)::TEXT
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS feature_flags_notify ON feature_flags;
+CREATE TRIGGER feature_flags_notify
+    AFTER INSERT OR UPDATE OR DELETE ON feature_flags
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_feature_flag_changed();
+
+-- Notes:
+-- NOTIFY is delivered on commit, so listeners never observe uncommitted
+-- flag values. Identical payloads within one transaction are collapsed.
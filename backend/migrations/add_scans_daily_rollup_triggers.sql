@@ -0,0 +1,88 @@
+-- Migration: Roll scans_daily up from the event tables with statement-level triggers
+-- Purpose: Replace the per-request ON CONFLICT DO UPDATE in the public card
+--          endpoints. Each scan used to take a row lock on the hot
+--          (day, tenant, event, card) tuple and write a new row version;
+--          the triggers below aggregate every INSERT statement into one
+--          set-based upsert instead.
+
+-- ============================================================================
+-- Card Views -> scans_daily.scan_count
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION roll_scans_daily_from_card_views()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO scans_daily (day, tenant_id, event_id, card_id, scan_count, vcard_downloads)
+    SELECT
+        (nt.occurred_at AT TIME ZONE 'UTC')::date,
+        nt.tenant_id,
+        nt.event_id,
+        nt.card_id,
+        COUNT(*),
+        0
+    FROM new_views nt
+    WHERE nt.event_id IS NOT NULL
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (day, tenant_id, event_id, card_id)
+    DO UPDATE SET scan_count = scans_daily.scan_count + EXCLUDED.scan_count;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS card_view_rollup ON card_view_events;
+CREATE TRIGGER card_view_rollup
+    AFTER INSERT ON card_view_events
+    REFERENCING NEW TABLE AS new_views
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION roll_scans_daily_from_card_views();
+
+-- ============================================================================
+-- Contact Exports -> scans_daily.vcard_downloads
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION roll_scans_daily_from_contact_exports()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO scans_daily (day, tenant_id, event_id, card_id, scan_count, vcard_downloads)
+    SELECT
+        (nt.occurred_at AT TIME ZONE 'UTC')::date,
+        nt.tenant_id,
+        nt.event_id,
+        nt.card_id,
+        0,
+        COUNT(*)
+    FROM new_exports nt
+    WHERE nt.event_id IS NOT NULL
+      AND nt.export_type = 'vcard_download'
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (day, tenant_id, event_id, card_id)
+    DO UPDATE SET vcard_downloads = scans_daily.vcard_downloads + EXCLUDED.vcard_downloads;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS contact_export_rollup ON contact_export_events;
+CREATE TRIGGER contact_export_rollup
+    AFTER INSERT ON contact_export_events
+    REFERENCING NEW TABLE AS new_exports
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION roll_scans_daily_from_contact_exports();
+
+-- ============================================================================
+-- Notes
+-- ============================================================================
+
+-- The application no longer writes scans_daily directly; GET /c/{card_id}
+-- and GET /c/{card_id}/vcard only record the detailed event rows. Any insert
+-- that batches several events (multi-row VALUES, COPY) is rolled up with a
+-- single upsert per (day, tenant, event, card) group.
+--
+-- Backfill (only needed if the event tables hold rows older than this
+-- migration that were never counted):
+-- INSERT INTO scans_daily (day, tenant_id, event_id, card_id, scan_count, vcard_downloads)
+-- SELECT (occurred_at AT TIME ZONE 'UTC')::date, tenant_id, event_id, card_id, COUNT(*), 0
+-- FROM card_view_events WHERE event_id IS NOT NULL GROUP BY 1, 2, 3, 4
+-- ON CONFLICT (day, tenant_id, event_id, card_id)
+-- DO UPDATE SET scan_count = EXCLUDED.scan_count;
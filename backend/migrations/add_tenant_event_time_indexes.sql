@@ -0,0 +1,65 @@
+-- Migration: (tenant_id, event_id, occurred_at) composites for the remaining event tables
+-- Purpose: get_overview filters every event table on tenant, optional event and
+--          date range, and groups on a small code column. card_view_events got
+--          its covering index in add_covering_analytics_indexes.sql; this does
+--          the same for email, wallet and contact export events, and adds
+--          card_id-leading covering indexes for get_card_metrics.
+
+-- ============================================================================
+-- Tenant + Event + Time (get_overview)
+-- ============================================================================
+
+-- Matches: WHERE tenant_id = ? [AND event_id = ?] [AND occurred_at >= ? AND occurred_at < ?]
+-- Covers:  count(*) FILTER (WHERE event_type = ...)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_email_events_tenant_event_occurred
+ON email_events(tenant_id, event_id, occurred_at)
+INCLUDE (event_type);
+
+-- Covers:  GROUP BY platform with FILTER on event_type
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_wallet_events_tenant_event_occurred
+ON wallet_pass_events(tenant_id, event_id, occurred_at)
+INCLUDE (platform, event_type);
+
+-- Covers:  count(*) of exports
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contact_exports_tenant_event_occurred
+ON contact_export_events(tenant_id, event_id, occurred_at)
+INCLUDE (export_type);
+
+-- ============================================================================
+-- Card Detail (get_card_metrics)
+-- ============================================================================
+
+-- Matches: WHERE card_id = ?    Covers: count(DISTINCT ip_address)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_card_views_card_ip
+ON card_view_events(card_id)
+INCLUDE (ip_address);
+
+-- Matches: WHERE card_id = ?    Covers: export_type = 'vcard_download'
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contact_exports_card_type
+ON contact_export_events(card_id)
+INCLUDE (export_type);
+
+-- Matches: WHERE card_id = ? AND event_type = 'added_to_wallet'    Covers: GROUP BY platform
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_wallet_events_card_type
+ON wallet_pass_events(card_id, event_type)
+INCLUDE (platform);
+
+-- ============================================================================
+-- Statistics
+-- ============================================================================
+
+ANALYZE email_events;
+ANALYZE wallet_pass_events;
+ANALYZE card_view_events;
+ANALYZE contact_export_events;
+
+-- ============================================================================
+-- Notes
+-- ============================================================================
+
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block. Apply this
+-- file with psql directly (not wrapped in BEGIN/COMMIT).
+--
+-- The (tenant_id, occurred_at DESC) indexes from add_analytics_indexes.sql
+-- become redundant for tenant-wide queries once these exist. Drop them only
+-- after confirming with pg_stat_user_indexes that idx_scan stops growing.
@@ -0,0 +1,67 @@
+-- Migration: Store wallet platform and device type as single-character codes
+-- Purpose: Narrow the hottest analytics rows. The values come from small fixed
+--          vocabularies and the ORM maps them transparently (PlatformCode /
+--          DeviceTypeCode in app/models/database.py).
+--
+--   platform:    a = apple, g = google, u = unknown
+--   device_type: m = mobile, t = tablet, d = desktop, b = bot,
+--                i = ios, n = android, u = unknown
+
+BEGIN;
+
+-- ============================================================================
+-- Wallet Pass Events
+-- ============================================================================
+
+ALTER TABLE wallet_pass_events
+    ALTER COLUMN platform TYPE CHAR(1) USING (
+        CASE platform WHEN 'apple' THEN 'a' WHEN 'google' THEN 'g' ELSE 'u' END
+    ),
+    ALTER COLUMN device_type TYPE CHAR(1) USING (
+        CASE device_type
+            WHEN 'mobile' THEN 'm' WHEN 'tablet' THEN 't' WHEN 'desktop' THEN 'd'
+            WHEN 'bot' THEN 'b' WHEN 'ios' THEN 'i' WHEN 'android' THEN 'n'
+            ELSE CASE WHEN device_type IS NULL THEN NULL ELSE 'u' END
+        END
+    );
+
+-- ============================================================================
+-- Card View Events
+-- ============================================================================
+
+ALTER TABLE card_view_events
+    ALTER COLUMN device_type TYPE CHAR(1) USING (
+        CASE device_type
+            WHEN 'mobile' THEN 'm' WHEN 'tablet' THEN 't' WHEN 'desktop' THEN 'd'
+            WHEN 'bot' THEN 'b' WHEN 'ios' THEN 'i' WHEN 'android' THEN 'n'
+            ELSE CASE WHEN device_type IS NULL THEN NULL ELSE 'u' END
+        END
+    );
+
+-- ============================================================================
+-- Contact Export Events
+-- ============================================================================
+
+ALTER TABLE contact_export_events
+    ALTER COLUMN device_type TYPE CHAR(1) USING (
+        CASE device_type
+            WHEN 'mobile' THEN 'm' WHEN 'tablet' THEN 't' WHEN 'desktop' THEN 'd'
+            WHEN 'bot' THEN 'b' WHEN 'ios' THEN 'i' WHEN 'android' THEN 'n'
+            ELSE CASE WHEN device_type IS NULL THEN NULL ELSE 'u' END
+        END
+    );
+
+COMMIT;
+
+-- ============================================================================
+-- Notes
+-- ============================================================================
+
+-- ALTER COLUMN TYPE rewrites each table and its indexes under an ACCESS
+-- EXCLUSIVE lock; run during a maintenance window.
+--
+-- Raw SQL against these columns must compare codes (platform = 'a'), or use
+-- PlatformCode.decode / DeviceTypeCode.decode on the results.
+--
+-- email_events.message_id is left as TEXT: ids come from several sources
+-- (our own tracking ids, SES MessageIds) and are not a single fixed format.
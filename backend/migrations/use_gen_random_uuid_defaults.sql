@@ -0,0 +1,25 @@
+-- Migration: Generate UUID primary keys in Postgres
+-- Purpose: The ORM no longer calls uuid.uuid4() per row; primary keys come
+--          from server_default=gen_random_uuid() and are read back through
+--          INSERT ... RETURNING. gen_random_uuid() is built into PostgreSQL 13+
+--          (pgcrypto provides it on older servers).
+
+CREATE EXTENSION IF NOT EXISTS pgcrypto;
+
+ALTER TABLE tenants ALTER COLUMN tenant_id SET DEFAULT gen_random_uuid();
+ALTER TABLE brands ALTER COLUMN brand_id SET DEFAULT gen_random_uuid();
+ALTER TABLE users ALTER COLUMN user_id SET DEFAULT gen_random_uuid();
+ALTER TABLE events ALTER COLUMN event_id SET DEFAULT gen_random_uuid();
+ALTER TABLE attendees ALTER COLUMN attendee_id SET DEFAULT gen_random_uuid();
+ALTER TABLE cards ALTER COLUMN card_id SET DEFAULT gen_random_uuid();
+ALTER TABLE wallet_passes ALTER COLUMN wallet_pass_id SET DEFAULT gen_random_uuid();
+ALTER TABLE qr_codes ALTER COLUMN qr_id SET DEFAULT gen_random_uuid();
+ALTER TABLE exhibitors ALTER COLUMN exhibitor_id SET DEFAULT gen_random_uuid();
+ALTER TABLE exhibitor_leads ALTER COLUMN lead_id SET DEFAULT gen_random_uuid();
+ALTER TABLE pass_generation_jobs ALTER COLUMN job_id SET DEFAULT gen_random_uuid();
+ALTER TABLE analytics_events ALTER COLUMN event_id SET DEFAULT gen_random_uuid();
+
+-- Notes:
+-- Setting a column default is a catalog-only change (no table rewrite).
+-- Callers may still pass an explicit id; the default only applies when
+-- the column is omitted from the INSERT.
@@ -0,0 +1,54 @@
+"""
+Integration Tests for Public Card Endpoints
+
+Tests that analytics tracking failures never break:
+- GET /c/{card_id}
+- GET /c/{card_id}/vcard
+"""
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from app.core.database import get_db
+from app.main import app
+from httpx import ASGITransport, AsyncClient
+
+
+@pytest.fixture
+def public_client(db_session):
+    """HTTP client whose requests share the test's database session"""
+    async def override_get_db():
+        yield db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+class TestPublicCardTrackingFailures:
+    """Tracking errors are logged, the response is still served"""
+
+    async def test_card_page_when_tracking_fails(self, public_client, test_card):
+        """Test card page renders when card view tracking raises"""
+        with patch(
+            "app.api.public.AnalyticsService.track_card_view",
+            AsyncMock(side_effect=RuntimeError("tracking unavailable"))
+        ):
+            async with public_client as client:
+                response = await client.get(f"/c/{test_card.card_id}")
+
+        assert response.status_code == 200
+        assert test_card.display_name in response.text
+
+    async def test_vcard_download_when_tracking_fails(self, public_client, test_card):
+        """Test vCard download works when contact export tracking raises"""
+        with patch(
+            "app.api.public.AnalyticsService.track_contact_export",
+            AsyncMock(side_effect=RuntimeError("tracking unavailable"))
+        ):
+            async with public_client as client:
+                response = await client.get(f"/c/{test_card.card_id}/vcard")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/vcard")
@@ -13,11 +13,14 @@ Tests all analytics tracking and reporting methods including:
 import pytest
 import uuid
 from datetime import datetime, timedelta
+from unittest.mock import patch
 from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
-from app.services.analytics_service import AnalyticsService
+from app.services.analytics_service import AnalyticsService, parse_user_agent
+from app.services.analytics_writer import AnalyticsWriter, _known_fingerprints
 from app.models.database import (
-    EmailEvent, CardViewEvent, WalletPassEvent, ContactExportEvent
+    EmailEvent, CardViewEvent, WalletPassEvent, ContactExportEvent, ClientFingerprint
 )
 
 
@@ -27,22 +30,23 @@ class TestAnalyticsTracking:
     @pytest.mark.asyncio
     async def test_track_card_view(self, db_session, test_card, test_event, sample_request_context):
         """Test card view tracking with device context"""
-        view_event = await AnalyticsService.track_card_view(
+        tracked = await AnalyticsService.track_card_view(
             db=db_session,
             card=test_card,
             event_id=test_event.event_id,
             source_type="qr_scan",
             request=sample_request_context
         )
+        view_event = await db_session.get(CardViewEvent, tracked.id)
 
-        assert view_event.view_event_id is not None
+        assert view_event.view_event_id == tracked.id
         assert view_event.tenant_id == test_card.tenant_id
         assert view_event.card_id == test_card.card_id
         assert view_event.event_id == test_event.event_id
         assert view_event.source_type == "qr_scan"
         assert view_event.ip_address == "192.168.1.1"
         assert view_event.device_type == "mobile"  # Parsed from iPhone user agent
-        assert view_event.occurred_at is not None
+        assert view_event.occurred_at == tracked.occurred_at
 
     @pytest.mark.asyncio
     async def test_track_card_view_sources(self, db_session, test_card, test_event, sample_request_context):
@@ -50,13 +54,14 @@ class TestAnalyticsTracking:
         sources = ["qr_scan", "direct_link", "email_link", "share"]
 
         for source in sources:
-            view_event = await AnalyticsService.track_card_view(
+            tracked = await AnalyticsService.track_card_view(
                 db=db_session,
                 card=test_card,
                 event_id=test_event.event_id,
                 source_type=source,
                 request=sample_request_context
             )
+            view_event = await db_session.get(CardViewEvent, tracked.id)
             assert view_event.source_type == source
 
         # Verify all sources were tracked
@@ -66,10 +71,104 @@ class TestAnalyticsTracking:
         )
         assert result.scalar() == len(sources)
 
+    @pytest.mark.asyncio
+    async def test_track_card_view_fingerprint(self, db_session, test_card, test_event, sample_request_context):
+        """Test repeated views from one client share a single fingerprint row"""
+        events = []
+        for _ in range(2):
+            tracked = await AnalyticsService.track_card_view(
+                db=db_session,
+                card=test_card,
+                event_id=test_event.event_id,
+                source_type="qr_scan",
+                request=sample_request_context
+            )
+            events.append(await db_session.get(CardViewEvent, tracked.id))
+
+        assert events[0].fingerprint_id is not None
+        assert events[0].fingerprint_id == events[1].fingerprint_id
+        assert events[0].user_agent is None
+
+        result = await db_session.execute(
+            select(ClientFingerprint).where(ClientFingerprint.fp_id == events[0].fingerprint_id)
+        )
+        fingerprint = result.scalar_one()
+        assert fingerprint.user_agent == sample_request_context.headers["user-agent"]
+        assert fingerprint.device_type == "mobile"
+
+        # Later views from the same client skip the fingerprint upsert
+        assert events[0].fingerprint_id in _known_fingerprints
+
+    @pytest.mark.asyncio
+    async def test_track_card_view_batched(self, db_session, test_card, test_event, sample_request_context):
+        """Test card views are queued and bulk-written when the writer is running"""
+        writer = AnalyticsWriter(
+            session_factory=async_sessionmaker(db_session.bind, expire_on_commit=False),
+            flush_interval=60  # Only the final drain in stop() writes
+        )
+        await writer.start()
+
+        with patch("app.services.analytics_service.analytics_writer", writer):
+            for _ in range(3):
+                view_event = await AnalyticsService.track_card_view(
+                    db=db_session,
+                    card=test_card,
+                    event_id=test_event.event_id,
+                    source_type="qr_scan",
+                    request=sample_request_context
+                )
+                assert view_event is None
+
+        await writer.stop()
+
+        result = await db_session.execute(
+            select(func.count(CardViewEvent.view_event_id))
+            .where(CardViewEvent.card_id == test_card.card_id)
+        )
+        assert result.scalar() == 3
+
+    @pytest.mark.asyncio
+    async def test_track_card_view_batched_fingerprint_evicted(
+        self, db_session, test_card, test_event, sample_request_context
+    ):
+        """Test queued views of a known client still flush after its fingerprint leaves the cache"""
+        await AnalyticsService.track_card_view(
+            db=db_session,
+            card=test_card,
+            event_id=test_event.event_id,
+            source_type="qr_scan",
+            request=sample_request_context
+        )
+
+        writer = AnalyticsWriter(
+            session_factory=async_sessionmaker(db_session.bind, expire_on_commit=False),
+            flush_interval=60
+        )
+        await writer.start()
+
+        with patch("app.services.analytics_service.analytics_writer", writer):
+            for _ in range(2):
+                await AnalyticsService.track_card_view(
+                    db=db_session,
+                    card=test_card,
+                    event_id=test_event.event_id,
+                    source_type="qr_scan",
+                    request=sample_request_context
+                )
+
+        _known_fingerprints.clear()
+        await writer.stop()
+
+        result = await db_session.execute(
+            select(func.count(CardViewEvent.view_event_id))
+            .where(CardViewEvent.card_id == test_card.card_id)
+        )
+        assert result.scalar() == 3
+
     @pytest.mark.asyncio
     async def test_track_email_event(self, db_session, test_tenant, test_card, test_event, test_attendee):
         """Test email event tracking"""
-        email_event = await AnalyticsService.track_email_event(
+        tracked = await AnalyticsService.track_email_event(
             db=db_session,
             tenant_id=test_tenant.tenant_id,
             message_id="test-msg-123",
@@ -81,8 +180,9 @@ class TestAnalyticsTracking:
             link_url=None,
             request=None
         )
+        email_event = await db_session.get(EmailEvent, tracked.id)
 
-        assert email_event.email_event_id is not None
+        assert email_event.email_event_id == tracked.id
         assert email_event.tenant_id == test_tenant.tenant_id
         assert email_event.message_id == "test-msg-123"
         assert email_event.recipient_email == "test@example.com"
@@ -118,10 +218,36 @@ class TestAnalyticsTracking:
         )
         assert result.scalar() == len(funnel_events)
 
+    @pytest.mark.asyncio
+    async def test_track_email_events_bulk(self, db_session, test_tenant, test_card, test_event):
+        """Test a batch of email events is written in one call"""
+        message_id = "bulk-test-123"
+        events = [
+            {
+                "tenant_id": test_tenant.tenant_id,
+                "message_id": message_id,
+                "recipient_email": "bulk@example.com",
+                "event_type": event_type,
+                "card_id": test_card.card_id,
+                "event_id": test_event.event_id
+            }
+            for event_type in ["sent", "delivered", "opened"]
+        ]
+
+        written = await AnalyticsService.track_email_events_bulk(db_session, events)
+
+        assert written == 3
+        result = await db_session.execute(
+            select(func.count(EmailEvent.email_event_id))
+            .where(EmailEvent.message_id == message_id)
+        )
+        assert result.scalar() == 3
+        assert await AnalyticsService.track_email_events_bulk(db_session, []) == 0
+
     @pytest.mark.asyncio
     async def test_track_wallet_event(self, db_session, test_card, test_event, sample_request_context):
         """Test wallet pass event tracking"""
-        wallet_event = await AnalyticsService.track_wallet_event(
+        tracked = await AnalyticsService.track_wallet_event(
             db=db_session,
             card=test_card,
             event_id=test_event.event_id,
@@ -129,8 +255,9 @@ class TestAnalyticsTracking:
             event_type="added_to_wallet",
             request=sample_request_context
         )
+        wallet_event = await db_session.get(WalletPassEvent, tracked.id)
 
-        assert wallet_event.wallet_event_id is not None
+        assert wallet_event.wallet_event_id == tracked.id
         assert wallet_event.tenant_id == test_card.tenant_id
         assert wallet_event.card_id == test_card.card_id
         assert wallet_event.event_id == test_event.event_id
@@ -165,15 +292,16 @@ class TestAnalyticsTracking:
     @pytest.mark.asyncio
     async def test_track_contact_export(self, db_session, test_card, test_event, sample_request_context):
         """Test contact export event tracking"""
-        export_event = await AnalyticsService.track_contact_export(
+        tracked = await AnalyticsService.track_contact_export(
             db=db_session,
             card=test_card,
             event_id=test_event.event_id,
             export_type="vcard_download",
             request=sample_request_context
         )
+        export_event = await db_session.get(ContactExportEvent, tracked.id)
 
-        assert export_event.export_event_id is not None
+        assert export_event.export_event_id == tracked.id
         assert export_event.tenant_id == test_card.tenant_id
         assert export_event.card_id == test_card.card_id
         assert export_event.event_id == test_event.event_id
@@ -394,13 +522,14 @@ class TestAnalyticsEdgeCases:
     @pytest.mark.asyncio
     async def test_track_email_without_request(self, db_session, test_tenant):
         """Test email tracking without request context"""
-        email_event = await AnalyticsService.track_email_event(
+        tracked = await AnalyticsService.track_email_event(
             db=db_session,
             tenant_id=test_tenant.tenant_id,
             message_id="no-request-test",
             recipient_email="test@example.com",
             event_type="sent"
         )
+        email_event = await db_session.get(EmailEvent, tracked.id)
 
         assert email_event.user_agent is None
         assert email_event.ip_address is None
@@ -408,7 +537,7 @@ class TestAnalyticsEdgeCases:
     @pytest.mark.asyncio
     async def test_track_wallet_without_request(self, db_session, test_card, test_event):
         """Test wallet tracking without request context"""
-        wallet_event = await AnalyticsService.track_wallet_event(
+        tracked = await AnalyticsService.track_wallet_event(
             db=db_session,
             card=test_card,
             event_id=test_event.event_id,
@@ -416,6 +545,7 @@ class TestAnalyticsEdgeCases:
             event_type="generated",
             request=None
         )
+        wallet_event = await db_session.get(WalletPassEvent, tracked.id)
 
         assert wallet_event.user_agent is None
         assert wallet_event.ip_address is None
@@ -444,6 +574,35 @@ class TestAnalyticsEdgeCases:
         assert result["browser"] is None
         assert result["os"] is None
 
+    @pytest.mark.asyncio
+    async def test_user_agent_parsing_cached(self):
+        """Test repeated user agents are served from the parse cache"""
+        ua = "Mozilla/5.0 (Linux; Android 11; Pixel 5) Mobile Safari/537.36"
+        first = parse_user_agent(ua)
+        hits_before = parse_user_agent.cache_info().hits
+
+        second = parse_user_agent(ua)
+
+        assert second is first
+        assert parse_user_agent.cache_info().hits == hits_before + 1
+        assert second.device_type == "mobile"
+
+    @pytest.mark.asyncio
+    async def test_user_agent_fast_path(self):
+        """Test coarse device classification skips the full parser"""
+        cases = {
+            "Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) Mobile/15E148": "mobile",
+            "Mozilla/5.0 (iPad; CPU OS 14_0 like Mac OS X) Mobile/15E148": "tablet",
+            "Mozilla/5.0 (Linux; Android 11; SM-T870) Safari/537.36": "tablet",
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/91.0": "desktop",
+            "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)": "bot",
+        }
+        for ua, device_type in cases.items():
+            result = parse_user_agent(ua, detailed=False)
+            assert result.device_type == device_type
+            assert result.browser is None
+            assert result.os is None
+
     @pytest.mark.asyncio
     async def test_tenant_isolation(
         self, db_session, test_tenant, test_card, test_event, sample_request_context
@@ -7,9 +7,11 @@ import pytest
 import uuid
 from unittest.mock import patch, MagicMock, AsyncMock
 from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from app.services.card_service import CardService
-from app.models.database import Card, Attendee, QRCode, Event
+from app.models.database import Card, Attendee, QRCode, Event, AnalyticsEvent
 from app.models.schemas import WalletPass
 
 
@@ -55,7 +57,8 @@ class TestCardService:
             assert result is not None
             assert result.card_id is not None
             assert result.qr_url is not None
-            assert mock_s3.upload_file.called
+            # QR PNG is rendered on request, not uploaded
+            assert not mock_s3.upload_file.called
 
             # Verify card in database
             card_result = await db_session.execute(
@@ -94,11 +97,9 @@ class TestCardService:
         await db_session.commit()
 
         with patch("app.services.card_service.s3_client") as mock_s3, \
-             patch("app.services.card_service.generate_qr_code") as mock_qr, \
              patch("app.services.card_service.email_client"):
 
             mock_s3.upload_file = MagicMock()
-            mock_qr.return_value = b"fake-qr-bytes"
 
             result = await CardService.create_card_for_attendee(
                 db=db_session,
@@ -112,14 +113,14 @@ class TestCardService:
             card = card_result.scalar_one_or_none()
             assert card.display_name == "user@example.com"
 
-    async def test_qr_code_generation(
+    async def test_qr_code_record(
         self,
         db_session,
         test_tenant,
         test_event,
         mock_s3_client
     ):
-        """Test QR code is generated and uploaded to S3"""
+        """Test QR code record stores the card URL and nothing is uploaded to S3"""
         attendee = Attendee(
             attendee_id=uuid.uuid4(),
             tenant_id=test_tenant.tenant_id,
@@ -130,11 +131,9 @@ class TestCardService:
         db_session.add(attendee)
         await db_session.commit()
 
-        with patch("app.services.card_service.generate_qr_code") as mock_qr, \
-             patch("app.services.card_service.s3_client") as mock_s3, \
+        with patch("app.services.card_service.s3_client") as mock_s3, \
              patch("app.services.card_service.email_client"):
 
-            mock_qr.return_value = b"fake-qr-bytes"
             mock_s3.upload_file = MagicMock()
 
             result = await CardService.create_card_for_attendee(
@@ -142,17 +141,14 @@ class TestCardService:
                 attendee_id=attendee.attendee_id
             )
 
-            # Verify QR generation was called
-            assert mock_qr.called
-            card_url = mock_qr.call_args[0][0]
-            assert str(result.card_id) in card_url
-
-            # Verify S3 upload
-            assert mock_s3.upload_file.called
-            upload_args = mock_s3.upload_file.call_args[1]
-            assert upload_args["file_bytes"] == b"fake-qr-bytes"
-            assert upload_args["content_type"] == "image/png"
-            assert f"qr/{test_tenant.tenant_id}/" in upload_args["key"]
+            qr_result = await db_session.execute(
+                select(QRCode).where(QRCode.card_id == result.card_id)
+            )
+            qr_code = qr_result.scalar_one()
+            assert qr_code.url.endswith(f"/c/{result.card_id}")
+            assert qr_code.s3_key_png is None
+            assert result.qr_s3_key is None
+            assert not mock_s3.upload_file.called
 
     async def test_wallet_pass_generation_disabled(
         self,
@@ -171,11 +167,9 @@ class TestCardService:
         await db_session.commit()
 
         with patch("app.services.card_service.s3_client"), \
-             patch("app.services.card_service.generate_qr_code") as mock_qr, \
              patch("app.services.card_service.settings") as mock_settings, \
              patch("app.services.card_service.email_client"):
 
-            mock_qr.return_value = b"fake-qr-bytes"
             mock_settings.GOOGLE_WALLET_ENABLED = False
             mock_settings.APPLE_WALLET_ENABLED = False
             mock_settings.BRAND_DOMAINS = {"OUTREACHPASS": "https://test.com"}
@@ -206,11 +200,8 @@ class TestCardService:
         await db_session.commit()
 
         with patch("app.services.card_service.s3_client"), \
-             patch("app.services.card_service.generate_qr_code") as mock_qr, \
              patch("app.services.card_service.email_client") as mock_email:
 
-            mock_qr.return_value = b"fake-qr-bytes"
-
             result = await CardService.create_card_for_attendee(
                 db=db_session,
                 attendee_id=attendee.attendee_id
@@ -219,6 +210,51 @@ class TestCardService:
             # Email should not be sent
             assert not mock_email.send_pass_email.called
 
+    async def test_email_failure_does_not_fail_issuance(
+        self,
+        db_session,
+        test_tenant,
+        test_event
+    ):
+        """Test a failing email send is recorded without failing card creation"""
+        attendee = Attendee(
+            attendee_id=uuid.uuid4(),
+            tenant_id=test_tenant.tenant_id,
+            event_id=test_event.event_id,
+            first_name="Test",
+            email="test@example.com"
+        )
+        db_session.add(attendee)
+        await db_session.commit()
+
+        with patch("app.services.card_service.settings") as mock_settings, \
+             patch("app.services.card_service.email_client") as mock_email:
+
+            mock_settings.GOOGLE_WALLET_ENABLED = False
+            mock_settings.APPLE_WALLET_ENABLED = False
+            mock_settings.BRAND_DOMAINS = {"OUTREACHPASS": "https://test.com"}
+            mock_settings.QR_CDN_BASE = None
+            mock_email.send_pass_email.side_effect = Exception("SES unavailable")
+
+            result = await CardService.create_card_for_attendee(
+                db=db_session,
+                attendee_id=attendee.attendee_id
+            )
+
+            assert result is not None
+            assert mock_email.send_pass_email.called
+
+        card = await db_session.get(Card, result.card_id)
+        assert card is not None
+
+        event_result = await db_session.execute(
+            select(AnalyticsEvent.event_name)
+            .where(AnalyticsEvent.card_id == result.card_id)
+        )
+        event_names = set(event_result.scalars().all())
+        assert "email_error" in event_names
+        assert "email_sent" not in event_names
+
     async def test_linkedin_url_included_in_links(
         self,
         db_session,
@@ -238,11 +274,8 @@ class TestCardService:
         await db_session.commit()
 
         with patch("app.services.card_service.s3_client"), \
-             patch("app.services.card_service.generate_qr_code") as mock_qr, \
              patch("app.services.card_service.email_client"):
 
-            mock_qr.return_value = b"fake-qr-bytes"
-
             result = await CardService.create_card_for_attendee(
                 db=db_session,
                 attendee_id=attendee.attendee_id
@@ -256,31 +289,54 @@ class TestCardService:
             assert "linkedin" in card.links_json
             assert card.links_json["linkedin"] == "https://linkedin.com/in/testuser"
 
-    async def test_s3_upload_failure_handling(
+    async def test_create_cards_for_attendees(
         self,
         db_session,
         test_tenant,
         test_event
     ):
-        """Test graceful handling of S3 upload failures"""
-        attendee = Attendee(
-            attendee_id=uuid.uuid4(),
-            tenant_id=test_tenant.tenant_id,
-            event_id=test_event.event_id,
-            email="test@example.com"
-        )
-        db_session.add(attendee)
+        """Test bulk issuance creates one card per attendee and sends emails in bulk"""
+        attendees = [
+            Attendee(
+                attendee_id=uuid.uuid4(),
+                tenant_id=test_tenant.tenant_id,
+                event_id=test_event.event_id,
+                email=f"bulk{i}@example.com",
+                first_name=f"Bulk{i}"
+            )
+            for i in range(3)
+        ]
+        db_session.add_all(attendees)
         await db_session.commit()
 
-        with patch("app.services.card_service.generate_qr_code") as mock_qr, \
-             patch("app.services.card_service.s3_client") as mock_s3:
+        with patch("app.services.card_service.settings") as mock_settings, \
+             patch("app.services.card_service.email_client") as mock_email:
 
-            mock_qr.return_value = b"fake-qr-bytes"
-            mock_s3.upload_file.side_effect = Exception("S3 upload failed")
+            mock_settings.GOOGLE_WALLET_ENABLED = False
+            mock_settings.APPLE_WALLET_ENABLED = False
+            mock_settings.BRAND_DOMAINS = {"OUTREACHPASS": "https://test.com"}
+            mock_settings.QR_CDN_BASE = None
+            mock_email.send_pass_emails_bulk.return_value = [True, True, True]
 
-            # Should raise exception (card creation should fail if QR upload fails)
-            with pytest.raises(Exception):
-                await CardService.create_card_for_attendee(
-                    db=db_session,
-                    attendee_id=attendee.attendee_id
-                )
+            results = await CardService.create_cards_for_attendees(
+                [attendee.attendee_id for attendee in attendees],
+                session_factory=async_sessionmaker(db_session.bind, expire_on_commit=False)
+            )
+
+            assert len(results) == 3
+            assert not mock_email.send_pass_email.called
+            mock_email.send_pass_emails_bulk.assert_called_once()
+            assert len(mock_email.send_pass_emails_bulk.call_args.args[0]) == 3
+
+        card_result = await db_session.execute(
+            select(Card).where(Card.card_id.in_([r.card_id for r in results]))
+        )
+        cards = card_result.scalars().all()
+        assert {card.owner_attendee_id for card in cards} == {a.attendee_id for a in attendees}
+
+        # Attendees that already have a card are skipped
+        again = await CardService.create_cards_for_attendees(
+            [attendees[0].attendee_id],
+            session_factory=async_sessionmaker(db_session.bind, expire_on_commit=False)
+        )
+        assert again == []
@@ -1,20 +1,30 @@
 """
 Pass Generation Worker Lambda
 Processes pass generation jobs from SQS queue
+
+Each job creates the card and QR code, then queues a separate
+"deliver_card" message for wallet pass generation and the pass email so
+the slow external calls run (and fail) independently of card creation.
+"issue_cards" messages from the bulk endpoint carry a chunk of jobs that
+are issued together with CardService.create_cards_for_attendees.
 """
 import json
 import logging
 import os
 from typing import Dict, Any
 import asyncio
+import boto3
+from botocore.config import Config
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import select
 import uuid
 
 from app.models.database import PassGenerationJob, Attendee
-from app.services.card_service import CardService
+from app.services.card_service import CardService, preload_wallet_generators
 from app.core.config import settings
+from app.core.database import json_serializer
+import orjson
 
 # Configure logging
 logger = logging.getLogger()
@@ -22,9 +32,108 @@ logger.setLevel(logging.INFO)
 
 # Create async engine for worker
 DATABASE_URL = os.getenv("DATABASE_URL", settings.DATABASE_URL)
-engine = create_async_engine(DATABASE_URL, echo=False, pool_pre_ping=True)
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=False,
+    pool_pre_ping=True,
+    json_serializer=json_serializer,
+    json_deserializer=orjson.loads
+)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+sqs = boto3.client(
+    'sqs',
+    region_name=settings.AWS_REGION,
+    config=Config(connect_timeout=5, read_timeout=5, retries={'max_attempts': 2})
+)
+
+# Parse wallet certificates/credentials during Lambda init, not on the first job
+preload_wallet_generators()
+
+DELIVER_CARD_ACTION = "deliver_card"
+ISSUE_CARDS_ACTION = "issue_cards"
+
+
+async def queue_card_delivery(card_id: uuid.UUID) -> bool:
+    """Queue wallet pass generation and the pass email for a new card"""
+    try:
+        await asyncio.to_thread(
+            sqs.send_message,
+            QueueUrl=settings.SQS_QUEUE_URL,
+            MessageBody=json.dumps({"action": DELIVER_CARD_ACTION, "card_id": str(card_id)})
+        )
+        return True
+    except Exception as e:
+        logger.warning(f"Failed to queue delivery for card {card_id}: {str(e)}")
+        return False
+
+
+async def process_card_delivery(card_id: str) -> Dict[str, Any]:
+    """Generate wallet passes and send the pass email for a card"""
+    async with AsyncSessionLocal() as db:
+        try:
+            wallet_passes = await CardService.deliver_card(db=db, card_id=uuid.UUID(card_id))
+            logger.info(f"Delivered card {card_id} with {len(wallet_passes)} wallet passes")
+            return {"status": "success", "card_id": card_id, "wallet_passes": len(wallet_passes)}
+        except Exception as e:
+            logger.error(f"Error delivering card {card_id}: {str(e)}", exc_info=True)
+            return {"status": "error", "card_id": card_id, "message": str(e)}
+
+
+async def process_card_issue(job_ids: list) -> Dict[str, Any]:
+    """Issue passes for a chunk of pass generation jobs queued by the bulk endpoint"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(PassGenerationJob)
+            .where(PassGenerationJob.job_id.in_([uuid.UUID(job_id) for job_id in job_ids]))
+            .where(PassGenerationJob.status != "completed")
+        )
+        jobs = result.scalars().all()
+        if not jobs:
+            return {"status": "success", "message": "Jobs already completed"}
+
+        for job in jobs:
+            job.status = "processing"
+            job.started_at = job.created_at
+        await db.commit()
+
+        attendee_ids = [job.attendee_id for job in jobs]
+        try:
+            issued = await CardService.create_cards_for_attendees(
+                attendee_ids, session_factory=AsyncSessionLocal
+            )
+        except Exception as e:
+            logger.error(f"Error issuing passes for {len(jobs)} jobs: {str(e)}", exc_info=True)
+            for job in jobs:
+                job.status = "failed"
+                job.error_message = str(e)
+            await db.commit()
+            return {"status": "error", "message": str(e)}
+
+        # Attendees that already had a card are skipped by the bulk statement,
+        # so read each attendee's card back instead of relying on the results
+        qr_urls = {str(card.card_id): card.qr_url for card in issued}
+        card_result = await db.execute(
+            select(Attendee.attendee_id, Attendee.card_id)
+            .where(Attendee.attendee_id.in_(attendee_ids))
+        )
+        card_ids = dict(card_result.all())
+
+        for job in jobs:
+            card_id = card_ids.get(job.attendee_id)
+            if card_id:
+                job.status = "completed"
+                job.card_id = card_id
+                job.qr_url = qr_urls.get(str(card_id))
+                job.completed_at = job.created_at
+            else:
+                job.status = "failed"
+                job.error_message = "Failed to generate pass"
+        await db.commit()
+
+        logger.info(f"Issued {len(issued)} passes for {len(jobs)} jobs")
+        return {"status": "success", "jobs": len(jobs), "issued": len(issued)}
+
 
 async def process_pass_generation_job(job_id: str) -> Dict[str, Any]:
     """Process a single pass generation job"""
@@ -78,7 +187,8 @@ async def process_pass_generation_job(job_id: str) -> Dict[str, Any]:
             logger.info(f"Generating pass for attendee {attendee.attendee_id}")
             pass_result = await CardService.create_card_for_attendee(
                 db=db,
-                attendee_id=job.attendee_id
+                attendee_id=job.attendee_id,
+                deliver=False
             )
 
             if not pass_result:
@@ -97,6 +207,11 @@ async def process_pass_generation_job(job_id: str) -> Dict[str, Any]:
             await db.commit()
 
             logger.info(f"Successfully generated pass {pass_result.card_id} for job {job_id}")
+
+            # Wallet passes and email run as their own message; deliver
+            # inline only if that message cannot be queued
+            if not await queue_card_delivery(pass_result.card_id):
+                await CardService.deliver_card(db=db, card_id=pass_result.card_id)
             return {
                 "status": "success",
                 "message": "Pass generated successfully",
@@ -126,6 +241,15 @@ async def process_all_records(event: Dict[str, Any]) -> list:
         try:
             # Parse message body
             body = json.loads(record["body"])
+
+            if body.get("action") == DELIVER_CARD_ACTION:
+                results.append(await process_card_delivery(body["card_id"]))
+                continue
+
+            if body.get("action") == ISSUE_CARDS_ACTION:
+                results.append(await process_card_issue(body["job_ids"]))
+                continue
+
             job_id = body.get("job_id")
 
             if not job_id: